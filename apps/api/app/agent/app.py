@@ -1,4 +1,5 @@
 # standard
+import atexit
 import logging
 import os
 from typing import TYPE_CHECKING
@@ -15,9 +16,16 @@ from injector import (
 from injector import T
 
 # local
+from .blob_cache import BLOB_CACHE_DIR, configure_blob_cache
+from .color.color import attach_iscc_nbs_store, detach_iscc_nbs_store, iscc_nbs_cache_version
+from .color.iscc_nbs_lut import ISCC_NBS_LUT_DIR, configure_iscc_nbs_lut, prepare_iscc_nbs_lut, start_iscc_nbs_lut_build
 from .common_service_provider import CommonServiceProvider
+from .equivalence import EquivalenceStats, update_paint_equivalences
+from .kv_store import KeyValueStore
+from .swatch_ramps import RAMP_STEPS, generate_swatch_ramps
 from .vendors.army_painter import ArmyPainterProvider
 from .vendors.games_workshop import GamesWorkshopProvider
+from .vendors.games_workshop.svg_parser import attach_svg_meta_store, detach_svg_meta_store, svg_meta_cache_version
 
 
 if TYPE_CHECKING:
@@ -92,12 +100,62 @@ class App:
         self.state.vendor = vendor
         return self.injector.get(type(vendor))
 
+    def warm_caches(self):
+        """
+        Point the blob cache at the cache directory and load the ISCC-NBS lookup table
+        there (building it in the background when it is missing), then attach the
+        persistent color classification and SVG caches (when enabled) so colors
+        classified, or swatch SVGs parsed, in a previous run or in another locale are
+        not processed again.
+        """
+        configure_blob_cache(BLOB_CACHE_DIR or os.path.join(self.fs.cachedir, 'blobs'))
+        configure_iscc_nbs_lut(ISCC_NBS_LUT_DIR or os.path.join(self.fs.cachedir, 'lut'))
+        if self.config.get('fs.build_color_lut', default=False):
+            start_iscc_nbs_lut_build()
+        else:
+            prepare_iscc_nbs_lut(build=False)
+
+        if not self.config.get('fs.persist_color_cache', default=False):
+            return
+        store = KeyValueStore(
+            self.fs.get_cache_path('color_cache'),
+            namespace='iscc_nbs',
+            version=iscc_nbs_cache_version(),
+        )
+        warmed = attach_iscc_nbs_store(store)
+        atexit.register(detach_iscc_nbs_store)
+        logger.debug('Warmed color classification cache with %s entries', warmed)
+
+        svg_store = KeyValueStore(
+            self.fs.get_cache_path('color_cache'),
+            namespace='svg_meta',
+            version=svg_meta_cache_version(),
+        )
+        warmed = attach_svg_meta_store(svg_store)
+        atexit.register(detach_svg_meta_store)
+        logger.debug('Warmed SVG cache with %s entries', warmed)
+
+    def update_paint_equivalences(self, k: int = 5, metric: str = 'oklab') -> EquivalenceStats:
+        """
+        Update the cross-vendor paint equivalences after a scrape. Only products
+        whose swatch changed (or whose equivalents changed) are recomputed.
+        """
+        return update_paint_equivalences(self.fs, k=k, metric=metric)
+
+    def generate_swatch_ramps(self, steps: int = RAMP_STEPS, force: bool = False) -> dict[str, int]:
+        """
+        Precompute the gradient ramps of every product line's swatches after a scrape.
+        """
+        return generate_swatch_ramps(self.fs, steps=steps, force=force)
+
 
 def create_agent():
-    return App.get_instance(
+    agent = App.get_instance(
         [
             CommonServiceProvider(),
             ArmyPainterProvider(),
             GamesWorkshopProvider(),
         ]
     )
+    agent.warm_caches()
+    return agent
@@ -0,0 +1,394 @@
+# standard
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Optional
+
+# packages
+import httpx
+
+# local
+from .fetcher import FETCH_TIMEOUT, AsyncFetcher
+
+"""
+A local, content-addressed cache of downloaded blobs (e.g., swatch SVGs and
+product images), so repeated scrapes only transfer what actually changed.
+
+Each URL maps to the SHA-256 digest of its last downloaded body, along with the
+response's `ETag` and `Last-Modified` headers. Bodies are stored once per digest
+(under `objects/<first 2 digits>/<digest>`), so URLs serving identical content
+share a file. When a URL is requested again the cached validators are sent as
+`If-None-Match`/`If-Modified-Since`; a `304 Not Modified` response is answered
+from disk without transferring the body.
+
+The cache lives in `blobs` under the app's `fs.cachedir` (@see configure_blob_cache)
+and is capped at `BLOB_CACHE_MAX_BYTES`; once it grows past the cap the least
+recently used blobs are evicted. The async methods do their disk and SQLite work in
+a worker thread, so they never stall the event loop.
+
+Example:
+--------
+>>> cache = get_blob_cache()
+>>> svg = cache.get('https://www.warhammer.com/.../Mephiston-Red.svg')  # 200, stored
+>>> svg = cache.get('https://www.warhammer.com/.../Mephiston-Red.svg')  # 304, read from disk
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# Directory of the blob store (`blobs` under `fs.cachedir` by default, @see configure_blob_cache)
+BLOB_CACHE_DIR = os.environ.get('BLOB_CACHE_DIR')
+
+# Maximum total size (in bytes) of the stored blobs
+BLOB_CACHE_MAX_BYTES = int(os.environ.get('BLOB_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+
+@dataclass(frozen=True)
+class BlobEntry:
+    url: str
+    # SHA-256 hex digest of the body
+    digest: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def default_blob_cache_dir() -> str:
+    # Imported here so the cache does not load the app configuration (and the models it imports)
+    from app.agent.configuration.filesystem import fs_config
+    return os.path.join(fs_config['cachedir'], 'blobs')
+
+
+class BlobCache:
+    def __init__(self, path: str | None = None, max_bytes: int = BLOB_CACHE_MAX_BYTES):
+        path = path or BLOB_CACHE_DIR or default_blob_cache_dir()
+        self._path = path
+        self._max_bytes = max(0, max_bytes)
+        self._lock = threading.RLock()
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(path, 'index.sqlite3'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, '
+                'etag TEXT, last_modified TEXT, content_type TEXT, last_access REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)')
+        # Running size of the stored blobs, so a store only scans the index to evict once
+        # the cache may have outgrown its cap (recounted exactly by `evict`)
+        self._stored_bytes = self.total_bytes()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._path, 'objects', digest[:2], digest)
+
+    def total_bytes(self) -> int:
+        """
+        The size of the stored blobs (each distinct body is counted once).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)'
+            ).fetchone()
+            return row[0]
+
+    def entry(self, url: str) -> Optional[BlobEntry]:
+        """
+        The cached entry for a URL, if its body is still on disk.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, digest, size, etag, last_modified, content_type FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = BlobEntry(*row)
+            if not os.path.exists(self._blob_path(entry.digest)):
+                self._forget([url])
+                return None
+            return entry
+
+    def read(self, entry: BlobEntry) -> Optional[bytes]:
+        """
+        The body of a cached entry (marking it as recently used), or `None` if it has
+        been evicted in the meantime.
+        """
+        try:
+            with open(self._blob_path(entry.digest), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE entries SET last_access = ? WHERE url = ?', (time.time(), entry.url))
+        return content
+
+    def put(self, url: str, content: bytes, headers: Mapping[str, str] | None = None) -> BlobEntry:
+        """
+        Store the body downloaded from a URL, along with its validators (`ETag`,
+        `Last-Modified`) from the response headers. The URL's previous body is removed
+        if no other URL shares it.
+        """
+        headers = httpx.Headers(headers or {})
+        digest = content_digest(content)
+        entry = BlobEntry(
+            url=url,
+            digest=digest,
+            size=len(content),
+            etag=headers.get('etag'),
+            last_modified=headers.get('last-modified'),
+            content_type=headers.get('content-type'),
+        )
+        blob_path = self._blob_path(digest)
+        with self._lock:
+            previous = self._conn.execute('SELECT digest, size FROM entries WHERE url = ?', (url,)).fetchone()
+            if not self._is_referenced(digest):
+                self._stored_bytes += entry.size
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                # Write to a temporary file first so a partially written blob is never read
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, blob_path)
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO entries '
+                    '(url, digest, size, etag, last_modified, content_type, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (url, digest, entry.size, entry.etag, entry.last_modified, entry.content_type, time.time()),
+                )
+            if previous is not None and previous[0] != digest:
+                self._remove_unreferenced([previous])
+            if self._stored_bytes > self._max_bytes:
+                self.evict(keep=digest)
+        return entry
+
+    def revalidated(self, entry: BlobEntry, headers: Mapping[str, str]) -> Optional[bytes]:
+        """
+        The cached body of an entry confirmed by a `304 Not Modified` response. Any
+        new validators sent with the response are recorded.
+        """
+        headers = httpx.Headers(headers)
+        etag = headers.get('etag', entry.etag)
+        last_modified = headers.get('last-modified', entry.last_modified)
+        if (etag, last_modified) != (entry.etag, entry.last_modified):
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'UPDATE entries SET etag = ?, last_modified = ? WHERE url = ?', (etag, last_modified, entry.url)
+                )
+        return self.read(entry)
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Remove the least recently used blobs until the cache fits in `max_bytes`
+        (the cache's cap by default).
+
+        Args:
+            max_bytes: The size to shrink the cache to.
+            keep: The digest of a blob that must not be evicted (e.g., the one just stored).
+
+        Returns:
+            The number of blobs removed.
+        """
+        max_bytes = self._max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            total = self.total_bytes()
+            self._stored_bytes = total
+            if total <= max_bytes:
+                return 0
+            rows = self._conn.execute(
+                'SELECT digest, MAX(size), MAX(last_access) AS accessed FROM entries '
+                'GROUP BY digest ORDER BY accessed, digest'
+            ).fetchall()
+            evicted = []
+            for digest, size, _ in rows:
+                if total <= max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                evicted.append(digest)
+                total -= size
+            with self._conn:
+                self._conn.executemany('DELETE FROM entries WHERE digest = ?', [(d,) for d in evicted])
+            self._stored_bytes = total
+            for digest in evicted:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+        if evicted:
+            LOGGER.debug('Evicted %s blobs from %s', len(evicted), self._path)
+        return len(evicted)
+
+    def _is_referenced(self, digest: str) -> bool:
+        return self._conn.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone() is not None
+
+    def _remove_unreferenced(self, blobs: Iterable[tuple[str, int]]):
+        """
+        Remove the files of `(digest, size)` blobs no entry refers to any more.
+        """
+        for digest, size in dict(blobs).items():
+            if self._is_referenced(digest):
+                continue
+            self._stored_bytes -= size
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, urls: Iterable[str]):
+        urls = [(url,) for url in urls]
+        with self._lock:
+            blobs = []
+            for (url,) in urls:
+                blobs.extend(self._conn.execute('SELECT digest, size FROM entries WHERE url = ?', (url,)))
+            with self._conn:
+                self._conn.executemany('DELETE FROM entries WHERE url = ?', urls)
+            self._remove_unreferenced(blobs)
+
+    def clear(self):
+        with self._lock:
+            digests = [row[0] for row in self._conn.execute('SELECT DISTINCT digest FROM entries')]
+            with self._conn:
+                self._conn.execute('DELETE FROM entries')
+            self._stored_bytes = 0
+            for digest in digests:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[BlobEntry]) -> dict[str, str]:
+        """
+        The `If-None-Match`/`If-Modified-Since` headers revalidating a cached entry.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def _resolve(self, url: str, entry: Optional[BlobEntry], response: httpx.Response) -> Optional[bytes]:
+        """
+        The body for a (possibly conditional) response: the cached body for a `304`,
+        otherwise the downloaded body, which is stored. `None` when a `304` arrives for
+        a blob evicted since the request was sent.
+        """
+        if response.status_code == 304 and entry is not None:
+            return self.revalidated(entry, response.headers)
+        response.raise_for_status()
+        self.put(url, response.content, response.headers)
+        return response.content
+
+    def get(self, url: str, headers: Mapping[str, str] | None = None, client: httpx.Client | None = None) -> bytes:
+        """
+        GET a URL through the cache, raising `httpx.HTTPStatusError` for error responses.
+
+        Args:
+            url: The URL to fetch.
+            headers: Additional request headers.
+            client: A client to send the request with (a one-off request is made otherwise).
+        """
+        entry = self.entry(url)
+        request_headers = {**(headers or {}), **self.conditional_headers(entry)}
+        send = client.get if client is not None else httpx.get
+        kwargs = {} if client is not None else {'follow_redirects': True, 'timeout': FETCH_TIMEOUT}
+
+        content = self._resolve(url, entry, send(url, headers=request_headers, **kwargs))
+        if content is None:
+            content = self._resolve(url, None, send(url, headers=headers, **kwargs))
+        return content
+
+    async def aget(self, url: str, fetcher: AsyncFetcher, headers: Mapping[str, str] | None = None) -> bytes:
+        """
+        GET a URL through the cache with an open `AsyncFetcher`, raising
+        `httpx.HTTPStatusError` for error responses. The index and blobs are read and
+        written in a worker thread.
+        """
+        entry = await asyncio.to_thread(self.entry, url)
+        request_headers = {**(headers or {}), **self.conditional_headers(entry)}
+
+        response = await fetcher.request('GET', url, headers=request_headers)
+        content = await asyncio.to_thread(self._resolve, url, entry, response)
+        if content is None:
+            response = await fetcher.request('GET', url, headers=headers)
+            content = await asyncio.to_thread(self._resolve, url, None, response)
+        return content
+
+    async def aget_many(
+        self, urls: Iterable[str], fetcher: AsyncFetcher, headers: Mapping[str, str] | None = None
+    ) -> list[bytes | Exception]:
+        """
+        GET every URL concurrently through the cache. Each URL is only requested once,
+        however many times it appears.
+
+        Returns:
+            The body (or the exception raised) for each URL, in order.
+        """
+        urls = list(urls)
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.aget(url, fetcher, headers) for url in unique), return_exceptions=True)
+        by_url = dict(zip(unique, results))
+        return [by_url[url] for url in urls]
+
+
+_cache_lock = threading.Lock()
+_cache: BlobCache | None = None
+_cache_dir: str | None = BLOB_CACHE_DIR
+
+
+def configure_blob_cache(path: str):
+    """
+    Set the directory of the shared blob cache, e.g. from the app's `fs.cachedir`. A
+    shared cache already opened elsewhere is closed.
+    """
+    global _cache, _cache_dir
+    with _cache_lock:
+        if path != _cache_dir:
+            _cache_dir = path
+            if _cache is not None:
+                _cache.close()
+                _cache = None
+
+
+def get_blob_cache() -> BlobCache:
+    """
+    The shared blob cache (see `configure_blob_cache` and `BLOB_CACHE_MAX_BYTES`).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BlobCache(_cache_dir)
+        return _cache
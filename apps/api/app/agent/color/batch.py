@@ -0,0 +1,413 @@
+import numpy as np
+
+from .constants import OKLAB_DISTANCE_WEIGHTS
+
+"""
+Vectorized color space conversions.
+
+Every function in this module operates on the last axis of a NumPy array, so a
+single color (shape `(3,)`), a list of swatches (shape `(N, 3)`), or even an
+image (shape `(H, W, 3)`) can be converted in one pass without Python-level loops.
+RGB inputs may be either `uint8` or floats in the range [0, 255].
+
+The scalar helpers in `color.py` (`rgb_to_xyz`, `xyz_to_lab`, `lab_to_lch`,
+`to_oklab`, `to_oklch`, `xyz_to_rgb`, `lch_to_hex`, `oklch_to_hex`) are thin
+wrappers around these functions.
+
+Conversions back to sRGB either clip out-of-gamut channels or, for the
+`*_to_rgb_many(..., gamut_map=True)` helpers, reduce chroma per CSS Color 4 so
+lightness and hue are preserved.
+
+Example:
+--------
+>>> rgb = np.array([[255, 0, 255], [12, 34, 56]], dtype=np.uint8)
+>>> to_color_spaces_many(rgb)['oklch'].shape
+(2, 3)
+"""
+
+# sRGB (D65) -> XYZ, scaled so that Y is in the range [0, 100]
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+# XYZ -> linear sRGB (D65), the exact inverse of `RGB_TO_XYZ`
+XYZ_TO_RGB = np.linalg.inv(RGB_TO_XYZ)
+
+# Reference white point D65 (Y scaled to 100)
+XYZ_REF_WHITE = np.array([95.047, 100.000, 108.883])
+
+# Linear sRGB -> LMS cone response
+# @see https://bottosson.github.io/posts/oklab/
+LRGB_TO_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+
+# Non-linear LMS -> OKLab
+LMS_TO_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+
+# OKLab -> non-linear LMS
+OKLAB_TO_LMS = np.array([
+    [1.0, 0.3963377774, 0.2158037573],
+    [1.0, -0.1055613458, -0.0638541728],
+    [1.0, -0.0894841775, -1.2914855480],
+])
+
+# LMS cone response -> linear sRGB
+LMS_TO_LRGB = np.array([
+    [4.0767416621, -3.3077115913, 0.2309699292],
+    [-1.2684380046, 2.6097574011, -0.3413193965],
+    [-0.0041960863, -0.7034186147, 1.7076147010],
+])
+
+
+def as_color_array(values, channels: int = 3) -> np.ndarray:
+    """
+    Coerce a color or collection of colors into a float64 array whose last axis
+    holds `channels` values. Any alpha channel is dropped.
+
+    Args:
+        values: A single color, an iterable of colors, or an existing array.
+        channels: The number of channels expected on the last axis.
+
+    Returns:
+        A float64 NumPy array of shape `(..., channels)`.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 0 or arr.shape[-1] < channels:
+        raise ValueError(f'Expected an array of shape (..., {channels}), got {arr.shape}')
+    return arr[..., :channels]
+
+
+def srgb_to_linear_many(rgb) -> np.ndarray:
+    """
+    Remove the sRGB transfer function ("gamma-expand") from RGB values.
+
+    Args:
+        rgb: RGB values in the range [0, 255].
+
+    Returns:
+        Linear RGB values in the range [0, 1].
+    """
+    c = as_color_array(rgb) / 255.0
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def rgb_to_xyz_many(rgb) -> np.ndarray:
+    """
+    Convert RGB colors to the CIE XYZ color space (Y in the range [0, 100]).
+    """
+    return (srgb_to_linear_many(rgb) * 100) @ RGB_TO_XYZ.T
+
+
+def xyz_to_lab_many(xyz) -> np.ndarray:
+    """
+    Convert CIE XYZ colors to the CIE Lab color space.
+    """
+    v = as_color_array(xyz) / XYZ_REF_WHITE
+    f = np.where(v > 0.008856, np.cbrt(v), (v * 7.787) + (16 / 116))
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([(116 * fy) - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def _to_polar(lab: np.ndarray) -> np.ndarray:
+    """
+    Convert the rectangular a/b coordinates of a Lab-like space into chroma and
+    a hue angle normalized to [0, 360) degrees.
+    """
+    a, b = lab[..., 1], lab[..., 2]
+    chroma = np.hypot(a, b)
+    hue = np.degrees(np.arctan2(b, a)) % 360.0
+    return np.stack([lab[..., 0], chroma, hue], axis=-1)
+
+
+def _from_polar(lch: np.ndarray) -> np.ndarray:
+    """
+    Convert the chroma and hue (in degrees) of a Lab-like space back into
+    rectangular a/b coordinates.
+    """
+    hue = np.radians(lch[..., 2])
+    return np.stack([lch[..., 0], lch[..., 1] * np.cos(hue), lch[..., 1] * np.sin(hue)], axis=-1)
+
+
+def lab_to_lch_many(lab) -> np.ndarray:
+    """
+    Convert CIE Lab colors to CIE LCh (Lightness, Chroma, hue in degrees).
+    """
+    return _to_polar(as_color_array(lab))
+
+
+def rgb_to_lab_many(rgb) -> np.ndarray:
+    return xyz_to_lab_many(rgb_to_xyz_many(rgb))
+
+
+def rgb_to_lch_many(rgb) -> np.ndarray:
+    return lab_to_lch_many(rgb_to_lab_many(rgb))
+
+
+def linear_to_oklab_many(lrgb) -> np.ndarray:
+    """
+    Convert linear RGB values in the range [0, 1] to OKLab.
+    """
+    lms = as_color_array(lrgb) @ LRGB_TO_LMS.T
+    # Non-linear compression (negative responses are clamped as in `to_oklab`)
+    lms_ = np.cbrt(np.maximum(lms, 0))
+    return lms_ @ LMS_TO_OKLAB.T
+
+
+def rgb_to_oklab_many(rgb) -> np.ndarray:
+    """
+    Convert RGB colors to the OKLab color space.
+    """
+    return linear_to_oklab_many(srgb_to_linear_many(rgb))
+
+
+def oklab_to_oklch_many(oklab) -> np.ndarray:
+    """
+    Convert OKLab colors to OKLCH (Lightness, Chroma, hue in degrees).
+    """
+    return _to_polar(as_color_array(oklab))
+
+
+def rgb_to_oklch_many(rgb) -> np.ndarray:
+    return oklab_to_oklch_many(rgb_to_oklab_many(rgb))
+
+
+def oklch_to_oklab_many(oklch) -> np.ndarray:
+    """
+    Convert OKLCH colors (hue in degrees) to OKLab.
+    """
+    return _from_polar(as_color_array(oklch))
+
+
+def oklab_to_linear_many(oklab) -> np.ndarray:
+    """
+    Convert OKLab colors to linear RGB. Out-of-gamut colors fall outside [0, 1].
+    """
+    lms = (as_color_array(oklab) @ OKLAB_TO_LMS.T) ** 3
+    return lms @ LMS_TO_LRGB.T
+
+
+def linear_to_srgb_many(lrgb) -> np.ndarray:
+    """
+    Apply the sRGB transfer function ("gamma-compress") to linear RGB values.
+
+    Args:
+        lrgb: Linear RGB values in the range [0, 1].
+
+    Returns:
+        RGB values in the range [0, 255]. Values are not clipped, so out-of-gamut
+        inputs produce values outside of that range.
+    """
+    c = as_color_array(lrgb)
+    magnitude = np.abs(c)
+    encoded = np.where(
+        magnitude <= 0.0031308,
+        c * 12.92,
+        np.sign(c) * (1.055 * magnitude ** (1 / 2.4) - 0.055),
+    )
+    return encoded * 255.0
+
+
+def oklab_to_rgb_many(oklab) -> np.ndarray:
+    """
+    Convert OKLab colors to RGB values in the range [0, 255], clipping any
+    out-of-gamut channels.
+    """
+    return np.clip(linear_to_srgb_many(oklab_to_linear_many(oklab)), 0, 255)
+
+
+def lch_to_lab_many(lch) -> np.ndarray:
+    """
+    Convert CIE LCh colors (hue in degrees) to CIE Lab.
+    """
+    return _from_polar(as_color_array(lch))
+
+
+def lab_to_xyz_many(lab) -> np.ndarray:
+    """
+    Convert CIE Lab colors to CIE XYZ (Y in the range [0, 100]), the exact inverse
+    of `xyz_to_lab_many`.
+    """
+    lab = as_color_array(lab)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    f3 = f ** 3
+    return np.where(f3 > 0.008856, f3, (f - 16 / 116) / 7.787) * XYZ_REF_WHITE
+
+
+def xyz_to_linear_many(xyz) -> np.ndarray:
+    """
+    Convert CIE XYZ colors (Y in the range [0, 100]) to linear RGB. Out-of-gamut
+    colors fall outside [0, 1].
+    """
+    return (as_color_array(xyz) / 100) @ XYZ_TO_RGB.T
+
+
+def xyz_to_rgb_many(xyz) -> np.ndarray:
+    """
+    Convert CIE XYZ colors to RGB values in the range [0, 255], clipping any
+    out-of-gamut channels.
+    """
+    return np.clip(linear_to_srgb_many(xyz_to_linear_many(xyz)), 0, 255)
+
+
+def in_gamut_many(lrgb, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Whether linear RGB values are displayable in sRGB (every channel in [0, 1]).
+    """
+    c = as_color_array(lrgb)
+    return np.all((c >= -tolerance) & (c <= 1 + tolerance), axis=-1)
+
+
+def gamut_map_oklch_many(oklch, jnd: float = 0.02, epsilon: float = 0.0001) -> np.ndarray:
+    """
+    Map OKLCH colors into the sRGB gamut with the CSS Color 4 algorithm: the
+    chroma of out-of-gamut colors is reduced (by binary search, keeping lightness
+    and hue) until clipping the result changes it by less than a just noticeable
+    difference (ΔEOK `jnd`). Every color is processed at once; the search runs
+    for a fixed ~log2(max chroma / epsilon) steps over the colors still active.
+    @see https://www.w3.org/TR/css-color-4/#binsearch
+
+    Args:
+        oklch: OKLCH colors of shape `(..., 3)`.
+        jnd: The just noticeable difference in OKLab.
+        epsilon: The chroma precision of the search.
+
+    Returns:
+        Linear RGB values in the range [0, 1].
+    """
+    oklch = as_color_array(oklch)
+    shape = oklch.shape
+    oklch = oklch.reshape(-1, 3)
+    L, C = oklch[:, 0], np.maximum(oklch[:, 1], 0)
+
+    lrgb = oklab_to_linear_many(_from_polar(oklch))
+    result = np.clip(lrgb, 0, 1)
+
+    def delta_eok(clipped: np.ndarray, current_oklab: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(linear_to_oklab_many(clipped) - current_oklab, axis=-1)
+
+    # White/black and in-gamut colors are done; so are colors that clip within a JND
+    done = (L >= 1) | (L <= 0) | in_gamut_many(lrgb)
+    result[L >= 1] = 1.0
+    result[L <= 0] = 0.0
+    pending = np.flatnonzero(~done)
+    if len(pending):
+        close = delta_eok(result[pending], _from_polar(oklch[pending])) < jnd
+        pending = pending[~close]
+
+    low = np.zeros(len(pending))
+    high = C[pending].copy()
+    low_in_gamut = np.ones(len(pending), dtype=bool)
+    active = np.ones(len(pending), dtype=bool)
+
+    while active.any():
+        idx = np.flatnonzero(active & (high - low > epsilon))
+        active[:] = False
+        if len(idx) == 0:
+            break
+        active[idx] = True
+
+        chroma = (low[idx] + high[idx]) / 2
+        current = np.stack([L[pending[idx]], chroma, oklch[pending[idx], 2]], axis=-1)
+        current_oklab = _from_polar(current)
+        current_lrgb = oklab_to_linear_many(current_oklab)
+        clipped = np.clip(current_lrgb, 0, 1)
+        result[pending[idx]] = clipped
+
+        inside = low_in_gamut[idx] & in_gamut_many(current_lrgb)
+        E = delta_eok(clipped, current_oklab)
+        below = ~inside & (E < jnd)
+        finished = below & (jnd - E < epsilon)
+
+        low[idx] = np.where(inside | below, chroma, low[idx])
+        high[idx] = np.where(~inside & ~below, chroma, high[idx])
+        low_in_gamut[idx] &= ~below
+        active[idx[finished]] = False
+
+    return result.reshape(shape)
+
+
+def oklch_to_rgb_many(oklch, gamut_map: bool = True) -> np.ndarray:
+    """
+    Convert OKLCH colors to RGB values in the range [0, 255]. Out-of-gamut colors
+    are gamut mapped (see `gamut_map_oklch_many`), or clipped when `gamut_map` is off.
+    """
+    if gamut_map:
+        return linear_to_srgb_many(gamut_map_oklch_many(oklch))
+    return oklab_to_rgb_many(oklch_to_oklab_many(oklch))
+
+
+def lch_to_rgb_many(lch, gamut_map: bool = True) -> np.ndarray:
+    """
+    Convert CIE LCh colors to RGB values in the range [0, 255]. Out-of-gamut colors
+    are gamut mapped in OKLCH, or clipped when `gamut_map` is off.
+    """
+    lrgb = xyz_to_linear_many(lab_to_xyz_many(lch_to_lab_many(lch)))
+    if not gamut_map:
+        return np.clip(linear_to_srgb_many(lrgb), 0, 255)
+    # Linear RGB -> OKLab without clamping, so the hue of out-of-gamut colors is kept
+    lms = np.cbrt(lrgb @ LRGB_TO_LMS.T)
+    oklch = _to_polar(lms @ LMS_TO_OKLAB.T)
+    return linear_to_srgb_many(gamut_map_oklch_many(oklch))
+
+
+HEX_BYTES = np.array([f'{i:02x}' for i in range(256)])
+
+
+def rgb_to_hex_many(rgb) -> np.ndarray:
+    """
+    Format RGB values (rounded and clipped to [0, 255]) as hex color strings.
+
+    Returns:
+        An array of strings (e.g., '#ff00ff') with the leading shape of `rgb`.
+    """
+    channels = np.clip(np.rint(as_color_array(rgb)), 0, 255).astype(np.intp)
+    hex_values = np.char.add(HEX_BYTES[channels[..., 0]], HEX_BYTES[channels[..., 1]])
+    return np.char.add('#', np.char.add(hex_values, HEX_BYTES[channels[..., 2]]))
+
+
+def to_color_spaces_many(rgb) -> dict[str, np.ndarray]:
+    """
+    Convert a batch of RGB colors to every supported color space in a single
+    pass, sharing the linearized RGB intermediate between the CIE and OK spaces.
+
+    Args:
+        rgb: An array of shape `(N, 3)` (`uint8` or float) of RGB values.
+
+    Returns:
+        A dictionary of `(N, 3)` float64 arrays keyed by 'xyz', 'lab', 'lch',
+        'oklab' and 'oklch'.
+    """
+    lrgb = srgb_to_linear_many(rgb)
+    xyz = (lrgb * 100) @ RGB_TO_XYZ.T
+    lab = xyz_to_lab_many(xyz)
+    oklab = linear_to_oklab_many(lrgb)
+    return {
+        'xyz': xyz,
+        'lab': lab,
+        'lch': _to_polar(lab),
+        'oklab': oklab,
+        'oklch': _to_polar(oklab),
+    }
+
+
+def oklab_to_weighted_many(oklab) -> np.ndarray:
+    """
+    Embed OKLab colors into a 4-dimensional space (L, a, b, C) scaled by the square
+    roots of `OKLAB_DISTANCE_WEIGHTS`, so that the plain Euclidean distance between
+    two embedded colors is exactly the weighted `oklab_distance` between them. This
+    is what allows weighted lookups to be served from a spatial index.
+    """
+    oklab = as_color_array(oklab)
+    chroma = np.hypot(oklab[..., 1], oklab[..., 2])
+    weights = np.sqrt([OKLAB_DISTANCE_WEIGHTS[k] for k in ('L', 'a', 'b', 'C')])
+    return np.concatenate([oklab, chroma[..., np.newaxis]], axis=-1) * weights
@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Hashable, Literal
+
+"""
+A bounded, thread-safe cache for color classification results.
+
+Values are stored as-is and handed back by reference on a hit, so only immutable
+values (strings, tuples, frozen objects) should be cached. Once the cache holds
+`maxsize` entries, inserting a new key evicts either the least recently used
+entry ('lru') or the least frequently used one ('lfu', ties broken by recency).
+
+Example:
+--------
+>>> cache = ColorCache(maxsize=2)
+>>> cache.set('ff0000', 'Vivid Red')
+>>> cache.get('ff0000')
+'Vivid Red'
+>>> cache.stats
+CacheStats(hits=1, misses=0, evictions=0, size=1, maxsize=2)
+"""
+
+type EvictionPolicy = Literal['lru', 'lfu']
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class ColorCache:
+    def __init__(self, maxsize: int = 4096, policy: EvictionPolicy = 'lru'):
+        if maxsize < 1:
+            raise ValueError('ColorCache maxsize must be a positive integer')
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f'Unknown cache eviction policy "{policy}"')
+        self._maxsize = maxsize
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        # LFU bookkeeping: access count per key and keys per access count (in recency order)
+        self._counts: dict[Hashable, int] = {}
+        self._buckets: defaultdict[int, OrderedDict[Hashable, None]] = defaultdict(OrderedDict)
+        self._min_count = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def policy(self) -> EvictionPolicy:
+        return self._policy
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._data),
+                maxsize=self._maxsize,
+            )
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: Hashable):
+        return key in self._data
+
+    def _touch(self, key: Hashable):
+        if self._policy == 'lru':
+            self._data.move_to_end(key)
+            return
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._counts[key] = count + 1
+        self._buckets[count + 1][key] = None
+
+    def _evict(self):
+        if self._policy == 'lru':
+            self._data.popitem(last=False)
+        else:
+            bucket = self._buckets[self._min_count]
+            key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_count]
+            del self._counts[key]
+            del self._data[key]
+        self._evictions += 1
+
+    def _discard(self, key: Hashable):
+        del self._data[key]
+        if self._policy == 'lfu':
+            count = self._counts.pop(key)
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+            self._min_count = min(self._buckets, default=0)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._touch(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            if key in self._data:
+                self._data[key] = value
+                self._touch(key)
+                return
+            if len(self._data) >= self._maxsize:
+                self._evict()
+            self._data[key] = value
+            if self._policy == 'lfu':
+                self._counts[key] = 1
+                self._buckets[1][key] = None
+                self._min_count = 1
+
+    def invalidate(self, key: Hashable | None = None):
+        """
+        Drop a single entry, or every entry when no key is given. Counters are kept.
+        """
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._counts.clear()
+                self._buckets.clear()
+                self._min_count = 0
+            elif key in self._data:
+                self._discard(key)
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
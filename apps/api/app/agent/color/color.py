@@ -1,14 +1,34 @@
-import re
 import math
 import colorsys
+import hashlib
+import json
+import os
 import numpy as np
-from decimal import ROUND_FLOOR, Decimal
+from functools import cache
 from typing import Any
 
+from app.agent.kv_store import KeyValueStore
+from app.agent.models.enums import ColorRange
 from app.agent.models.iscc_nbs_data import IsccNbsData
 
-from .constants import CIE_E, CIE_K, D65
+from .batch import (
+    lab_to_lch_many,
+    lch_to_rgb_many,
+    oklch_to_rgb_many,
+    rgb_to_hex_many,
+    rgb_to_oklab_many,
+    rgb_to_oklch_many,
+    rgb_to_xyz_many,
+    xyz_to_lab_many,
+    xyz_to_rgb_many,
+)
+from .cache import ColorCache
+from .constants import CIE_E, CIE_K, D65, OKLAB_DISTANCE_WEIGHTS
+from .distance import distance
 from .iscc_nbs_color_system import ISCC_NBS_COLORS, IBCC_NBS_CATEGORIES
+from .iscc_nbs_index import get_iscc_nbs_index
+from .iscc_nbs_lut import lookup_iscc_nbs_index
+from .parser import HEX_COLOR_RE, HEX_DIGITS_RE, parse_color, parse_hex
 
 """
 The Color class and most of the below supporting color utility functions only
@@ -29,13 +49,6 @@ type ColorValue = str | tuple[int | float] | list[int | float]
 Color Utility Functions
 """
 
-def decimalize(num: int | float):
-    if num < 0:
-        return 0
-    elif isinstance(num, float) and num <= 1.0000:
-        return num
-    return float(Decimal(num / 255).quantize(Decimal('0.000'), rounding=ROUND_FLOOR))
-
 def hex_to_rgb(hex_color: str) -> tuple[int]:
     """
     Convert a hex color string to RGB.
@@ -46,14 +59,7 @@ def hex_to_rgb(hex_color: str) -> tuple[int]:
     Returns:
         An tuple of RGB color values.
     """
-    value = hex_color.lstrip("#")
-    if len(value) == 3:
-        value = ''.join([c * 2 for c in value])
-    lv = len(value)
-    rgb = [int(value[i:i+lv//3], 16) for i in range(0, lv, lv // 3)]
-    if len(rgb) == 4:
-        rgb[3] = decimalize(rgb[3])
-    return tuple(rgb)
+    return parse_hex(hex_color)
 
 def rgb_to_hex(rgb: tuple[int]) -> str:
     """
@@ -72,18 +78,10 @@ def rgb_to_hex(rgb: tuple[int]) -> str:
     return '#' + ''.join(('%02x' % int(i) for i in rgb))
 
 def is_hex(c: Any) -> bool:
-    try:
-        return all(list(map(lambda n: int(n, 16) >= 0, c)))
-    except ValueError:
-        return False
+    return isinstance(c, str) and HEX_DIGITS_RE.fullmatch(c) is not None
 
 def is_hex_color(c: Any) -> bool:
-    if not isinstance(c, str) or not c.startswith('#'):
-        return False
-    hexc = c.strip('#')
-    if len(hexc) in [3, 4, 6, 8]:
-        return is_hex(hexc)
-    return False
+    return isinstance(c, str) and HEX_COLOR_RE.fullmatch(c) is not None
 
 def is_rgb(c: Any) -> bool:
     if not isinstance(c, (list, tuple)):
@@ -93,20 +91,16 @@ def is_rgb(c: Any) -> bool:
 def ensure_rgb(*args):
     color_value = args[0] if len(args) == 1 else args
 
-    if is_hex_color(color_value):
-        return hex_to_rgb(color_value)
-    # str_value = type(color_value)
-    # if isinstance(color_value, str):
-    #     str_value = color_value[0:3]
-    if isinstance(color_value, str) and color_value.startswith('rgb'):
-        match = re.search(r'\((.+?)\)', color_value)
-        if match:
-            color_value = tuple(int(val.strip()) for val in match.group(1).split(','))
-    if isinstance(color_value, (list, tuple)):
+    if isinstance(color_value, str):
+        try:
+            return parse_color(color_value)
+        except ValueError:
+            pass
+    elif isinstance(color_value, (list, tuple)):
         rgb = tuple(x for x in color_value if isinstance(x, (float | int)))
         if is_rgb(rgb):
             return rgb
-    raise Exception('Arguments to "ensure_rgb" must be a valid hex string, rgb string, or an iterable of integers.')
+    raise ValueError('Arguments to "ensure_rgb" must be a valid hex string, rgb string, or an iterable of integers.')
 
 def get_lightness(color: str | tuple[int]):
     """
@@ -163,60 +157,17 @@ def rgb_to_xyz(value):
     """
     Convert RGB color to XYZ color space.
     """
-    # Normalize RGB values to the range [0, 1]
-    rgb = np.array(value).astype(float)
-    rgb = rgb / 255.0
-    # Apply the inverse gamma correction
-    rgb = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
-    rgb *= 100  # Scale to [0, 100]
-
-    r, g, b = rgb
-    
-    # Convert RGB to XYZ
-    x = float(r * 0.4124564) + float(g * 0.3575761) + float(b * 0.1804375)
-    y = float(r * 0.2126729) + float(g * 0.7151522) + float(b * 0.0721750)
-    z = float(r * 0.0193339) + float(g * 0.1191920) + float(b * 0.9503041)
-    
-    return tuple([x, y, z])
+    return tuple(float(v) for v in rgb_to_xyz_many(value))
 
 def xyz_to_lab(xyz):
     """
     Convert XYZ color values to LAB color space.
     """
-    # Reference white point D65
-    ref_x = 95.047
-    ref_y = 100.000
-    ref_z = 108.883
-
-    x, y, z = xyz / np.array([ref_x, ref_y, ref_z])
-
-    # Apply the function for LAB
-    x = np.where(x > 0.008856, x ** (1/3), (x * 7.787) + (16 / 116))
-    y = np.where(y > 0.008856, y ** (1/3), (y * 7.787) + (16 / 116))
-    z = np.where(z > 0.008856, z ** (1/3), (z * 7.787) + (16 / 116))
-
-    L = float((116 * y) - 16)
-    a = float(500 * (x - y))
-    b = float(200 * (y - z))
-
-    return tuple([L, a, b])
+    return tuple(float(v) for v in xyz_to_lab_many(xyz))
 
 def lab_to_lch(lab):
-    L, a, b = lab
-
-    h = math.atan2(b, a)
-    if h > 0:
-        h = (h / math.pi) * 180.0
-    else:
-        h = 360 - (math.fabs(h) / math.pi) * 180.0
-    if h < 0:
-        h += 360.0
-    elif h >= 360:
-        h -= 360.0
-
-    c = math.sqrt(a * a + b * b)
-
-    return tuple([round(L, 2), round(c, 2), round(h, 2)])
+    L, c, h = lab_to_lch_many(lab)
+    return tuple([round(float(L), 2), round(float(c), 2), round(float(h), 2)])
 
 def lch_to_lab(lch):
     l, c, h = lch  # noqa: E741
@@ -241,26 +192,23 @@ def lab_to_xyz(lab):
 def lrgb_to_rgb(rgb):
     return tuple(map(lambda v: (np.sign(v) or 1) * (1.055 * pow(abs(v), 1 / 2.4) - 0.055) if abs(v) > 0.0031308 else v * 12.92, rgb))
     
-# def xyz_to_rgb(xyz):
-#     x, y, z = xyz
-
-#     rgb = (
-#         x * 3.2409699419045226 - y * 1.5373831775700939 - 0.4986107602930034 * z,
-#         x * -0.9692436362808796 + y * 1.8759675015077204 + 0.0415550574071756 * z,
-#         x * 0.0556300796969936 - y * 0.2039769588889765 + 1.0569715142428784 * z,
-#     )
-
-#     r, g, b = lrgb_to_rgb(rgb)
-
-#     r = max(min())
+def xyz_to_rgb(xyz):
+    """
+    Convert XYZ color values to RGB (clipped to the sRGB gamut).
+    """
+    return tuple(int(v) for v in np.rint(xyz_to_rgb_many(xyz)))
 
-#     return (r * 255, )
+def lch_to_hex(lch):
+    """
+    Convert LCH color values to a hexadecimal string (gamut mapped to sRGB).
+    """
+    return str(rgb_to_hex_many(lch_to_rgb_many(lch)))
 
-# def lch_to_hex(lch):
-#     lab = lch_to_lab(lch)
-#     xyz = lab_to_xyz(lab)
-#     rgb = xyz_to_rgb(xyz)
-#     return rgb_to_hex(rgb)
+def oklch_to_hex(oklch):
+    """
+    Convert OKLCH color values to a hexadecimal string (gamut mapped to sRGB).
+    """
+    return str(rgb_to_hex_many(oklch_to_rgb_many(oklch)))
 
 def to_lch(color):
     rgb = ensure_rgb(color)
@@ -280,28 +228,7 @@ def to_linear(c):
         return c/12.92 if c <= 0.04045 else ((c + 0.055)/1.055) ** 2.4
 
 def to_oklab(color):
-    r, g, b = [v / 255.0 for v in ensure_rgb(color)]
-
-    # Convert to OKLAB first (intermediate step)
-    # Implementation of RGB to OKLAB conversion
-    r, g, b = to_linear(r), to_linear(g), to_linear(b)
-
-    # Convert to LMS space
-    l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b  # noqa: E741
-    m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
-    s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
-
-    # Non-linear compression
-    l_ = pow(l, 1/3) if l > 0 else 0
-    m_ = pow(m, 1/3) if m > 0 else 0
-    s_ = pow(s, 1/3) if s > 0 else 0
-    
-    # OKLAB coordinates
-    L = 0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_
-    a = 1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_
-    b = 0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_
-
-    return (L, a, b)
+    return tuple(float(v) for v in rgb_to_oklab_many(ensure_rgb(color)[:3]))
     
 def to_oklch(color):
     """
@@ -310,15 +237,7 @@ def to_oklch(color):
     :param color: RGB color tuple
     :return: Tuple of (Lightness, Chroma, Hue)
     """
-    L, a, b = to_oklab(color)
-    
-    # Convert to OKLCH
-    chroma = math.sqrt(a**2 + b**2)
-    
-    # Convert hue to degrees, normalize to 0-360
-    hue = (math.degrees(math.atan2(b, a)) + 360) % 360
-    
-    return (L, chroma, hue)
+    return tuple(float(v) for v in rgb_to_oklch_many(ensure_rgb(color)[:3]))
 
 def oklab_distance(lab1, lab2):
     """
@@ -343,10 +262,10 @@ def oklab_distance(lab1, lab2):
     # abs_deltaL = abs(deltaL)
     
     # Base weights
-    wL = 2.0
-    wA = 4.0
-    wB = 4.0
-    wC = 3.0
+    wL = OKLAB_DISTANCE_WEIGHTS['L']
+    wA = OKLAB_DISTANCE_WEIGHTS['a']
+    wB = OKLAB_DISTANCE_WEIGHTS['b']
+    wC = OKLAB_DISTANCE_WEIGHTS['C']
 
     # Simple fixed weights that give appropriate importance 
     # to both lightness and chromatic components
@@ -381,15 +300,34 @@ def valid_color_format(color: str | tuple[int] | list[int]) -> bool:
     return is_hex_or_rgb(color) or is_oklch(color)
 
 
-def get_distance(color1: str | tuple[int] | list[int], color2: str | tuple[int] | list[int]):
+def get_distance(
+    color1: str | tuple[int] | list[int],
+    color2: str | tuple[int] | list[int],
+    metric: str = 'oklab',
+):
+    """
+    The distance between two colors. Any metric registered in `distance.METRICS`
+    ('oklab', 'cie76', 'cie94', 'ciede2000') can be used; for comparing many
+    colors at once, use `distance.pairwise` or `distance.nearest` instead.
+    """
     if not is_hex_or_rgb(color1):
         raise ValueError(f"Color value of {color1} must be a hexadecimal color string or iterable RGB or OKLCH value")
     if not is_hex_or_rgb(color2):
         raise ValueError(f"Color value of {color1} must be a hexadecimal color string or iterable RGB or OKLCH value")
-    return oklab_distance(to_oklab(color1), to_oklab(color2))
+    if metric == 'oklab':
+        return oklab_distance(to_oklab(color1), to_oklab(color2))
+    return distance(ensure_rgb(color1)[:3], ensure_rgb(color2)[:3], metric)
 
 
-ISCC_NBS_CACHE = {}
+"""
+Bounded cache of color -> ISCC-NBS category name, keyed by `color_cache_key`. Only the
+(immutable) category name is cached; the category's data is looked up once and a new
+`IsccNbsData` is built from it for each call of `get_iscc_nbs_category_data`.
+"""
+ISCC_NBS_CACHE = ColorCache(
+    maxsize=int(os.environ.get('ISCC_NBS_CACHE_MAXSIZE', 8192)),
+    policy=os.environ.get('ISCC_NBS_CACHE_POLICY', 'lru'),
+)
 
 def color_cache_key(color: str | tuple[int] | list[int]):
     hexcolor = color if is_hex_color(color) else rgb_to_hex(color)
@@ -399,63 +337,188 @@ def color_cache_key(color: str | tuple[int] | list[int]):
 def find_closest_iscc_nbs_color(color: str | tuple[int] | list[int]) -> str:
     """
     Find the closest ISCC-NBS color category for a given hex color.
-    Returns tuple of (category_name, category_hex, distance)
+    Returns the name of the category.
     """
-    min_distance = float('inf')
-    closest_match = None
+    if not is_hex_or_rgb(color):
+        raise ValueError(f"Color value of {color} must be a hexadecimal color string or iterable RGB value")
+    rgb = ensure_rgb(color)[:3]
+    index = get_iscc_nbs_index()
+    if all(float(v).is_integer() for v in rgb):
+        # 8-bit colors are answered straight from the precomputed lookup table
+        lut_index = lookup_iscc_nbs_index(tuple(int(v) for v in rgb))
+        if lut_index is not None:
+            return index.names[lut_index]
+    return index.nearest(rgb)
+
+
+@cache
+def _iscc_nbs_category_fields(iscc_nbs_category: str) -> tuple[tuple[ColorRange, ...], tuple[str, ...]]:
+    """
+    The (immutable) color ranges and analogous colors of an ISCC-NBS category, looked
+    up once per category.
+    """
+    color_agent_category_data = IBCC_NBS_CATEGORIES.get(iscc_nbs_category, {})
+    return (
+        tuple(color_agent_category_data.get('color_range', [])),
+        tuple(color_agent_category_data.get('analogous', [])),
+    )
 
-    for name, hex_value in ISCC_NBS_COLORS.items():
-        distance = get_distance(color, hex_value)
-        
-        if distance < min_distance:
-            min_distance = distance
-            closest_match = name
-    
-    return closest_match
+
+def get_iscc_nbs_category_data(iscc_nbs_category: str) -> IsccNbsData:
+    """
+    Get the Color Agent metadata for an ISCC-NBS category. Each call returns a new
+    instance, so a caller modifying it does not affect any other classification.
+    """
+    color_range, analogous = _iscc_nbs_category_fields(iscc_nbs_category)
+
+    return IsccNbsData(
+        iscc_nbs_category=iscc_nbs_category,
+        color_range=list(color_range),
+        analogous=list(analogous),
+    )
 
 
-def get_iscc_nbs_metadata(color: str | tuple[int] | list[int], uncache: bool = False):
+def get_iscc_nbs_metadata(color: str | tuple[int] | list[int]):
     if not is_hex_or_rgb(color):
         raise ValueError(f"Color value of {color} must be a hexadecimal color string or iterable RGB value")
 
     cache_key = color_cache_key(color)
-    if cache_key in ISCC_NBS_CACHE and not uncache:
-        return IsccNbsData.unserialize(ISCC_NBS_CACHE[cache_key])
+    iscc_nbc_name = ISCC_NBS_CACHE.get(cache_key)
 
-    iscc_nbc_name = find_closest_iscc_nbs_color(color, uncache)
+    if iscc_nbc_name is None and ISCC_NBS_STORE is not None:
+        iscc_nbc_name = ISCC_NBS_STORE.get(cache_key)
+        if iscc_nbc_name is not None:
+            ISCC_NBS_CACHE.set(cache_key, iscc_nbc_name)
 
-    color_agent_category_data = IBCC_NBS_CATEGORIES.get(iscc_nbc_name, {})
+    if iscc_nbc_name is None:
+        iscc_nbc_name = find_closest_iscc_nbs_color(color)
+        ISCC_NBS_CACHE.set(cache_key, iscc_nbc_name)
+        if ISCC_NBS_STORE is not None:
+            ISCC_NBS_STORE.set(cache_key, iscc_nbc_name)
 
-    iscc_nbs_data = IsccNbsData(
-        iscc_nbs_category=iscc_nbc_name,
-        color_range=color_agent_category_data.get('color_range', []),
-        analogous=color_agent_category_data.get('analogous', []),
-    )
+    return get_iscc_nbs_category_data(iscc_nbc_name)
 
-    ISCC_NBS_CACHE[cache_key] = iscc_nbs_data.serialize()
-    
-    return iscc_nbs_data
+
+def invalidate_iscc_nbs_cache(color: str | tuple[int] | list[int] | None = None):
+    """
+    Drop the cached classification of a single color, or of every color when
+    no color is given, from both the in-memory and the persistent cache.
+    """
+    cache_key = None if color is None else color_cache_key(color)
+    ISCC_NBS_CACHE.invalidate(cache_key)
+    if ISCC_NBS_STORE is not None:
+        if cache_key is None:
+            ISCC_NBS_STORE.clear()
+        else:
+            ISCC_NBS_STORE.delete(cache_key)
+
+
+"""
+Optional persistent (cross-run) store of color -> ISCC-NBS category name, shared by
+every locale and run. @see attach_iscc_nbs_store
+"""
+ISCC_NBS_STORE: KeyValueStore | None = None
+
+
+def iscc_nbs_cache_version() -> str:
+    """
+    Content hash of the data a cached classification depends on. Persistent caches
+    stamped with a different version are discarded.
+    """
+    payload = json.dumps({
+        'colors': list(ISCC_NBS_COLORS.items()),
+        'categories': IBCC_NBS_CATEGORIES,
+        'weights': OKLAB_DISTANCE_WEIGHTS,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def attach_iscc_nbs_store(store: KeyValueStore) -> int:
+    """
+    Use a persistent store as a second-level cache for color classifications and warm
+    the in-memory cache with its most recent entries.
+
+    Returns:
+        The number of entries loaded into the in-memory cache.
+    """
+    global ISCC_NBS_STORE
+    ISCC_NBS_STORE = store
+    warmed = 0
+    for cache_key, iscc_nbc_name in store.items(limit=ISCC_NBS_CACHE.maxsize):
+        ISCC_NBS_CACHE.set(cache_key, iscc_nbc_name)
+        warmed += 1
+    return warmed
+
+
+def detach_iscc_nbs_store():
+    global ISCC_NBS_STORE
+    if ISCC_NBS_STORE is not None:
+        ISCC_NBS_STORE.close()
+    ISCC_NBS_STORE = None
 
 
 class Color(object):
-    def __init__(self, color_value: ColorValue):
-        rgb = ensure_rgb(color_value)
-        self.value = rgb
-        self._format = 'rgb'
-        self._iscc_nbs_data = None
+    """
+    An immutable color value.
+
+    The color is parsed once on construction. Every derived representation (hex,
+    Lab, LCH, OKLab, OKLCH, HSL, lightness and ISCC-NBS metadata) is computed
+    lazily on first access and memoized on the instance, so repeated reads are
+    plain attribute lookups.
+
+    Example:
+    --------
+    >>> color = Color('#ff00ff')
+    >>> color.rgb
+    (255, 0, 255)
+    >>> color.oklch
+    (0.7017, 0.3225, 328.36)
+    """
+    __slots__ = (
+        '_rgb',
+        '_alpha',
+        '_hex',
+        '_hsl',
+        '_lab',
+        '_lch',
+        '_lightness',
+        '_oklab',
+        '_oklch',
+        '_iscc_nbs_data',
+    )
 
-        r, g, b = rgb
-        self.r = r
-        self.g = g
-        self.b = b
+    _LAZY_SLOTS = __slots__[2:]
 
+    def __init__(self, *color_value: ColorValue):
+        rgb = ensure_rgb(*color_value)
+        alpha = None
         if len(rgb) == 4:
-            self.alpha = rgb[:1]
+            alpha = 0.0 if rgb[3] < 0 else 1.0 if rgb[3] > 1 else float(rgb[3])
+
+        object.__setattr__(self, '_rgb', tuple(rgb[:3]))
+        object.__setattr__(self, '_alpha', alpha)
+        for slot in self._LAZY_SLOTS:
+            object.__setattr__(self, slot, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Cannot set "{name}": Color instances are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Cannot delete "{name}": Color instances are immutable')
+
+    def __reduce__(self):
+        return (Color, self.rgb)
+
+    def _memoize(self, slot: str, compute):
+        value = object.__getattribute__(self, slot)
+        if value is None:
+            value = compute()
+            object.__setattr__(self, slot, value)
+        return value
 
     @staticmethod
     def from_hex(hex_color):
-        rgb = hex_to_rgb(hex_color)
-        return Color(*rgb)
+        return Color(hex_color)
 
     @staticmethod
     def from_rgb(rgb):
@@ -479,47 +542,58 @@ class Color(object):
 
     @property
     def r(self):
-        return self._r
-
-    @r.setter
-    def r(self, r):
-        self._r = r
+        return self._rgb[0]
 
     @property
     def g(self):
-        return self._g
-
-    @g.setter
-    def g(self, g):
-        self._g = g
+        return self._rgb[1]
 
     @property
     def b(self):
-        return self._b
-
-    @b.setter
-    def b(self, b):
-        self._b = b
+        return self._rgb[2]
 
     @property
     def alpha(self):
-        try:
-            return self._alpha
-        except AttributeError:
-            return None
-
-    @alpha.setter
-    def alpha(self, value):
-        a = 0.0 if value < 0 else 1.0 if value > 1 else float(value)
-        self._alpha = a
+        return self._alpha
 
     @property
     def rgb(self):
-        return ensure_rgb(self.r, self.g, self.b, self.alpha)
+        return self._rgb if self._alpha is None else (*self._rgb, self._alpha)
 
     @property
     def lightness(self):
-        return get_lightness(self.rgb)
+        return self._memoize('_lightness', lambda: get_lightness(self._rgb))
+
+    @property
+    def hex(self):
+        return self._memoize('_hex', lambda: rgb_to_hex(self.rgb))
+
+    @property
+    def hsl(self):
+        return self._memoize('_hsl', lambda: colorsys.rgb_to_hls(*self._rgb))
+
+    @property
+    def lab(self):
+        return self._memoize('_lab', lambda: xyz_to_lab(rgb_to_xyz(self._rgb)))
+
+    @property
+    def lch(self):
+        return self._memoize('_lch', lambda: lab_to_lch(self.lab))
+
+    @property
+    def oklab(self):
+        return self._memoize('_oklab', lambda: to_oklab(self._rgb))
+
+    @property
+    def oklch(self):
+        def compute():
+            l, c, h = to_oklch(self._rgb)  # noqa: E741
+            return (round(l, 4), round(c, 4), round(h, 2))
+        return self._memoize('_oklch', compute)
+
+    @property
+    def iscc_nbs_data(self) -> IsccNbsData:
+        return self._memoize('_iscc_nbs_data', lambda: get_iscc_nbs_metadata(self._rgb))
 
     def clamp(self):
         return Color(clamp(self.r, 0, 255), clamp(self.g, 0, 255), clamp(self.b, 0, 255), self.alpha)
@@ -528,8 +602,7 @@ class Color(object):
         return Color(self.r * value, self.g * value, self.b * value, self.alpha)
 
     def mean(self, value):
-        if not isinstance(value, Color):
-            color = Color(value)
+        color = value if isinstance(value, Color) else Color(value)
         return mean_color(self.rgb, color.rgb)
 
     def sqrt(self):
@@ -540,124 +613,68 @@ class Color(object):
         return self.lightness > lightness2
 
     def to_hex(self):
-        self._format = 'hex'
-        self.value = rgb_to_hex(self.rgb)
-        return self.value
+        return self.hex
 
     def to_lab(self):
-        self._format = 'lab'
-        xyz = rgb_to_xyz(self.rgb)
-        lab = xyz_to_lab(xyz)
-        self.value = lab
-        return self.value
+        return self.lab
 
     def to_lch(self):
-        self._format = 'lch'
-        xyz = rgb_to_xyz(self.rgb)
-        lab = xyz_to_lab(xyz)
-        l, c, h = lab_to_lch(lab)  # noqa: E741
-        self.value = (round(l, 2), round(c, 2), round(h, 2))
-        return self.value
+        return self.lch
 
     def to_hsl(self):
-        self._format = 'hsl'
-        self.value = colorsys.rgb_to_hls(*self.rgb)
-        return self.value
+        return self.hsl
 
     def to_oklab(self):
-        self._format = 'oklab'
-        self.value = to_oklab(self.rgb)
-        return self.value
+        return self.oklab
 
     def to_oklch(self):
-        self._format = 'oklch'
-        l, c, h = to_oklch(self.rgb)  # noqa: E741
-        self.value = (round(l, 4), round(c, 4), round(h, 2))
-        return self.value
+        return self.oklch
 
     def getpercentages(*arr):
         return [float(c / 255 * 100) for c in arr]
 
-    # def get_distance(self, color_value: str | tuple[int] | list[int]):
-    #     if not is_hex_color(color_value) and not is_rgb(color_value):
-    #         raise Exception(f'Color value of {color_value} must be a hexadecimal color string or iterable RGB value')
-    #     return oklab_distance(self.to_oklab(), to_oklab(color_value))
-
-    def find_closest_iscc_nbs_color(self, uncache=False):
+    def find_closest_iscc_nbs_color(self):
         """
         Find the closest ISCC-NBS color category for a given hex color.
-        Returns tuple of (category_name, category_hex, distance)
+        Returns the name of the category.
         """
-        return find_closest_iscc_nbs_color(self.rgb)
-        # if self._iscc_nbs_data and not uncache:
-        #     return self._iscc_nbs_data
-    
-        # min_distance = float('inf')
-        # closest_match = None
-        # # closest_hex = None
-
-        # for name, hex_value in ISCC_NBS_COLORS.items():
-        #     distance = self.get_distance(hex_value)
-            
-        #     if distance < min_distance:
-        #         min_distance = distance
-        #         closest_match = name
-        
-        # return closest_match
+        return self.iscc_nbs_data.iscc_nbs_category
 
-    def get_iscc_nbs_metadata(self, uncache=False):
-        return get_iscc_nbs_metadata(self.rgb, uncache=uncache)
+    def get_iscc_nbs_metadata(self):
+        return self.iscc_nbs_data
 
     def get_color_category_data(self):
         """
         Deprecated - Use get_iscc_nbs_metadata() instead.
         """
-        return get_iscc_nbs_metadata(self.rgb, uncache=False)
+        return self.iscc_nbs_data
+
+    def _alpha_str(self):
+        return f' / {self.alpha}' if self.alpha is not None else ''
 
     def to_rgb_string(self):
-        alpha_str = f' / {self.alpha}' if self.alpha else ''
-        return f'rgb({self.r} {self.b} {self.b}{alpha_str})'
+        return f'rgb({self.r} {self.g} {self.b}{self._alpha_str()})'
 
     def to_oklch_string(self):
-        if self._format != 'oklch':
-            self.to_oklch()
-        l, c, h = self.value  # noqa: E741
-        alpha_str = f' / {self.alpha}' if self.alpha else ''
-
-        L = l * 100
-
-        return f'oklch({L}% {c} {h}{alpha_str})'
-
-    def format(self, frmt: str | None = None):
-        if not frmt:
-            frmt = self._format
+        l, c, h = self.oklch  # noqa: E741
+        L = round(l * 100, 2)
+        return f'oklch({L}% {c} {h}{self._alpha_str()})'
 
+    def format(self, frmt: str = 'rgb'):
         match frmt:
             case 'lch':
-                l, c, h = self.value  # noqa: E741
-                L = round(min(max(0, l * 100 if l <= 1 and isinstance(l, float) else l)), 2)
-                C = round(c, 2)
-                hue = h % 360
-                H = round(hue + 360 if hue < 0 else h, 2)
-                return f'lch({L}% {c} {H})'
+                l, c, h = self.lch  # noqa: E741
+                return f'lch({l}% {c} {h}{self._alpha_str()})'
             case 'oklch':
-                l, c, h = self.value  # noqa: E741
-                L = round(min(max(0, l / 100 if l > 0.0 else 0.00)), 2)
-                C = round(c, 4)
-                hue = h % 360
-                H = round(hue + 360 if hue < 0 else h, 2)
-                return f'oklch({L}% {C} {H})'
+                return self.to_oklch_string()
             case 'hex':
-                return self.value
+                return self.hex
             # case 'rgb':
             case _:
-                return f'rgb({self.r} {self.b} {self.b} / {self.alpha})' if self._alpha else f'rgb({self.r} {self.b} {self.b})'
+                return self.to_rgb_string()
 
     def to_dict(self):
-        iscc_nbs_data = self._iscc_nbs_data
-        if not self._iscc_nbs_data:
-            iscc_nbs_data = self.find_closest_iscc_nbs_color()
-        return iscc_nbs_data.to_dict()
+        return self.iscc_nbs_data.to_dict()
 
     def __mul__(self, color):
         if isinstance(color, Color):
@@ -669,5 +686,16 @@ class Color(object):
             return Color(self.r + color.r, self.g + color.g, self.b + color.b, self.alpha)
         return Color(self.r + color, self.g + color, self.b + color, self.alpha)
 
+    def __eq__(self, other):
+        if not isinstance(other, Color):
+            return NotImplemented
+        return self.rgb == other.rgb
+
+    def __hash__(self):
+        return hash(self.rgb)
+
+    def __repr__(self):
+        return f'Color({self.hex!r})'
+
     def __str__(self):
         return self.format('rgb')
@@ -19,3 +19,12 @@ HUE_ANGLES = {
         'oklch': 344,
     },
 }
+
+# Weights applied to the OKLab lightness, red-green, blue-yellow and chroma deltas
+# when measuring the distance between two colors (@see color.oklab_distance).
+OKLAB_DISTANCE_WEIGHTS = {
+    'L': 2.0,
+    'a': 4.0,
+    'b': 4.0,
+    'C': 3.0,
+}
@@ -0,0 +1,116 @@
+import numpy as np
+
+from .batch import as_color_array, srgb_to_linear_many
+
+"""
+Text contrast over colors, for choosing legible label colors.
+
+- WCAG 2.x: relative luminance `Y` from linearized sRGB and the contrast ratio
+  `(Y1 + 0.05) / (Y2 + 0.05)` (from 1:1 to 21:1, symmetric).
+- APCA (0.0.98G-4g): the lightness contrast `Lc` of text over a background (from
+  about -108 to 106, polarity-aware; negative values are light text on a dark
+  background). See https://github.com/Myndex/apca-w3
+
+Every function takes `(..., 3)` RGB arrays and computes all colors at once.
+
+Example:
+--------
+>>> wcag_contrast_many([[255, 255, 255]], [[0, 0, 0]])
+array([21.])
+>>> apca_contrast_many([[0, 0, 0]], [[255, 255, 255]]).round(1)
+array([106.])
+"""
+
+WHITE = np.array([255.0, 255.0, 255.0])
+BLACK = np.array([0.0, 0.0, 0.0])
+
+# Rec. 709 luminance coefficients
+LUMINANCE_COEFFICIENTS = np.array([0.2126, 0.7152, 0.0722])
+
+# APCA 0.0.98G-4g constants
+APCA_TRC = 2.4
+APCA_COEFFICIENTS = np.array([0.2126729, 0.7151522, 0.0721750])
+APCA_NORM_BG = 0.56
+APCA_NORM_TXT = 0.57
+APCA_REV_TXT = 0.62
+APCA_REV_BG = 0.65
+APCA_BLACK_THRESHOLD = 0.022
+APCA_BLACK_CLAMP = 1.414
+APCA_SCALE = 1.14
+APCA_LOW_OFFSET = 0.027
+APCA_LOW_CLIP = 0.1
+APCA_DELTA_Y_MIN = 0.0005
+
+
+def relative_luminance_many(rgb) -> np.ndarray:
+    """
+    The WCAG relative luminance (0 to 1) of RGB colors.
+    """
+    return srgb_to_linear_many(rgb) @ LUMINANCE_COEFFICIENTS
+
+
+def wcag_contrast_many(rgb1, rgb2) -> np.ndarray:
+    """
+    The WCAG 2.x contrast ratio between two (broadcastable) arrays of RGB colors.
+    """
+    y1 = relative_luminance_many(rgb1)
+    y2 = relative_luminance_many(rgb2)
+    return (np.maximum(y1, y2) + 0.05) / (np.minimum(y1, y2) + 0.05)
+
+
+def apca_luminance_many(rgb) -> np.ndarray:
+    """
+    The APCA screen luminance of RGB colors, with the soft clamp for near-black applied.
+    """
+    y = (as_color_array(rgb) / 255.0) ** APCA_TRC @ APCA_COEFFICIENTS
+    return np.where(y > APCA_BLACK_THRESHOLD, y, y + np.abs(APCA_BLACK_THRESHOLD - y) ** APCA_BLACK_CLAMP)
+
+
+def apca_contrast_many(text_rgb, background_rgb) -> np.ndarray:
+    """
+    The APCA lightness contrast (Lc) of text colors over background colors (broadcastable).
+
+    Returns:
+        Positive values for dark text on a light background and negative values for
+        light text on a dark background. Contrasts too low to matter are 0.
+    """
+    text = apca_luminance_many(text_rgb)
+    background = apca_luminance_many(background_rgb)
+    text, background = np.broadcast_arrays(text, background)
+
+    normal = background > text
+    with np.errstate(invalid='ignore'):
+        sapc = np.where(
+            normal,
+            (background ** APCA_NORM_BG - text ** APCA_NORM_TXT) * APCA_SCALE,
+            (background ** APCA_REV_BG - text ** APCA_REV_TXT) * APCA_SCALE,
+        )
+    lc = np.where(
+        normal,
+        np.where(sapc < APCA_LOW_CLIP, 0.0, sapc - APCA_LOW_OFFSET),
+        np.where(sapc > -APCA_LOW_CLIP, 0.0, sapc + APCA_LOW_OFFSET),
+    )
+    return np.where(np.abs(background - text) < APCA_DELTA_Y_MIN, 0.0, lc * 100)
+
+
+def label_contrast_many(rgb) -> dict[str, np.ndarray]:
+    """
+    The contrast of white and black text over each color, in one pass.
+
+    Args:
+        rgb: An `(N, 3)` array of background RGB colors.
+
+    Returns:
+        A dictionary of `(N,)` arrays: 'luminance' (WCAG relative luminance),
+        'contrast_white' and 'contrast_black' (WCAG ratios), 'apca_white' and
+        'apca_black' (APCA Lc of white and black text over the color).
+    """
+    rgb = as_color_array(rgb).reshape(-1, 3)
+    luminance = relative_luminance_many(rgb)
+    return {
+        'luminance': luminance,
+        'contrast_white': 1.05 / (luminance + 0.05),
+        'contrast_black': (luminance + 0.05) / 0.05,
+        'apca_white': apca_contrast_many(WHITE, rgb),
+        'apca_black': apca_contrast_many(BLACK, rgb),
+    }
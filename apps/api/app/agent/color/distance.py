@@ -0,0 +1,324 @@
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from .batch import as_color_array, oklab_to_weighted_many, rgb_to_lab_many, rgb_to_oklab_many
+from .parser import parse_many
+
+"""
+Vectorized color-difference metrics.
+
+Every metric compares two arrays of colors in its own color space (CIELAB for the
+CIE formulas, OKLab for the weighted OKLab metric), broadcasting over the leading
+axes just like the conversions in `batch.py`. Metrics are registered by name in
+`METRICS`, so callers (classification, paint matching, QA jobs) select one with a
+string instead of rewriting their loops:
+
+- 'cie76':     Euclidean distance in CIELAB (ΔE*ab)
+- 'cie94':     CIE 1994 (graphic arts weighting); not symmetric, `a` is the reference
+- 'ciede2000': CIEDE2000
+- 'oklab':     The weighted OKLab distance used for ISCC-NBS classification
+
+`pairwise` builds a full distance matrix and `nearest` finds the k closest colors,
+both working through `B` in chunks of rows so memory stays bounded no matter how
+large the inputs are.
+
+Example:
+--------
+>>> swatches = ['#ff0000', '#00ff00', '#0000ff']
+>>> pairwise(swatches, metric='ciede2000').shape
+(3, 3)
+>>> distances, indices = nearest(['#fe0101'], swatches, k=1)
+>>> indices
+array([[0]])
+"""
+
+type ColorSpace = Literal['lab', 'oklab']
+
+# Upper bound on the number of color pairs compared per vectorized step
+MAX_CHUNK_PAIRS = 1 << 21
+
+
+def delta_e_76(lab1, lab2) -> np.ndarray:
+    """
+    CIE76 color difference (Euclidean distance in CIELAB).
+    """
+    diff = as_color_array(lab1) - as_color_array(lab2)
+    return np.sqrt(np.einsum('...i,...i->...', diff, diff))
+
+
+def delta_e_94(lab1, lab2, kL: float = 1.0, K1: float = 0.045, K2: float = 0.015) -> np.ndarray:
+    """
+    CIE94 color difference, with `lab1` as the reference color. The default
+    constants are the graphic arts ones (use kL=2, K1=0.048, K2=0.014 for textiles).
+    """
+    lab1 = as_color_array(lab1)
+    lab2 = as_color_array(lab2)
+    L1, a1, b1 = np.moveaxis(lab1, -1, 0)
+    L2, a2, b2 = np.moveaxis(lab2, -1, 0)
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    dL = L1 - L2
+    dC = C1 - C2
+    # ΔH² = Δa² + Δb² - ΔC² (can dip slightly below zero from rounding)
+    dH_sq = np.maximum((a1 - a2) ** 2 + (b1 - b2) ** 2 - dC ** 2, 0.0)
+
+    SC = 1.0 + K1 * C1
+    SH = 1.0 + K2 * C1
+    return np.sqrt((dL / kL) ** 2 + (dC / SC) ** 2 + dH_sq / SH ** 2)
+
+
+def delta_e_2000(lab1, lab2, kL: float = 1.0, kC: float = 1.0, kH: float = 1.0) -> np.ndarray:
+    """
+    CIEDE2000 color difference.
+    @see https://hajim.rochester.edu/ece/sites/gsharma/ciede2000/ciede2000noteCRNA.pdf
+    """
+    lab1 = as_color_array(lab1)
+    lab2 = as_color_array(lab2)
+    L1, a1, b1 = np.moveaxis(lab1, -1, 0)
+    L2, a2, b2 = np.moveaxis(lab2, -1, 0)
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    C_bar7 = C_bar ** 7
+    G = 0.5 * (1 - np.sqrt(C_bar7 / (C_bar7 + 25.0 ** 7)))
+
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+
+    chroma_product = C1p * C2p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dhp = np.where(chroma_product == 0, 0.0, dhp)
+    dHp = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dhp) / 2)
+
+    Lp_bar = (L1 + L2) / 2
+    Cp_bar = (C1p + C2p) / 2
+
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        np.abs(h1p - h2p) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2),
+    )
+    hp_bar = np.where(chroma_product == 0, h_sum, hp_bar)
+
+    T = (
+        1
+        - 0.17 * np.cos(np.radians(hp_bar - 30))
+        + 0.24 * np.cos(np.radians(2 * hp_bar))
+        + 0.32 * np.cos(np.radians(3 * hp_bar + 6))
+        - 0.20 * np.cos(np.radians(4 * hp_bar - 63))
+    )
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    Cp_bar7 = Cp_bar ** 7
+    RC = 2 * np.sqrt(Cp_bar7 / (Cp_bar7 + 25.0 ** 7))
+    Lp_offset = (Lp_bar - 50) ** 2
+    SL = 1 + (0.015 * Lp_offset) / np.sqrt(20 + Lp_offset)
+    SC = 1 + 0.045 * Cp_bar
+    SH = 1 + 0.015 * Cp_bar * T
+    RT = -np.sin(np.radians(2 * d_theta)) * RC
+
+    dL_term = dLp / (kL * SL)
+    dC_term = dCp / (kC * SC)
+    dH_term = dHp / (kH * SH)
+    return np.sqrt(dL_term ** 2 + dC_term ** 2 + dH_term ** 2 + RT * dC_term * dH_term)
+
+
+def oklab_weighted_distance(oklab1, oklab2) -> np.ndarray:
+    """
+    The weighted OKLab distance (see `color.oklab_distance`) over arrays of colors.
+    """
+    diff = oklab_to_weighted_many(oklab1) - oklab_to_weighted_many(oklab2)
+    return np.sqrt(np.einsum('...i,...i->...', diff, diff))
+
+
+@dataclass(frozen=True)
+class DistanceMetric:
+    """
+    A named color-difference function and the color space its inputs are in.
+
+    `embed` is set for metrics that are plain Euclidean distances once their
+    inputs are mapped through it, which lets `pairwise` compute whole blocks with
+    a single matrix product.
+    """
+    name: str
+    space: ColorSpace
+    func: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    embed: Callable[[np.ndarray], np.ndarray] | None = None
+
+
+METRICS: dict[str, DistanceMetric] = {
+    'cie76': DistanceMetric('cie76', 'lab', delta_e_76, embed=as_color_array),
+    'cie94': DistanceMetric('cie94', 'lab', delta_e_94),
+    'ciede2000': DistanceMetric('ciede2000', 'lab', delta_e_2000),
+    'oklab': DistanceMetric('oklab', 'oklab', oklab_weighted_distance, embed=oklab_to_weighted_many),
+}
+
+SPACE_CONVERTERS: dict[ColorSpace, Callable[[np.ndarray], np.ndarray]] = {
+    'lab': rgb_to_lab_many,
+    'oklab': rgb_to_oklab_many,
+}
+
+
+def get_metric(metric: str | DistanceMetric) -> DistanceMetric:
+    if isinstance(metric, DistanceMetric):
+        return metric
+    try:
+        return METRICS[metric]
+    except KeyError:
+        raise ValueError(f'Unknown distance metric "{metric}". Available: {", ".join(METRICS)}') from None
+
+
+def register_metric(metric: DistanceMetric):
+    """
+    Make a custom metric available by name to `pairwise`, `nearest` and `distance`.
+    """
+    if metric.space not in SPACE_CONVERTERS:
+        raise ValueError(f'Unsupported color space "{metric.space}" for metric "{metric.name}"')
+    METRICS[metric.name] = metric
+
+
+def to_metric_space(colors, metric: str | DistanceMetric = 'oklab') -> np.ndarray:
+    """
+    Convert colors (hex/rgb strings, RGB tuples or an RGB array) into the color
+    space of `metric`, as an `(N, 3)` float64 array.
+    """
+    metric = get_metric(metric)
+    if isinstance(colors, np.ndarray) and colors.dtype.kind in 'uif':
+        rgb = as_color_array(colors).reshape(-1, 3)
+    else:
+        rgb = parse_many(colors)
+    return SPACE_CONVERTERS[metric.space](rgb)
+
+
+def distance(color1, color2, metric: str | DistanceMetric = 'oklab') -> float:
+    """
+    The distance between two individual colors using any registered metric.
+    """
+    metric = get_metric(metric)
+    a, b = to_metric_space([color1, color2], metric)
+    return float(metric.func(a, b))
+
+
+def _chunk_rows(n_cols: int, chunk_size: int | None) -> int:
+    if chunk_size:
+        return max(1, chunk_size)
+    return max(1, MAX_CHUNK_PAIRS // max(1, n_cols))
+
+
+def _prepare(A, B, metric: DistanceMetric, convert: bool) -> tuple[np.ndarray, np.ndarray]:
+    if convert:
+        A = to_metric_space(A, metric)
+        B = A if B is None else to_metric_space(B, metric)
+    else:
+        A = as_color_array(A).reshape(-1, 3)
+        B = A if B is None else as_color_array(B).reshape(-1, 3)
+    return A, B
+
+
+def iter_pairwise(
+    A,
+    B=None,
+    metric: str | DistanceMetric = 'oklab',
+    chunk_size: int | None = None,
+    convert: bool = True,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Yield the distance matrix between `A` and `B` one block of rows at a time.
+
+    Args:
+        A: Colors to compare (anything accepted by `to_metric_space`).
+        B: Colors to compare against. Defaults to `A`.
+        metric: The name of a registered metric (or a `DistanceMetric`).
+        chunk_size: Rows of `A` per block. Defaults to a size bounded by `MAX_CHUNK_PAIRS`.
+        convert: Set to False when `A` and `B` are already in the metric's color space.
+
+    Yields:
+        Tuples of (first row index, `(rows, len(B))` block of distances).
+    """
+    metric = get_metric(metric)
+    A, B = _prepare(A, B, metric, convert)
+    rows = _chunk_rows(len(B), chunk_size)
+
+    if metric.embed is not None:
+        # Euclidean in the embedded space: |a - b|² = |a|² - 2a·b + |b|²
+        EA = metric.embed(A)
+        EB = metric.embed(B)
+        EB_sq = np.einsum('ij,ij->i', EB, EB)
+        for start in range(0, len(EA), rows):
+            block = EA[start:start + rows]
+            sq = np.einsum('ij,ij->i', block, block)[:, None] - 2 * (block @ EB.T) + EB_sq
+            yield start, np.sqrt(np.maximum(sq, 0.0))
+    else:
+        for start in range(0, len(A), rows):
+            block = A[start:start + rows]
+            yield start, metric.func(block[:, None, :], B[None, :, :])
+
+
+def pairwise(
+    A,
+    B=None,
+    metric: str | DistanceMetric = 'oklab',
+    chunk_size: int | None = None,
+    convert: bool = True,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    The full `(len(A), len(B))` distance matrix between two sets of colors,
+    computed in chunks (see `iter_pairwise`). Pass `dtype=np.float32` to halve the
+    size of very large matrices.
+    """
+    metric = get_metric(metric)
+    A, B = _prepare(A, B, metric, convert)
+    out = np.empty((len(A), len(B)), dtype=dtype)
+    for start, block in iter_pairwise(A, B, metric, chunk_size, convert=False):
+        out[start:start + len(block)] = block
+    return out
+
+
+def nearest(
+    A,
+    B,
+    k: int = 1,
+    metric: str | DistanceMetric = 'oklab',
+    chunk_size: int | None = None,
+    convert: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the `k` closest colors in `B` for every color in `A` without ever holding
+    the full distance matrix in memory.
+
+    Returns:
+        A tuple of `(len(A), k)` arrays: the distances (ascending) and the matching
+        indices into `B`.
+    """
+    metric = get_metric(metric)
+    A, B = _prepare(A, B, metric, convert)
+    k = min(k, len(B))
+    distances = np.empty((len(A), k), dtype=np.float64)
+    indices = np.empty((len(A), k), dtype=np.intp)
+
+    for start, block in iter_pairwise(A, B, metric, chunk_size, convert=False):
+        if k < block.shape[1]:
+            part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(block.shape[1]), block.shape).copy()
+        part_distances = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(part_distances, axis=1, kind='stable')
+        stop = start + len(block)
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        distances[start:stop] = np.take_along_axis(part_distances, order, axis=1)
+
+    return distances, indices
+
@@ -0,0 +1,76 @@
+from functools import cache
+
+import numpy as np
+
+from .batch import oklab_to_weighted_many, rgb_to_oklab_many
+from .iscc_nbs_color_system import ISCC_NBS_COLORS
+from .kdtree import KDTree
+
+"""
+Nearest ISCC-NBS category lookups served from a spatial index.
+
+The representative hex value of every ISCC-NBS category is parsed and converted
+to OKLab exactly once, embedded into the weighted (L, a, b, C) space used by
+`oklab_distance` (@see batch.oklab_to_weighted_many), and stored in a k-d tree.
+Classifying a color then costs a single conversion and a sub-linear tree search
+instead of one `get_distance` call per category.
+"""
+
+
+def hex_palette_to_rgb(hex_values) -> np.ndarray:
+    """
+    Parse an iterable of 6-digit hexadecimal color strings into an `(N, 3)` uint8 array.
+    """
+    return np.array(
+        [np.frombuffer(bytes.fromhex(value.lstrip('#')), dtype=np.uint8) for value in hex_values],
+        dtype=np.uint8,
+    ).reshape(-1, 3)
+
+
+class IsccNbsIndex:
+    def __init__(self, colors: dict[str, str] = ISCC_NBS_COLORS):
+        self._names = list(colors.keys())
+        self._rgb = hex_palette_to_rgb(colors.values())
+        self._points = oklab_to_weighted_many(rgb_to_oklab_many(self._rgb))
+        self._tree = KDTree(self._points, leaf_size=8)
+
+    @property
+    def names(self) -> list[str]:
+        return self._names
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        The weighted OKLab embedding of every category, in the order of `names`.
+        """
+        return self._points
+
+    def nearest_index(self, rgb) -> int:
+        """
+        Get the index (into `names`) of the closest category to an RGB color.
+        """
+        _, index = self._tree.query(oklab_to_weighted_many(rgb_to_oklab_many(rgb)), k=1)
+        return int(index[0])
+
+    def nearest(self, rgb) -> str:
+        """
+        Get the name of the closest ISCC-NBS category to an RGB color.
+        """
+        return self._names[self.nearest_index(rgb)]
+
+    def nearest_many(self, rgb) -> np.ndarray:
+        """
+        Get the index (into `names`) of the closest category for each color in
+        an `(N, 3)` array of RGB colors.
+        """
+        points = oklab_to_weighted_many(rgb_to_oklab_many(rgb)).reshape(-1, 4)
+        _, indices = self._tree.query(points, k=1)
+        return indices[:, 0]
+
+
+@cache
+def get_iscc_nbs_index() -> IsccNbsIndex:
+    """
+    Lazily build the shared ISCC-NBS index on first use.
+    """
+    return IsccNbsIndex()
@@ -0,0 +1,276 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .batch import oklab_to_weighted_many, rgb_to_oklab_many
+from .constants import OKLAB_DISTANCE_WEIGHTS
+from .iscc_nbs_color_system import ISCC_NBS_COLORS
+from .iscc_nbs_index import get_iscc_nbs_index
+
+"""
+Precomputed 24-bit RGB -> ISCC-NBS category lookup table.
+
+Paint colors are 8-bit sRGB, so the whole input domain is 256^3 (~16.7M) values.
+The nearest ISCC-NBS category (an index into `ISCC_NBS_COLORS`) of every one of
+them is precomputed into a flat uint16 table (32 MiB) that is memory-mapped
+from disk, turning classification into a single array read.
+
+The table's filename embeds a content hash of `ISCC_NBS_COLORS` and the distance
+weights, so editing either one makes the old table unreachable; the stale table is
+removed when the new one is built.
+
+Building the table takes tens of seconds, so it is never built implicitly on first
+use (unless `ISCC_NBS_LUT_AUTOBUILD` is set) and never while a caller waits: until it
+exists, colors are classified with the k-d tree. It is built as an explicit step,
+either in the background by the agent at startup (@see App.warm_caches) or with:
+
+    python -m app.agent.color.iscc_nbs_lut
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump whenever the layout of the table or the way it is computed changes
+ISCC_NBS_LUT_VERSION = 1
+
+# Directory of the table (`lut` under `fs.cachedir` by default, @see configure_iscc_nbs_lut)
+ISCC_NBS_LUT_DIR = os.environ.get('ISCC_NBS_LUT_DIR')
+
+# Build the table on first use when no up-to-date table is found on disk
+ISCC_NBS_LUT_AUTOBUILD = os.environ.get('ISCC_NBS_LUT_AUTOBUILD', '0') != '0'
+
+LUT_SIZE = 1 << 24
+LUT_DTYPE = np.uint16
+
+
+def iscc_nbs_data_hash() -> str:
+    """
+    Content hash of everything the table depends on.
+    """
+    payload = json.dumps({
+        'version': ISCC_NBS_LUT_VERSION,
+        'colors': list(ISCC_NBS_COLORS.items()),
+        'weights': OKLAB_DISTANCE_WEIGHTS,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_lut_lock = threading.Lock()
+_lut_dir: str | None = ISCC_NBS_LUT_DIR
+_lut: np.memmap | None = None
+_lut_loaded = False
+_lut_building = False
+
+
+def default_lut_dir() -> str:
+    # Imported here as the configuration package imports the models, which import this package
+    from app.agent.configuration.filesystem import fs_config
+    return os.path.join(fs_config['cachedir'], 'lut')
+
+
+def get_lut_dir() -> str:
+    return _lut_dir or default_lut_dir()
+
+
+def configure_iscc_nbs_lut(lut_dir: str):
+    """
+    Set the directory the table is read from (and built in), e.g. from the app's
+    `fs.cachedir`. A table already loaded from another directory is dropped.
+    """
+    global _lut_dir, _lut, _lut_loaded
+    with _lut_lock:
+        if lut_dir != _lut_dir:
+            _lut_dir = lut_dir
+            _lut = None
+            _lut_loaded = False
+
+
+def get_lut_path(digest: str | None = None, lut_dir: str | None = None) -> str:
+    digest = digest or iscc_nbs_data_hash()
+    return os.path.join(lut_dir or get_lut_dir(), f'iscc_nbs_lut-{digest[:16]}.u16')
+
+
+def rgb_to_lut_index(rgb) -> np.ndarray | int:
+    """
+    Pack 8-bit RGB values into their 24-bit table offset (0xRRGGBB).
+    """
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    index = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    return int(index) if index.ndim == 0 else index
+
+
+def lut_index_to_rgb(index) -> np.ndarray:
+    """
+    Unpack 24-bit table offsets back into an `(N, 3)` uint8 array of RGB values.
+    """
+    index = np.asarray(index, dtype=np.uint32)
+    return np.stack([(index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF], axis=-1).astype(np.uint8)
+
+
+def build_iscc_nbs_lut(path: str | None = None, chunk_size: int = 1 << 16) -> str:
+    """
+    Compute the nearest category for every 24-bit RGB value and write the table
+    to disk. The table is written to a temporary file and moved into place once
+    complete, so concurrent readers never observe a partial table.
+
+    Args:
+        path: Where to write the table. Defaults to the hashed path in the table directory.
+        chunk_size: Number of RGB values classified per vectorized step.
+
+    Returns:
+        The path of the written table.
+    """
+    path = path or get_lut_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    palette = get_iscc_nbs_index().points
+    palette_sq = np.einsum('ij,ij->i', palette, palette)
+
+    # A unique temporary file, so concurrent builds (in other processes) never write to
+    # (and truncate) each other's table
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        table = np.memmap(tmp_path, dtype=LUT_DTYPE, mode='w+', shape=(LUT_SIZE,))
+        try:
+            for start in range(0, LUT_SIZE, chunk_size):
+                offsets = np.arange(start, min(start + chunk_size, LUT_SIZE), dtype=np.uint32)
+                points = oklab_to_weighted_many(rgb_to_oklab_many(lut_index_to_rgb(offsets)))
+                # Squared Euclidean distance to every category, expanded to a matrix product
+                distances = palette_sq - 2 * (points @ palette.T)
+                table[start:start + len(offsets)] = np.argmin(distances, axis=1)
+            table.flush()
+        finally:
+            del table
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Remove tables built from outdated color data
+    for stale in glob.glob(os.path.join(os.path.dirname(path), 'iscc_nbs_lut-*.u16')):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    return path
+
+
+def load_iscc_nbs_lut(build: bool = ISCC_NBS_LUT_AUTOBUILD, lut_dir: str | None = None) -> np.memmap | None:
+    """
+    Memory-map the lookup table for the current ISCC-NBS data, building it first
+    if it is missing and `build` is set.
+
+    Returns:
+        The read-only table, or None if it is unavailable.
+    """
+    path = get_lut_path(lut_dir=lut_dir)
+    if not os.path.isfile(path):
+        if not build:
+            LOGGER.info(
+                'No ISCC-NBS lookup table at "%s", colors are classified with the k-d tree '
+                '(build it with `python -m app.agent.color.iscc_nbs_lut`)',
+                path,
+            )
+            return None
+        LOGGER.info('Building ISCC-NBS lookup table at "%s"', path)
+        try:
+            build_iscc_nbs_lut(path)
+        except OSError as exc:
+            LOGGER.warning('Unable to build ISCC-NBS lookup table: %s', exc)
+            return None
+    return np.memmap(path, dtype=LUT_DTYPE, mode='r', shape=(LUT_SIZE,))
+
+
+def get_iscc_nbs_lut() -> np.memmap | None:
+    """
+    The shared lookup table, loaded on first use (@see prepare_iscc_nbs_lut). Never
+    waits for a build: None is returned while the table is being built.
+    """
+    global _lut, _lut_loaded
+    if _lut_loaded or _lut_building:
+        return _lut
+    with _lut_lock:
+        if _lut_loaded or _lut_building:
+            return _lut
+        _lut = load_iscc_nbs_lut(build=False)
+        _lut_loaded = True
+    if _lut is None and ISCC_NBS_LUT_AUTOBUILD:
+        start_iscc_nbs_lut_build()
+    return _lut
+
+
+def prepare_iscc_nbs_lut(build: bool = True) -> np.memmap | None:
+    """
+    Load the shared lookup table, building it first if it is missing and `build` is
+    set. Only one thread builds the table at a time; others calling this meanwhile get
+    None (as do readers, which fall back to the k-d tree) rather than waiting.
+
+    Returns:
+        The table, or None if it is unavailable (e.g., it could not be written).
+    """
+    global _lut, _lut_loaded, _lut_building
+    with _lut_lock:
+        if _lut is not None or _lut_building:
+            return _lut
+        lut_dir = get_lut_dir()
+        path = get_lut_path(lut_dir=lut_dir)
+        if not build or os.path.isfile(path):
+            _lut = load_iscc_nbs_lut(build=False)
+            _lut_loaded = True
+            return _lut
+        _lut_building = True
+
+    # Built outside the lock (into a temporary file), which is only taken again to
+    # swap the finished table in
+    LOGGER.info('Building ISCC-NBS lookup table at "%s"', path)
+    table = None
+    try:
+        build_iscc_nbs_lut(path)
+        table = np.memmap(path, dtype=LUT_DTYPE, mode='r', shape=(LUT_SIZE,))
+    except OSError as exc:
+        LOGGER.warning('Unable to build ISCC-NBS lookup table: %s', exc)
+    finally:
+        with _lut_lock:
+            _lut_building = False
+            # Unless the table was moved meanwhile (@see configure_iscc_nbs_lut)
+            if get_lut_dir() == lut_dir:
+                _lut = table
+                _lut_loaded = True
+    return table
+
+
+def start_iscc_nbs_lut_build() -> threading.Thread:
+    """
+    Load (or build) the shared lookup table in a background thread. The thread is not a
+    daemon, so an exiting process finishes the build rather than abandoning it.
+    """
+    thread = threading.Thread(target=prepare_iscc_nbs_lut, name='iscc-nbs-lut-build')
+    thread.start()
+    return thread
+
+
+def lookup_iscc_nbs_index(rgb) -> int | np.ndarray | None:
+    """
+    Look up the category index (into `ISCC_NBS_COLORS`) of one or more 8-bit RGB
+    colors. Returns None if the table is unavailable.
+    """
+    table = get_iscc_nbs_lut()
+    if table is None:
+        return None
+    found = table[rgb_to_lut_index(rgb)]
+    return int(found) if np.ndim(found) == 0 else np.asarray(found, dtype=np.intp)
+
+
+if __name__ == '__main__':
+    print(build_iscc_nbs_lut())
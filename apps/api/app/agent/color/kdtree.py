@@ -0,0 +1,172 @@
+import heapq
+
+import numpy as np
+
+"""
+A small, dependency-free k-d tree over NumPy arrays.
+
+Points are partitioned recursively along their widest dimension until a node
+holds no more than `leaf_size` points. Every node keeps its bounding box so a
+query can skip any subtree whose box is farther away than the current k-th best
+match. Leaves are scanned with vectorized NumPy operations, so the Python-level
+work per query is proportional to the depth of the tree rather than the number
+of points.
+
+Example:
+--------
+>>> tree = KDTree(np.random.rand(1000, 3))
+>>> distances, indices = tree.query([0.5, 0.5, 0.5], k=5)
+>>> indices = tree.query_radius([0.5, 0.5, 0.5], r=0.1)
+"""
+
+
+class KDTree:
+    def __init__(self, points, leaf_size: int = 16):
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2:
+            raise ValueError(f'KDTree points must be a 2-dimensional array, got shape {points.shape}')
+
+        self._points = points
+        self._leaf_size = max(1, int(leaf_size))
+        # Permutation of point indices; each node owns a contiguous slice of it
+        self._order = np.arange(len(points))
+
+        # Flat node storage: slice bounds, children (-1 for leaves) and bounding boxes
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._left: list[int] = []
+        self._right: list[int] = []
+        self._mins: list[np.ndarray] = []
+        self._maxs: list[np.ndarray] = []
+
+        if len(points):
+            self._build(0, len(points))
+
+    @property
+    def points(self) -> np.ndarray:
+        return self._points
+
+    def __len__(self):
+        return len(self._points)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._starts)
+        node_points = self._points[self._order[start:end]]
+        mins = node_points.min(axis=0)
+        maxs = node_points.max(axis=0)
+
+        self._starts.append(start)
+        self._ends.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._mins.append(mins)
+        self._maxs.append(maxs)
+
+        if end - start <= self._leaf_size:
+            return node
+
+        # Split on the median of the widest dimension
+        dim = int(np.argmax(maxs - mins))
+        mid = (end - start) // 2
+        partition = np.argpartition(node_points[:, dim], mid)
+        self._order[start:end] = self._order[start:end][partition]
+
+        self._left[node] = self._build(start, start + mid)
+        self._right[node] = self._build(start + mid, end)
+        return node
+
+    def _box_distance(self, node: int, point: np.ndarray) -> float:
+        delta = np.maximum(self._mins[node] - point, 0) + np.maximum(point - self._maxs[node], 0)
+        return float(np.sqrt(delta @ delta))
+
+    def _leaf_distances(self, node: int, point: np.ndarray):
+        indices = self._order[self._starts[node]:self._ends[node]]
+        delta = self._points[indices] - point
+        return np.sqrt(np.einsum('ij,ij->i', delta, delta)), indices
+
+    def _query_one(self, point: np.ndarray, k: int):
+        # Max-heap (via negated distances) of the k best matches found so far
+        best: list[tuple[float, int]] = []
+        queue = [(self._box_distance(0, point), 0)]
+
+        while queue:
+            box_distance, node = heapq.heappop(queue)
+            if len(best) == k and box_distance > -best[0][0]:
+                break
+            if self._left[node] == -1:
+                distances, indices = self._leaf_distances(node, point)
+                for distance, index in zip(distances.tolist(), indices.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+                continue
+            for child in (self._left[node], self._right[node]):
+                heapq.heappush(queue, (self._box_distance(child, point), child))
+
+        best.sort(key=lambda item: (-item[0], item[1]))
+        return [-d for d, _ in best], [i for _, i in best]
+
+    def query(self, points, k: int = 1):
+        """
+        Find the `k` nearest neighbors of one or more query points.
+
+        Args:
+            points: A single point of shape `(D,)` or a batch of shape `(M, D)`.
+            k: The number of neighbors to return (clamped to the size of the tree).
+
+        Returns:
+            A tuple of `(distances, indices)` sorted from nearest to farthest, with
+            shape `(k,)` for a single point or `(M, k)` for a batch.
+        """
+        query = np.asarray(points, dtype=np.float64)
+        single = query.ndim == 1
+        query = np.atleast_2d(query)
+        k = min(int(k), len(self._points))
+
+        distances = np.empty((len(query), k), dtype=np.float64)
+        indices = np.empty((len(query), k), dtype=np.intp)
+        if k > 0:
+            for row, point in enumerate(query):
+                distances[row], indices[row] = self._query_one(point, k)
+
+        if single:
+            return distances[0], indices[0]
+        return distances, indices
+
+    def query_radius(self, point, r: float, return_distance: bool = False):
+        """
+        Find every point within a distance of `r` from a query point.
+
+        Args:
+            point: A single point of shape `(D,)`.
+            r: The search radius.
+            return_distance: Whether to also return the distance of each match.
+
+        Returns:
+            An array of indices sorted from nearest to farthest, or a tuple of
+            `(distances, indices)` when `return_distance` is set.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        found_distances = []
+        found_indices = []
+        stack = [0] if len(self._points) else []
+
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, point) > r:
+                continue
+            if self._left[node] == -1:
+                distances, indices = self._leaf_distances(node, point)
+                mask = distances <= r
+                found_distances.append(distances[mask])
+                found_indices.append(indices[mask])
+                continue
+            stack.extend((self._left[node], self._right[node]))
+
+        distances = np.concatenate(found_distances) if found_distances else np.empty(0)
+        indices = np.concatenate(found_indices) if found_indices else np.empty(0, dtype=np.intp)
+        order = np.argsort(distances, kind='stable')
+        if return_distance:
+            return distances[order], indices[order]
+        return indices[order]
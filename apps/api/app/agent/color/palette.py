@@ -0,0 +1,194 @@
+import io
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import numpy as np
+from PIL import Image
+
+from .batch import oklab_to_rgb_many, rgb_to_hex_many, rgb_to_oklab_many
+
+"""
+Dominant color (palette) extraction from images.
+
+The image is downsampled with Pillow (using the JPEG decoder's draft mode where
+possible, so large photos are never fully decoded), its distinct pixel colors are
+counted, and a weighted k-means is run over them in OKLab, so clusters follow
+perceived rather than RGB differences. The whole clustering loop is vectorized.
+
+Example:
+--------
+>>> with open('miniature.jpg', 'rb') as f:
+...     palette = extract_palette(f.read(), k=5)
+>>> [(c.hex_color, round(c.proportion, 2)) for c in palette]
+[('#2b3a1f', 0.41), ('#8c1c13', 0.22), ...]
+"""
+
+# Images are downsampled so that neither side exceeds this many pixels
+PALETTE_MAX_SIZE = 256
+
+# Refuse to open images larger than this (guards against decompression bombs)
+PALETTE_MAX_PIXELS = 64_000_000
+
+# Pixels with a lower alpha value are ignored
+PALETTE_MIN_ALPHA = 128
+
+
+class ImageTooLargeError(ValueError):
+    """
+    The image has more pixels than may be decoded (@see PALETTE_MAX_PIXELS).
+    """
+
+
+@dataclass(frozen=True)
+class PaletteColor:
+    hex_color: str
+    rgb_color: tuple[int, int, int]
+    # The share of the (opaque) image pixels assigned to this color
+    proportion: float
+
+
+def load_image_pixels(image: bytes | BinaryIO | Image.Image, max_size: int = PALETTE_MAX_SIZE) -> np.ndarray:
+    """
+    Decode and downsample an image into an `(N, 3)` uint8 array of its opaque pixels.
+
+    Raises:
+        ImageTooLargeError: The image has too many pixels.
+        ValueError: The image cannot be read (e.g., it is not an image, or it is
+            truncated or corrupt).
+    """
+    if not isinstance(image, Image.Image):
+        try:
+            image = Image.open(io.BytesIO(image) if isinstance(image, bytes) else image)
+        except Image.DecompressionBombError as exc:
+            raise ImageTooLargeError(str(exc)) from exc
+        except OSError as exc:
+            raise ValueError(str(exc)) from exc
+    width, height = image.size
+    if width * height > PALETTE_MAX_PIXELS:
+        raise ImageTooLargeError(f'Image of {width}x{height} pixels is too large')
+
+    try:
+        # Lets the JPEG decoder scale down by up to 8x while decoding
+        image.draft('RGB', (max_size, max_size))
+        image.thumbnail((max_size, max_size), Image.Resampling.BOX)
+    except OSError as exc:
+        raise ValueError(f'Image is truncated or corrupt: {exc}') from exc
+
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = np.asarray(image.convert('RGBA')).reshape(-1, 4)
+        return np.ascontiguousarray(rgba[rgba[:, 3] >= PALETTE_MIN_ALPHA, :3])
+    return np.asarray(image.convert('RGB')).reshape(-1, 3)
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    return (
+        np.einsum('ij,ij->i', points, points)[:, None]
+        - 2 * (points @ centers.T)
+        + np.einsum('ij,ij->i', centers, centers)[None, :]
+    )
+
+
+def kmeans(
+    points: np.ndarray,
+    k: int,
+    weights: np.ndarray | None = None,
+    iterations: int = 30,
+    tolerance: float = 1e-6,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted k-means (k-means++ initialization, Lloyd iterations).
+
+    Args:
+        points: An `(N, D)` float array.
+        k: The number of clusters (clamped to the number of points).
+        weights: Optional `(N,)` point weights (e.g., pixel counts).
+        iterations: The maximum number of iterations.
+        tolerance: Stop once no center moves (squared) further than this.
+        seed: Seed for the initialization.
+
+    Returns:
+        A tuple of the `(k, D)` centers and the `(N,)` cluster label of every point.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+
+    # k-means++: sample each new center proportionally to weight * squared distance
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.choice(n, p=weights / weights.sum())]
+    closest = np.maximum(_squared_distances(points, centers[:1])[:, 0], 0)
+    for i in range(1, k):
+        p = weights * closest
+        total = p.sum()
+        index = rng.choice(n, p=p / total) if total > 0 else rng.integers(n)
+        centers[i] = points[index]
+        closest = np.minimum(closest, np.maximum(_squared_distances(points, centers[i:i + 1])[:, 0], 0))
+
+    labels = np.zeros(n, dtype=np.intp)
+    for _ in range(iterations):
+        distances = _squared_distances(points, centers)
+        labels = np.argmin(distances, axis=1)
+        totals = np.bincount(labels, weights=weights, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=weights * points[:, d], minlength=k) for d in range(points.shape[1])], axis=1)
+
+        updated = centers.copy()
+        filled = totals > 0
+        updated[filled] = sums[filled] / totals[filled, None]
+        # Re-seed empty clusters at the points that are currently worst served
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            worst = np.argsort(weights * distances[np.arange(n), labels])[::-1][:len(empty)]
+            updated[empty[:len(worst)]] = points[worst]
+
+        shift = np.max(np.sum((updated - centers) ** 2, axis=1))
+        centers = updated
+        if shift <= tolerance:
+            break
+
+    labels = np.argmin(_squared_distances(points, centers), axis=1)
+    return centers, labels
+
+
+def extract_palette(
+    image: bytes | BinaryIO | Image.Image,
+    k: int = 5,
+    max_size: int = PALETTE_MAX_SIZE,
+    seed: int = 0,
+) -> list[PaletteColor]:
+    """
+    Find the `k` dominant colors of an image.
+
+    Args:
+        image: Encoded image data, a file object, or a Pillow image.
+        k: The number of colors to extract.
+        max_size: The size the image is downsampled to before clustering.
+        seed: Seed for the clustering initialization (results are deterministic).
+
+    Returns:
+        The dominant colors, most prominent first.
+    """
+    pixels = load_image_pixels(image, max_size=max_size)
+    if len(pixels) == 0:
+        return []
+
+    # Cluster the distinct colors, weighted by how often each occurs
+    colors, counts = np.unique(pixels, axis=0, return_counts=True)
+    centers, labels = kmeans(rgb_to_oklab_many(colors), k, weights=counts, seed=seed)
+
+    totals = np.bincount(labels, weights=counts, minlength=len(centers))
+    rgb = np.rint(oklab_to_rgb_many(centers)).astype(int)
+    hex_values = rgb_to_hex_many(rgb)
+
+    order = np.argsort(totals, kind='stable')[::-1]
+    return [
+        PaletteColor(
+            hex_color=str(hex_values[i]),
+            rgb_color=tuple(int(v) for v in rgb[i]),
+            proportion=float(totals[i] / counts.sum()),
+        )
+        for i in order
+        if totals[i] > 0
+    ]
@@ -0,0 +1,200 @@
+import re
+from collections.abc import Iterable
+from decimal import ROUND_FLOOR, Decimal
+from functools import lru_cache
+
+import numpy as np
+
+from .batch import oklab_to_rgb_many, oklch_to_oklab_many
+from .named_colors import CSS_NAMED_COLORS
+
+"""
+Color string parsing.
+
+A single entry point, `parse_color`, understands the color notations found in
+vendor data and SVG markup:
+
+- Hexadecimal: '#f0f', '#f0f8', '#ff00ff', '#ff00ff80'
+- Functional RGB: 'rgb(255, 0, 255)', 'rgba(255,0,255,.5)', 'rgb(100% 0% 100% / 50%)'
+- OKLCH: 'oklch(70.17% 0.3225 328.36)', 'oklch(0.7 0.1 120deg / 0.5)'
+- CSS named colors: 'white', 'RebeccaPurple', 'transparent'
+
+Each string is matched by one precompiled regular expression and the results are
+memoized, so the repeated values common to large SVG and JSON ingests are only
+parsed once. `parse_many` parses a whole sequence into a NumPy array, decoding
+plain 6-digit hex values in a single vectorized step.
+
+Parsed colors are tuples of RGB integers in the range [0, 255], followed by an
+alpha value in the range [0, 1] when one was given.
+"""
+
+PARSE_CACHE_SIZE = 8192
+
+_NUMBER = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+_SEP = r'(?:\s*,\s*|\s+)'
+_ALPHA = rf'(?:\s*[,/]\s*({_NUMBER})(%?))?'
+
+HEX_DIGITS_RE = re.compile(r'[0-9a-fA-F]+')
+HEX_COLOR_RE = re.compile(r'#([0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})')
+RGB_COLOR_RE = re.compile(
+    rf'rgba?\(\s*({_NUMBER})(%?){_SEP}({_NUMBER})(%?){_SEP}({_NUMBER})(%?){_ALPHA}\s*\)',
+    re.IGNORECASE,
+)
+OKLCH_COLOR_RE = re.compile(
+    rf'oklch\(\s*({_NUMBER})(%?)\s+({_NUMBER})(%?)\s+({_NUMBER})(?:deg)?'
+    rf'(?:\s*/\s*({_NUMBER})(%?))?\s*\)',
+    re.IGNORECASE,
+)
+
+# Chroma of 100% in the `oklch()` notation (@see CSS Color 4)
+OKLCH_CHROMA_PERCENT_REF = 0.4
+
+
+def decimalize(num: int | float):
+    if num < 0:
+        return 0
+    elif isinstance(num, float) and num <= 1.0000:
+        return num
+    return float(Decimal(num / 255).quantize(Decimal('0.000'), rounding=ROUND_FLOOR))
+
+
+def _to_channel(value: str, percent: str) -> int | float:
+    number = float(value)
+    if percent:
+        number = number * 255 / 100
+    number = min(max(number, 0), 255)
+    return int(number) if number.is_integer() else number
+
+
+def _to_alpha(value: str | None, percent: str | None) -> float | None:
+    if value is None:
+        return None
+    alpha = float(value) / 100 if percent else float(value)
+    return min(max(alpha, 0.0), 1.0)
+
+
+def _with_alpha(rgb: tuple, alpha: float | None) -> tuple:
+    return rgb if alpha is None else (*rgb, alpha)
+
+
+def parse_hex(value: str) -> tuple:
+    """
+    Parse a hexadecimal color string (with or without a leading '#').
+    """
+    digits = value.lstrip('#')
+    if len(digits) in (3, 4):
+        digits = ''.join(c * 2 for c in digits)
+    if len(digits) not in (6, 8) or not HEX_DIGITS_RE.fullmatch(digits):
+        raise ValueError(f'Invalid hexadecimal color "{value}"')
+    channels = tuple(bytes.fromhex(digits))
+    if len(channels) == 4:
+        return (*channels[:3], decimalize(channels[3]))
+    return channels
+
+
+def _parse_rgb(match: re.Match) -> tuple:
+    r, rp, g, gp, b, bp, a, ap = match.groups()
+    rgb = (_to_channel(r, rp), _to_channel(g, gp), _to_channel(b, bp))
+    return _with_alpha(rgb, _to_alpha(a, ap))
+
+
+def _parse_oklch(match: re.Match) -> tuple:
+    lightness, lp, chroma, cp, hue, a, ap = match.groups()
+    L = float(lightness) / 100 if lp else float(lightness)
+    C = float(chroma) * OKLCH_CHROMA_PERCENT_REF / 100 if cp else float(chroma)
+    rgb = oklab_to_rgb_many(oklch_to_oklab_many([L, max(C, 0.0), float(hue)]))
+    return _with_alpha(tuple(int(v) for v in np.rint(rgb)), _to_alpha(a, ap))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_color(value: str) -> tuple:
+    """
+    Parse a color string into a tuple of RGB values (plus alpha, if specified).
+
+    Args:
+        value: A hexadecimal, `rgb()`/`rgba()`, `oklch()` or CSS named color string.
+
+    Returns:
+        A tuple of (r, g, b) or (r, g, b, alpha).
+
+    Raises:
+        ValueError: If the value is not a recognized color string.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f'Cannot parse color value of type {type(value).__name__}')
+
+    text = value.strip()
+
+    if text.startswith('#'):
+        if HEX_COLOR_RE.fullmatch(text):
+            return parse_hex(text)
+    elif text[:3].lower() == 'rgb':
+        match = RGB_COLOR_RE.fullmatch(text)
+        if match:
+            return _parse_rgb(match)
+    elif text[:5].lower() == 'oklch':
+        match = OKLCH_COLOR_RE.fullmatch(text)
+        if match:
+            return _parse_oklch(match)
+    else:
+        name = text.lower()
+        if name in CSS_NAMED_COLORS:
+            return CSS_NAMED_COLORS[name]
+        if name == 'transparent':
+            return (0, 0, 0, 0.0)
+
+    raise ValueError(f'Cannot parse color value "{value}"')
+
+
+def parse_many(values: Iterable, alpha: bool = False) -> np.ndarray:
+    """
+    Parse a sequence of colors into a NumPy array in one call.
+
+    Plain 6-digit hex strings (the bulk of vendor data) are decoded together in a
+    single vectorized step; every other distinct value is parsed once with
+    `parse_color`. RGB tuples/lists are accepted as-is.
+
+    Args:
+        values: An iterable of color strings and/or RGB(A) iterables.
+        alpha: Whether to include an alpha channel (1.0 when unspecified).
+
+    Returns:
+        An `(N, 3)` uint8 array of RGB values, or an `(N, 4)` float64 array of
+        RGBA values (alpha in the range [0, 1]) when `alpha` is set.
+
+    Raises:
+        ValueError: If any value cannot be parsed.
+    """
+    values = list(values)
+    out = np.empty((len(values), 4), dtype=np.float64)
+    out[:, 3] = 1.0
+
+    fast_rows = []
+    fast_digits = []
+    parsed: dict[str, tuple] = {}
+
+    for row, value in enumerate(values):
+        if isinstance(value, str):
+            if len(value) == 7 and value[0] == '#':
+                fast_rows.append(row)
+                fast_digits.append(value[1:])
+                continue
+            color = parsed.get(value)
+            if color is None:
+                color = parsed[value] = parse_color(value)
+        else:
+            color = tuple(value)
+            if len(color) not in (3, 4):
+                raise ValueError(f'Cannot parse color value "{value}"')
+        out[row, :len(color)] = color
+
+    if fast_rows:
+        try:
+            decoded = np.frombuffer(bytes.fromhex(''.join(fast_digits)), dtype=np.uint8).reshape(-1, 3)
+        except ValueError:
+            decoded = np.array([parse_hex(digits)[:3] for digits in fast_digits], dtype=np.uint8).reshape(-1, 3)
+        out[fast_rows, :3] = decoded
+
+    if alpha:
+        return out
+    return np.clip(np.rint(out[:, :3]), 0, 255).astype(np.uint8)
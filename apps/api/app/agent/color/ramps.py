@@ -0,0 +1,91 @@
+import numpy as np
+
+from .batch import as_color_array, oklab_to_oklch_many, oklch_to_oklab_many, oklch_to_rgb_many, rgb_to_oklab_many
+from .parser import parse_many
+
+"""
+Perceptually uniform color ramps.
+
+A swatch is drawn as a gradient through three stops: `gradient_start`, the base
+color and `gradient_end`. `ramp_many` samples the piecewise-linear path through
+the stops in OKLab at evenly spaced *distances* along the path (rather than at
+evenly spaced parameter values), so consecutive steps are equally far apart
+perceptually even when one segment is much longer than the other. Every ramp in a
+batch is computed at once.
+
+Example:
+--------
+>>> stops = swatch_stops_many(
+...     [(0.42, 0.13, 25.6)], ['#9a1115'], [(0.25, 0.1, 27.1)]
+... )
+>>> ramp_to_rgb_many(ramp_many(stops, steps=8)).shape
+(1, 8, 3)
+"""
+
+
+def swatch_stops_many(gradient_start, base_rgb, gradient_end) -> np.ndarray:
+    """
+    Assemble the OKLab stops of a batch of swatches.
+
+    Args:
+        gradient_start: `(N, 3)` OKLCH gradient start colors.
+        base_rgb: `(N, 3)` RGB base colors (or anything `parse_many` accepts).
+        gradient_end: `(N, 3)` OKLCH gradient end colors.
+
+    Returns:
+        An `(N, 3, 3)` array of OKLab stops (start, base, end) per swatch.
+    """
+    if not isinstance(base_rgb, np.ndarray):
+        base_rgb = parse_many(base_rgb)
+    return np.stack([
+        oklch_to_oklab_many(gradient_start),
+        rgb_to_oklab_many(base_rgb),
+        oklch_to_oklab_many(gradient_end),
+    ], axis=1)
+
+
+def ramp_many(stops, steps: int = 16) -> np.ndarray:
+    """
+    Sample `steps` colors, evenly spaced by OKLab distance, along the path through
+    each row of stops.
+
+    Args:
+        stops: An `(N, S, 3)` array of OKLab stops (S >= 2).
+        steps: The number of colors per ramp (>= 2).
+
+    Returns:
+        An `(N, steps, 3)` array of OKLab colors. The first and last colors of each
+        ramp are its first and last stops.
+    """
+    stops = as_color_array(stops)
+    if stops.ndim != 3 or stops.shape[1] < 2:
+        raise ValueError(f'Expected stops of shape (N, S >= 2, 3), got {stops.shape}')
+    if steps < 2:
+        raise ValueError('A ramp needs at least 2 steps')
+
+    segments = np.diff(stops, axis=1)                          # (N, S-1, 3)
+    lengths = np.linalg.norm(segments, axis=-1)                # (N, S-1)
+    cumulative = np.concatenate([np.zeros((len(stops), 1)), np.cumsum(lengths, axis=1)], axis=1)
+    total = cumulative[:, -1:]
+
+    # Target distances along each path; degenerate (single color) paths stay put
+    targets = np.linspace(0.0, 1.0, steps)[None, :] * total   # (N, steps)
+    segment = np.clip(
+        (cumulative[:, None, 1:-1] <= targets[:, :, None]).sum(axis=-1),
+        0,
+        segments.shape[1] - 1,
+    )                                                          # (N, steps)
+
+    rows = np.arange(len(stops))[:, None]
+    start = cumulative[rows, segment]
+    length = lengths[rows, segment]
+    t = np.divide(targets - start, length, out=np.zeros_like(targets), where=length > 0)
+    return stops[rows, segment] + np.clip(t, 0, 1)[..., None] * segments[rows, segment]
+
+
+def ramp_to_rgb_many(ramps) -> np.ndarray:
+    """
+    Convert OKLab ramps to gamut-mapped 8-bit sRGB.
+    """
+    rgb = oklch_to_rgb_many(oklab_to_oklch_many(ramps))
+    return np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
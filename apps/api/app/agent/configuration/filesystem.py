@@ -1,6 +1,13 @@
 fs_config = {
     'outdir': 'output',
 
+    # Persistent caches shared across locales and runs
+    'cachedir': 'output/.cache',
+    'persist_color_cache': True,
+    # Build the ISCC-NBS lookup table (in `<cachedir>/lut`) in the background at startup
+    # when it is missing
+    'build_color_lut': True,
+
     'filenames': {
         'source': 'source-{locale}.json',
         'swatches': 'swatches-{locale}.json',
@@ -12,6 +19,10 @@ fs_config = {
         'locale_product_categories': 'locale_product_categories-{language_code}.json',
         'locale_price_data': 'locale_price_data-{locale}.json',
         'product_swatch_data': 'product_swatch_data.json',
+        'equivalence': 'paint_equivalence.json',
+        'ramps': 'swatch_ramps.bin',
+        'ramps_manifest': 'swatch_ramps.json',
+        'color_cache': 'color_cache.sqlite3',
     }
 }
 
@@ -0,0 +1,200 @@
+# standard
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+# packages
+import numpy as np
+
+# local
+from .color.distance import get_metric, nearest, pairwise, to_metric_space
+from .swatch_index import SwatchRecord, find_products_files, records_from_products_files
+
+if TYPE_CHECKING:
+    from .providers import FS
+
+"""
+Cross-vendor paint equivalences ("what is the Army Painter equivalent of this
+Citadel paint?").
+
+For every scraped product, the `k` closest swatches from *other* vendors are
+computed with the vectorized distance metrics and persisted as a single JSON
+document:
+
+    {
+        "version": 1,
+        "metric": "oklab",
+        "k": 5,
+        "rows": {
+            "games_workshop/citadel/Khorne Red": {
+                "hex_color": "#6a0001",
+                "matches": [
+                    {"vendor": "army_painter", "product_line": "speedpaint", "name": "...",
+                     "hex_color": "...", "distance": 0.0123},
+                    ...
+                ]
+            },
+            ...
+        }
+    }
+
+Updates are incremental. A row is only recomputed in full when its own swatch is
+new or changed, or when one of its current matches was removed or changed. Rows
+whose matches are all still valid only compare against the swatches that were
+added or changed since the last run, and merge the result into their matches.
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump whenever the layout of the document or the way rows are computed changes
+EQUIVALENCE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class EquivalenceStats:
+    rows: int
+    recomputed: int
+    merged: int
+    unchanged: int
+    removed: int
+
+
+def record_key(record: SwatchRecord) -> str:
+    return record.key
+
+
+def _fingerprint(record: SwatchRecord) -> str:
+    return record.hex_color.lower()
+
+
+def _match(record: SwatchRecord, distance: float) -> dict[str, Any]:
+    return {
+        'vendor': record.vendor,
+        'product_line': record.product_line,
+        'name': record.name,
+        'hex_color': record.hex_color,
+        'distance': float(distance),
+    }
+
+
+def _match_key(match: dict[str, Any]) -> str:
+    return f"{match['vendor']}/{match['product_line']}/{match['name']}"
+
+
+def compute_equivalences(
+    records: Iterable[SwatchRecord],
+    previous: dict[str, Any] | None = None,
+    k: int = 5,
+    metric: str = 'oklab',
+) -> tuple[dict[str, Any], EquivalenceStats]:
+    """
+    Compute (or incrementally update) the equivalence matrix for a set of swatches.
+
+    Args:
+        records: Every product swatch across all vendors.
+        previous: The document produced by the last run, if any.
+        k: The number of equivalents to keep for each product.
+        metric: The name of a registered distance metric.
+
+    Returns:
+        A tuple of the new document and statistics about how much was recomputed.
+    """
+    # Keep the first record of any swatch seen more than once
+    unique: dict[str, SwatchRecord] = {}
+    for record in records:
+        unique.setdefault(record_key(record), record)
+    keys = list(unique)
+    records = list(unique.values())
+    metric = get_metric(metric).name
+
+    if (
+        not previous
+        or previous.get('version') != EQUIVALENCE_VERSION
+        or previous.get('metric') != metric
+        or previous.get('k') != k
+    ):
+        previous = {'rows': {}}
+    previous_rows: dict[str, dict] = previous.get('rows', {})
+
+    by_key = dict(zip(keys, range(len(records))))
+    points = to_metric_space([r.hex_color for r in records], metric) if records else np.empty((0, 3))
+
+    # Swatches that are new or whose color changed since the last run
+    fresh = {
+        key for key, record in zip(keys, records)
+        if previous_rows.get(key, {}).get('hex_color', '').lower() != _fingerprint(record)
+    }
+    removed = set(previous_rows) - set(by_key)
+    stale = fresh | removed
+
+    rows: dict[str, dict] = {}
+    recompute: defaultdict[str, list[int]] = defaultdict(list)
+    merge: defaultdict[str, list[int]] = defaultdict(list)
+
+    for i, (key, record) in enumerate(zip(keys, records)):
+        matches = previous_rows.get(key, {}).get('matches') if key not in fresh else None
+        if matches is None or any(_match_key(m) in stale for m in matches):
+            recompute[record.vendor].append(i)
+        else:
+            rows[key] = {'hex_color': record.hex_color, 'matches': matches}
+            merge[record.vendor].append(i)
+
+    vendors = np.array([r.vendor for r in records], dtype=object)
+    fresh_indices = np.array(sorted(by_key[key] for key in fresh), dtype=np.intp)
+    merged = 0
+
+    for vendor, indices in recompute.items():
+        candidates = np.flatnonzero(vendors != vendor)
+        for i in indices:
+            rows[keys[i]] = {'hex_color': records[i].hex_color, 'matches': []}
+        if len(candidates) == 0:
+            continue
+        distances, found = nearest(points[indices], points[candidates], k=k, metric=metric, convert=False)
+        for i, row_distances, row_found in zip(indices, distances, found):
+            rows[keys[i]]['matches'] = [
+                _match(records[candidates[j]], d) for j, d in zip(row_found, row_distances)
+            ]
+
+    for vendor, indices in merge.items():
+        if len(fresh_indices) == 0:
+            break
+        candidates = fresh_indices[vendors[fresh_indices] != vendor]
+        if len(candidates) == 0:
+            continue
+        distances = pairwise(points[indices], points[candidates], metric=metric, convert=False)
+        for i, row_distances in zip(indices, distances):
+            matches = rows[keys[i]]['matches']
+            worst = matches[-1]['distance'] if len(matches) >= k else np.inf
+            closer = np.flatnonzero(row_distances < worst)
+            if len(closer) == 0:
+                continue
+            additions = [_match(records[candidates[j]], row_distances[j]) for j in closer]
+            rows[keys[i]]['matches'] = sorted(matches + additions, key=lambda m: m['distance'])[:k]
+            merged += 1
+
+    document = {'version': EQUIVALENCE_VERSION, 'metric': metric, 'k': k, 'rows': rows}
+    recomputed = sum(len(indices) for indices in recompute.values())
+    stats = EquivalenceStats(
+        rows=len(rows),
+        recomputed=recomputed,
+        merged=merged,
+        unchanged=len(rows) - recomputed - merged,
+        removed=len(removed),
+    )
+    return document, stats
+
+
+def update_paint_equivalences(fs: 'FS', k: int = 5, metric: str = 'oklab') -> EquivalenceStats:
+    """
+    Recompute the equivalence matrix for the products files in the output
+    directory, reusing the rows of the previous run where possible.
+    """
+    records = records_from_products_files(find_products_files(fs.outdir))
+    filepath = fs.get_output_path('equivalence')
+    previous = fs.read(filepath, throw_on_error=False, default=None)
+    document, stats = compute_equivalences(records, previous, k=k, metric=metric)
+    fs.write(filepath, document)
+    LOGGER.debug('Updated paint equivalences: %s', stats)
+    return stats
@@ -0,0 +1,113 @@
+# standard
+import asyncio
+import os
+from collections.abc import Iterable, Mapping
+from urllib.parse import urlsplit
+
+# packages
+import httpx
+
+"""
+A shared, connection-pooled HTTP client for fetching many resources (e.g., swatch
+images) concurrently.
+
+`AsyncFetcher` keeps one keep-alive `httpx.AsyncClient` for all of its requests and
+bounds both the total number of requests in flight and the number in flight per
+host, so a batch of hundreds of URLs completes in roughly the time of its slowest
+requests without flooding any one server.
+
+Example:
+--------
+>>> async with AsyncFetcher(headers={'User-Agent': 'ContrastAgent'}) as fetcher:
+...     responses = await fetcher.get_many(urls)
+>>> [r.status_code if isinstance(r, httpx.Response) else r for r in responses]
+[200, 200, HTTPStatusError(...)]
+"""
+
+# Maximum number of requests in flight at once
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', 16))
+
+# Maximum number of requests in flight to any one host
+FETCH_PER_HOST = int(os.environ.get('FETCH_PER_HOST', 6))
+
+# Seconds before a request is abandoned
+FETCH_TIMEOUT = float(os.environ.get('FETCH_TIMEOUT', 30))
+
+
+class AsyncFetcher:
+    def __init__(
+        self,
+        headers: Mapping[str, str] | None = None,
+        concurrency: int = FETCH_CONCURRENCY,
+        per_host: int = FETCH_PER_HOST,
+        timeout: float = FETCH_TIMEOUT,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self._headers = dict(headers or {})
+        self._concurrency = max(1, concurrency)
+        self._per_host = max(1, per_host)
+        self._timeout = timeout
+        self._client = client
+        self._owns_client = client is None
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self._headers,
+                timeout=httpx.Timeout(self._timeout),
+                limits=httpx.Limits(
+                    max_connections=self._concurrency,
+                    max_keepalive_connections=self._concurrency,
+                ),
+                follow_redirects=True,
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self._per_host)
+        return self._host_slots[host]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request once a per-host and a global slot are free.
+        """
+        if self._client is None:
+            raise RuntimeError('AsyncFetcher must be used as an async context manager')
+        # The host slot is taken first so requests queued for a busy host do not
+        # hold global slots that requests to other hosts could use
+        async with self._host_slot(url), self._slots:
+            return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET a URL, raising `httpx.HTTPStatusError` for error responses.
+        """
+        response = await self.request('GET', url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def get_many(self, urls: Iterable[str], **kwargs) -> list[httpx.Response | Exception]:
+        """
+        GET every URL concurrently. Each URL is only requested once, however many
+        times it appears.
+
+        Returns:
+            The response (or the exception raised) for each URL, in order.
+        """
+        urls = list(urls)
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.get(url, **kwargs) for url in unique), return_exceptions=True)
+        by_url = dict(zip(unique, results))
+        return [by_url[url] for url in urls]
@@ -0,0 +1,196 @@
+# standard
+import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# packages
+import numpy as np
+
+# local
+from .color.batch import oklab_to_weighted_many, oklch_to_oklab_many, oklch_to_rgb_many, rgb_to_hex_many, rgb_to_oklch_many
+from .color.parser import parse_many
+from .swatch_index import SwatchIndex, SwatchMatch, SwatchRecord, _as_tuple, get_swatch_index
+
+"""
+Color-harmony queries over every scraped product swatch.
+
+`HarmonyIndex` keeps the OKLCH values of the catalog's swatches sorted by hue
+angle, so the paints within a hue window are found with two binary searches
+(`np.searchsorted`) instead of a scan. A harmony scheme is a set of hue offsets
+from a base color (e.g., 120° and 240° for triadic); for each offset the paints
+in the window around the rotated hue, optionally restricted to a lightness and
+chroma sub-range around the base color, are ranked by their weighted OKLab
+distance to the base color rotated onto that hue.
+
+Paints whose chroma is too low to have a meaningful hue (whites, greys, blacks)
+are left out of the index.
+
+Example:
+--------
+>>> index = get_harmony_index()
+>>> groups = index.harmony('games_workshop/citadel/Mephiston Red', 'triadic', k=1)
+>>> [(g.offset, g.matches[0].record.name) for g in groups]
+[(120.0, 'Moot Green'), (240.0, 'Caledor Sky')]
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# The hue offsets (in degrees) from the base color of each scheme
+HARMONY_SCHEMES: dict[str, tuple[float, ...]] = {
+    'complementary': (180.0,),
+    'split_complementary': (150.0, 210.0),
+    'analogous': (-30.0, 30.0),
+    'triadic': (120.0, 240.0),
+    'tetradic': (90.0, 180.0, 270.0),
+}
+
+# Swatches with a lower OKLCH chroma are treated as achromatic
+ACHROMATIC_CHROMA = 0.03
+
+# The default half-width (in degrees) of the hue window around each target hue
+HUE_TOLERANCE = 15.0
+
+
+@dataclass(frozen=True)
+class HarmonyGroup:
+    # The hue offset from the base color
+    offset: float
+    # The target hue (in degrees)
+    hue: float
+    # The base color rotated onto the target hue
+    target_hex: str
+    matches: list[SwatchMatch]
+
+
+class HarmonyIndex:
+    def __init__(self, records: Iterable[SwatchRecord]):
+        records = list(records)
+        oklch = rgb_to_oklch_many(parse_many([r.hex_color for r in records])) if records else np.empty((0, 3))
+        chromatic = np.flatnonzero(oklch[:, 1] >= ACHROMATIC_CHROMA)
+        order = chromatic[np.argsort(oklch[chromatic, 2], kind='stable')]
+
+        self._records = [records[i] for i in order]
+        self._oklch = oklch[order]
+        self._hues = np.ascontiguousarray(self._oklch[:, 2])
+        self._points = oklab_to_weighted_many(oklch_to_oklab_many(self._oklch))
+        self._vendors = np.array([r.vendor for r in self._records], dtype=object)
+        self._product_lines = np.array([r.product_line for r in self._records], dtype=object)
+        self._by_key = {r.key: i for i, r in enumerate(self._records)}
+
+    @property
+    def records(self) -> list[SwatchRecord]:
+        return self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def hue_range(self, start: float, end: float) -> np.ndarray:
+        """
+        The (hue-sorted) indices of the swatches with a hue in `[start, end]`
+        degrees. The range may wrap around 0°/360°.
+        """
+        if end - start >= 360:
+            return np.arange(len(self))
+        start, end = start % 360, end % 360
+        lo = np.searchsorted(self._hues, start, side='left')
+        hi = np.searchsorted(self._hues, end, side='right')
+        if start <= end:
+            return np.arange(lo, hi)
+        return np.concatenate([np.arange(lo, len(self)), np.arange(0, hi)])
+
+    def _base(self, color) -> tuple[np.ndarray, int | None]:
+        """
+        The OKLCH value of `color`, which is either a paint key
+        ('<vendor>/<product line>/<name>') or a color, and the paint's position.
+        """
+        if isinstance(color, str) and color in self._by_key:
+            i = self._by_key[color]
+            return self._oklch[i], i
+        base = rgb_to_oklch_many(parse_many([color]))[0]
+        if base[1] < ACHROMATIC_CHROMA:
+            raise ValueError(f'Color "{color}" is achromatic and has no hue to build a harmony from')
+        return base, None
+
+    def harmony(
+        self,
+        color,
+        scheme: str = 'complementary',
+        k: int = 5,
+        hue_tolerance: float = HUE_TOLERANCE,
+        lightness_tolerance: float | None = None,
+        chroma_tolerance: float | None = None,
+        vendor: str | Iterable[str] | None = None,
+        product_line: str | Iterable[str] | None = None,
+    ) -> list[HarmonyGroup]:
+        """
+        The paints forming a harmony scheme with `color`.
+
+        Args:
+            color: The base color, or the key of a paint in the index.
+            scheme: One of `HARMONY_SCHEMES`.
+            k: The maximum number of paints per hue offset.
+            hue_tolerance: The half-width (in degrees) of the hue window around each target hue.
+            lightness_tolerance: Only match paints within this OKLCH lightness of the base color.
+            chroma_tolerance: Only match paints within this OKLCH chroma of the base color.
+            vendor: Only match paints from these vendor(s).
+            product_line: Only match paints from these product line(s).
+
+        Returns:
+            A group of ranked matches (closest first) per hue offset of the scheme.
+        """
+        if scheme not in HARMONY_SCHEMES:
+            raise ValueError(f'Unknown harmony scheme "{scheme}"')
+        base, base_index = self._base(color)
+        offsets = np.asarray(HARMONY_SCHEMES[scheme])
+
+        targets = np.repeat(base[None, :], len(offsets), axis=0)
+        targets[:, 2] = (base[2] + offsets) % 360
+        target_points = oklab_to_weighted_many(oklch_to_oklab_many(targets))
+        target_hex = rgb_to_hex_many(np.clip(np.rint(oklch_to_rgb_many(targets)), 0, 255).astype(int))
+
+        vendors = set(_as_tuple(vendor))
+        product_lines = set(_as_tuple(product_line))
+
+        groups = []
+        for offset, target, point, hex_value in zip(offsets, targets, target_points, target_hex):
+            candidates = self.hue_range(target[2] - hue_tolerance, target[2] + hue_tolerance)
+            keep = candidates != base_index if base_index is not None else np.ones(len(candidates), dtype=bool)
+            if lightness_tolerance is not None:
+                keep &= np.abs(self._oklch[candidates, 0] - base[0]) <= lightness_tolerance
+            if chroma_tolerance is not None:
+                keep &= np.abs(self._oklch[candidates, 1] - base[1]) <= chroma_tolerance
+            if vendors:
+                keep &= np.isin(self._vendors[candidates], list(vendors))
+            if product_lines:
+                keep &= np.isin(self._product_lines[candidates], list(product_lines))
+            candidates = candidates[keep]
+
+            distances = np.linalg.norm(self._points[candidates] - point, axis=1)
+            order = np.argsort(distances, kind='stable')[:max(k, 0)]
+            groups.append(HarmonyGroup(
+                offset=float(offset),
+                hue=float(target[2]),
+                target_hex=str(hex_value),
+                matches=[SwatchMatch(self._records[i], float(d)) for i, d in zip(candidates[order], distances[order])],
+            ))
+        return groups
+
+
+_index_lock = threading.Lock()
+_index: HarmonyIndex | None = None
+_index_source: SwatchIndex | None = None
+
+
+def get_harmony_index(outdir: str = 'output') -> HarmonyIndex:
+    """
+    The shared harmony index, rebuilt whenever the swatch index is (i.e., after each scrape).
+    """
+    global _index, _index_source
+    swatch_index = get_swatch_index(outdir)
+    with _index_lock:
+        if _index is None or _index_source is not swatch_index:
+            _index = HarmonyIndex(swatch_index.records)
+            _index_source = swatch_index
+            LOGGER.debug('Built harmony index with %s chromatic swatches', len(_index))
+        return _index
@@ -0,0 +1,154 @@
+# standard
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+"""
+A small persistent key-value store backed by SQLite, used for caches that should
+survive between agent runs (e.g., color classifications).
+
+Entries are grouped by namespace, and each namespace is stamped with a version
+string (usually a content hash of the data the entries were derived from). Opening
+a namespace with a different version discards its entries, so stale results are
+never served after the underlying data changes.
+
+Values are stored as JSON. Writes are buffered and flushed in batches (or when
+`flush()`/`close()` is called) so recording many small results does not pay for
+a transaction per entry.
+
+Example:
+--------
+>>> store = KeyValueStore('output/.cache/agent.sqlite3', 'iscc_nbs', version='abc123')
+>>> store.set('ff0000', 'Vivid Red')
+>>> store.get('ff0000')
+'Vivid Red'
+>>> store.close()
+"""
+
+
+class KeyValueStore:
+    def __init__(self, path: str, namespace: str, version: str = '', flush_every: int = 256):
+        head = os.path.dirname(path)
+        if head:
+            os.makedirs(head, exist_ok=True)
+
+        self._path = path
+        self._namespace = namespace
+        self._version = version
+        self._flush_every = max(1, flush_every)
+        self._pending: dict[str, str] = {}
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS namespaces (namespace TEXT PRIMARY KEY, version TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+        self._check_version()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def namespace(self) -> str:
+        return self._namespace
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def _check_version(self):
+        row = self._conn.execute(
+            'SELECT version FROM namespaces WHERE namespace = ?', (self._namespace,)
+        ).fetchone()
+        if row is not None and row[0] == self._version:
+            return
+        with self._conn:
+            self._conn.execute('DELETE FROM entries WHERE namespace = ?', (self._namespace,))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO namespaces (namespace, version) VALUES (?, ?)',
+                (self._namespace, self._version),
+            )
+
+    def __len__(self):
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                'SELECT COUNT(*) FROM entries WHERE namespace = ?', (self._namespace,)
+            ).fetchone()
+            return row[0]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._pending:
+                return json.loads(self._pending[key])
+            row = self._conn.execute(
+                'SELECT value FROM entries WHERE namespace = ? AND key = ?', (self._namespace, key)
+            ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._pending[key] = json.dumps(value)
+            if len(self._pending) >= self._flush_every:
+                self.flush()
+
+    def set_many(self, items: Iterable[tuple[str, Any]]):
+        with self._lock:
+            for key, value in items:
+                self._pending[key] = json.dumps(value)
+            self.flush()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pending.pop(key, None)
+            with self._conn:
+                self._conn.execute(
+                    'DELETE FROM entries WHERE namespace = ? AND key = ?', (self._namespace, key)
+                )
+
+    def items(self, limit: int | None = None) -> Iterator[tuple[str, Any]]:
+        """
+        Iterate over stored entries (most recently written first).
+        """
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                'SELECT key, value FROM entries WHERE namespace = ? ORDER BY rowid DESC LIMIT ?',
+                (self._namespace, -1 if limit is None else limit),
+            ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            with self._conn:
+                self._conn.execute('DELETE FROM entries WHERE namespace = ?', (self._namespace,))
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(self._namespace, key, value) for key, value in self._pending.items()]
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO entries (namespace, key, value) VALUES (?, ?, ?)', rows
+                )
+            self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
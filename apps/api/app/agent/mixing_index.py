@@ -0,0 +1,202 @@
+# standard
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# packages
+import numpy as np
+
+# local
+from .color.batch import oklab_to_weighted_many, rgb_to_hex_many, rgb_to_oklab_many
+from .color.distance import to_metric_space
+from .color.kdtree import KDTree
+from .color.mixing import MixingModel, mix_many
+from .color.parser import parse_many
+from .swatch_index import SwatchIndex, SwatchRecord, get_swatch_index
+
+"""
+Paint-mixing recipe search ("which two of my paints mix to this color?").
+
+`MixingIndex` precomputes the mixture of every pair of paints at a few ratios
+with a pigment mixing model (see `color.mixing`) and keeps the mixtures in a k-d
+tree over the weighted OKLab embedding. A target color is then answered with a
+tree query instead of an O(N²) search. By default only paints from the same
+vendor are paired, since paints from different ranges rarely mix predictably.
+
+When the search is restricted to an inventory of owned paints, the mixtures of
+just those paints are computed and compared directly, which for any realistic
+collection is faster than filtering the full index. As that is quadratic in the
+size of the inventory, inventories are capped at `MIX_MAX_INVENTORY` paints.
+
+Example:
+--------
+>>> index = get_mixing_index()
+>>> recipe = index.recipes('#7a3b2e', k=1)[0]
+>>> (recipe.paint_a.name, recipe.paint_b.name, recipe.ratio)
+('Mephiston Red', 'Rhinox Hide', 0.5)
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# Proportions of the first paint in each precomputed mixture
+MIX_RATIOS = (0.25, 0.5, 0.75)
+
+MIXING_MODEL: MixingModel = os.environ.get('MIXING_MODEL', 'km')
+
+# Maximum number of paints in an inventory (whose pairs are all mixed per query)
+MIX_MAX_INVENTORY = int(os.environ.get('MIX_MAX_INVENTORY', 250))
+
+
+@dataclass(frozen=True)
+class MixRecipe:
+    paint_a: SwatchRecord
+    paint_b: SwatchRecord
+    # The proportion of `paint_a` in the mixture
+    ratio: float
+    mixed_hex: str
+    distance: float
+
+
+def _pairs(records: list[SwatchRecord], same_vendor: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Indices of every unordered pair of distinct records (within each vendor when
+    `same_vendor` is set).
+    """
+    if same_vendor:
+        groups: dict[str, list[int]] = {}
+        for i, record in enumerate(records):
+            groups.setdefault(record.vendor, []).append(i)
+        index_groups = [np.array(g) for g in groups.values()]
+    else:
+        index_groups = [np.arange(len(records))]
+
+    first, second = [], []
+    for group in index_groups:
+        a, b = np.triu_indices(len(group), k=1)
+        first.append(group[a])
+        second.append(group[b])
+    if not first:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(first).astype(np.intp), np.concatenate(second).astype(np.intp)
+
+
+class MixingIndex:
+    def __init__(
+        self,
+        records: Iterable[SwatchRecord],
+        ratios: Iterable[float] = MIX_RATIOS,
+        model: MixingModel = MIXING_MODEL,
+        same_vendor: bool = True,
+        leaf_size: int = 32,
+    ):
+        self._records = list(records)
+        self._ratios = np.asarray(tuple(ratios), dtype=np.float64)
+        self._model = model
+        self._same_vendor = same_vendor
+        self._rgb = parse_many([r.hex_color for r in self._records]) if self._records else np.empty((0, 3))
+        self._by_key = {r.key: i for i, r in enumerate(self._records)}
+
+        self._first, self._second = _pairs(self._records, same_vendor)
+        self._mixed_rgb = self._mix(self._first, self._second)
+        self._tree = KDTree(self._embed(self._mixed_rgb), leaf_size=leaf_size) if len(self._mixed_rgb) else None
+
+    @property
+    def records(self) -> list[SwatchRecord]:
+        return self._records
+
+    def __len__(self):
+        return len(self._mixed_rgb)
+
+    def _mix(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """
+        Mixtures of the given pairs, flattened to `(pairs * ratios, 3)` in pair-major order.
+        """
+        if len(first) == 0:
+            return np.empty((0, 3))
+        mixed = mix_many(self._rgb[first], self._rgb[second], self._ratios, model=self._model)
+        return mixed.reshape(-1, 3)
+
+    @staticmethod
+    def _embed(rgb: np.ndarray) -> np.ndarray:
+        return oklab_to_weighted_many(rgb_to_oklab_many(rgb))
+
+    def _recipes(
+        self,
+        flat: np.ndarray,
+        distances: np.ndarray,
+        first: np.ndarray,
+        second: np.ndarray,
+        mixed_rgb: np.ndarray,
+    ) -> list[MixRecipe]:
+        n_ratios = len(self._ratios)
+        hex_values = rgb_to_hex_many(mixed_rgb[flat]) if len(flat) else []
+        return [
+            MixRecipe(
+                paint_a=self._records[first[i // n_ratios]],
+                paint_b=self._records[second[i // n_ratios]],
+                ratio=float(self._ratios[i % n_ratios]),
+                mixed_hex=str(hex_value),
+                distance=float(d),
+            )
+            for i, d, hex_value in zip(flat, distances, hex_values)
+        ]
+
+    def recipes(self, color, k: int = 10, inventory: Iterable[str] | None = None) -> list[MixRecipe]:
+        """
+        The `k` two-paint mixtures closest to `color`, best first.
+
+        Args:
+            color: The target color (a color string or RGB value).
+            k: The number of recipes to return.
+            inventory: Restrict recipes to these paints (`SwatchRecord.key`s, i.e.,
+                '<vendor>/<product line>/<name>'), at most `MIX_MAX_INVENTORY` of them.
+                Unknown keys are ignored.
+
+        Raises:
+            ValueError: The inventory holds more than `MIX_MAX_INVENTORY` paints.
+        """
+        target = oklab_to_weighted_many(to_metric_space([color], 'oklab'))[0]
+
+        if inventory is None:
+            if self._tree is None or k < 1:
+                return []
+            distances, flat = self._tree.query(target, k=min(k, len(self)))
+            return self._recipes(flat, distances, self._first, self._second, self._mixed_rgb)
+
+        inventory = set(inventory)
+        if len(inventory) > MIX_MAX_INVENTORY:
+            raise ValueError(f'An inventory may hold at most {MIX_MAX_INVENTORY} paints, got {len(inventory)}')
+        owned = np.array(sorted({self._by_key[key] for key in inventory if key in self._by_key}), dtype=np.intp)
+        if len(owned) < 2 or k < 1:
+            return []
+        a, b = _pairs([self._records[i] for i in owned], self._same_vendor)
+        first, second = owned[a], owned[b]
+        mixed_rgb = self._mix(first, second)
+        if len(mixed_rgb) == 0:
+            return []
+        distances = np.linalg.norm(self._embed(mixed_rgb) - target, axis=1)
+        k = min(k, len(distances))
+        flat = np.argpartition(distances, k - 1)[:k]
+        flat = flat[np.argsort(distances[flat], kind='stable')]
+        return self._recipes(flat, distances[flat], first, second, mixed_rgb)
+
+
+_index_lock = threading.Lock()
+_index: MixingIndex | None = None
+_index_source: SwatchIndex | None = None
+
+
+def get_mixing_index(outdir: str = 'output') -> MixingIndex:
+    """
+    The shared mixing index, rebuilt whenever the swatch index is (i.e., after each scrape).
+    """
+    global _index, _index_source
+    swatch_index = get_swatch_index(outdir)
+    with _index_lock:
+        if _index is None or _index_source is not swatch_index:
+            _index = MixingIndex(swatch_index.records)
+            _index_source = swatch_index
+            LOGGER.debug('Built mixing index with %s mixtures', len(_index))
+        return _index
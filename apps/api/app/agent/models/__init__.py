@@ -4,7 +4,7 @@ from .iscc_nbs_data import IsccNbsData
 from .product_model import Product, ProductVariant
 from .product_line import ProductLine
 from .product_line_model import ProductLineModel
-from .product_swatch_model import ProductSwatch
+from .product_swatch_model import ProductSwatch, set_swatch_contrast
 from .vendor_model import VendorBaseModel, VendorModel
 from .vendor import Vendor
 
@@ -26,4 +26,5 @@ __all__ = [
     'VendorBaseModel',
     'VendorModel',
     'Viscosity',
+    'set_swatch_contrast',
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .baseclass import BaseClass
 from .enums import ColorRange
@@ -7,4 +7,4 @@ from .enums import ColorRange
 class IsccNbsData(BaseClass):
     iscc_nbs_category: str
     color_range: list[ColorRange]
-    analogous: list[str] = []
+    analogous: list[str] = field(default_factory=list)
@@ -1,5 +1,8 @@
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 
+from app.agent.color.contrast import label_contrast_many
+from app.agent.color.parser import parse_many
 from app.core.enums import Overlay
 
 from .baseclass import BaseClass
@@ -19,6 +22,11 @@ class ProductSwatch(BaseClass):
         gradient_end - The end of the gradient for the product
         overlay - Some product types will benefit from applying an overlay to the color
             swatch to convey properties other that hue, tint, and shadow.
+        luminance - The WCAG relative luminance of the product color
+        contrast_white - The WCAG contrast ratio of white text over the product color
+        contrast_black - The WCAG contrast ratio of black text over the product color
+        apca_white - The APCA lightness contrast (Lc) of white text over the product color
+        apca_black - The APCA lightness contrast (Lc) of black text over the product color
     """
     # @see core.color.color
     hex_color: str
@@ -31,4 +39,40 @@ class ProductSwatch(BaseClass):
     # @see core.color.color
     gradient_end: tuple[int]
     # @see core.models.enums
-    overlay: Overlay | None = None
\ No newline at end of file
+    overlay: Overlay | None = None
+    # @see core.color.contrast (set by `set_swatch_contrast`)
+    luminance: float | None = None
+    contrast_white: float | None = None
+    contrast_black: float | None = None
+    apca_white: float | None = None
+    apca_black: float | None = None
+
+
+CONTRAST_FIELDS = ('luminance', 'contrast_white', 'contrast_black', 'apca_white', 'apca_black')
+
+
+def set_swatch_contrast(products: Mapping[str, object] | Iterable[object]) -> None:
+    """
+    Compute the text contrast fields of every product's swatch in one vectorized
+    pass, so they are stored with the products rather than computed per request.
+
+    Args:
+        products: `Product` instances or their serialized dictionaries (or a mapping of either).
+    """
+    swatches = []
+    for product in products.values() if isinstance(products, Mapping) else products:
+        swatch = product.get('swatch') if isinstance(product, Mapping) else getattr(product, 'swatch', None)
+        hex_color = swatch.get('hex_color') if isinstance(swatch, Mapping) else getattr(swatch, 'hex_color', None)
+        if hex_color:
+            swatches.append((swatch, hex_color))
+    if not swatches:
+        return
+
+    contrast = label_contrast_many(parse_many([hex_color for _, hex_color in swatches]))
+    for i, (swatch, _) in enumerate(swatches):
+        for field_name in CONTRAST_FIELDS:
+            value = round(float(contrast[field_name][i]), 4)
+            if isinstance(swatch, Mapping):
+                swatch[field_name] = value
+            else:
+                setattr(swatch, field_name, value)
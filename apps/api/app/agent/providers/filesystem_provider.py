@@ -40,6 +40,10 @@ class FilesystemProvider:
     @property
     def filenames(self):
         return self.config.get('fs.filenames')
+
+    @property
+    def cachedir(self):
+        return self.config.get('fs.cachedir', default=to_dirpath([self.outdir, '.cache']))
     
     def exists(self, filepath: str) -> bool:
         return Path(filepath).is_file()
@@ -64,6 +68,20 @@ class FilesystemProvider:
         paths.append(filename)
         return to_dirpath(paths)
 
+    def get_cache_path(self, content_type: str) -> str:
+        """
+        Path of a persistent cache file (shared by every vendor, locale and run).
+        """
+        filename = self.filenames.get(content_type, content_type)
+        return to_dirpath([self.cachedir, filename])
+
+    def get_output_path(self, content_type: str) -> str:
+        """
+        Path of an output file that is not specific to a vendor or product line.
+        """
+        filename = self.filenames.get(content_type, content_type)
+        return to_dirpath([self.outdir, filename])
+
     def read(self, filepath: str, throw_on_error = True, default: Any = None) -> Any:
         try:
             if self.exists(filepath):
@@ -88,6 +106,21 @@ class FilesystemProvider:
         except Exception as exc:
             print(f'FilesystemProvider Error: Encounted an exception: {exc}')
 
+    def write_bytes(self, filepath: str, data: bytes):
+        """
+        Write binary data (e.g., a packed NumPy array). The file is written next to
+        its destination and moved into place, so readers never see a partial file.
+        """
+        try:
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(f'{filepath}.tmp')
+            tmp_path.write_bytes(data)
+            tmp_path.replace(filepath)
+        except OSError as e:
+            print(f'FilesystemProvider Error: A system-related error occurred: {e}')
+        except Exception as exc:
+            print(f'FilesystemProvider Error: Encounted an exception: {exc}')
+
     def resolve(self, filepath: str, **kwargs):
         try:
             return resolve_file_data(filepath, **kwargs)
@@ -0,0 +1,283 @@
+# standard
+import glob
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+# packages
+import numpy as np
+
+# local
+from .color.distance import get_metric, to_metric_space
+from .color.kdtree import KDTree
+
+"""
+Nearest-paint search over every scraped product swatch.
+
+`SwatchIndex` holds the swatch color of every product (across all vendors and
+product lines) in a k-d tree over the same weighted OKLab embedding used for
+color classification, so "which paints are closest to this color" is answered
+with a tree query instead of a scan over the product tables. Queries can be
+restricted to particular vendors, product lines and product types.
+
+`get_swatch_index()` builds the index from the products files the vendors write
+to the output directory, and rebuilds it whenever any of those files change
+(i.e., after each scrape).
+
+Example:
+--------
+>>> index = get_swatch_index()
+>>> [(m.record.name, round(m.distance, 3)) for m in index.nearest('#9a1115', k=2, vendor='games_workshop')]
+[('Khorne Red', 0.012), ('Mephiston Red', 0.041)]
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# `<vendor>-<product line>-products-<locale>.json` (@see FilesystemProvider.get_file_path)
+PRODUCTS_FILE_RE = re.compile(r'^(?P<vendor>[^-]+)-(?P<product_line>.+)-products-(?P<locale>[^-]+)\.json$')
+
+# Filtered queries over at most this many swatches skip the tree and compare directly
+BRUTE_FORCE_LIMIT = 4096
+
+
+@dataclass(frozen=True)
+class SwatchRecord:
+    vendor: str
+    product_line: str
+    name: str
+    hex_color: str
+    product_type: tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        return f'{self.vendor}/{self.product_line}/{self.name}'
+
+
+@dataclass(frozen=True)
+class SwatchMatch:
+    record: SwatchRecord
+    distance: float
+
+
+def _get(obj: Any, key: str, default: Any = None) -> Any:
+    if isinstance(obj, Mapping):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+def _as_tuple(value: Any) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(str(getattr(v, 'value', v)) for v in value)
+
+
+def records_from_products(
+    vendor: str,
+    product_line: str,
+    products: Mapping[str, Any] | Iterable[Any],
+) -> list[SwatchRecord]:
+    """
+    Create swatch records from a product line's products (either `Product`
+    instances or their serialized dictionaries). Products without a swatch are skipped.
+    """
+    items = products.items() if isinstance(products, Mapping) else ((None, p) for p in products)
+    records = []
+    for key, product in items:
+        swatch = _get(product, 'swatch')
+        hex_color = _get(swatch, 'hex_color') if swatch else None
+        if not hex_color:
+            continue
+        records.append(SwatchRecord(
+            vendor=vendor,
+            product_line=product_line,
+            name=_get(product, 'name') or key,
+            hex_color=hex_color,
+            product_type=_as_tuple(_get(product, 'product_type')),
+        ))
+    return records
+
+
+class SwatchIndex:
+    def __init__(self, records: Iterable[SwatchRecord], metric: str = 'oklab', leaf_size: int = 16):
+        self._metric = get_metric(metric)
+        if self._metric.embed is None:
+            raise ValueError(f'SwatchIndex requires a Euclidean metric, got "{self._metric.name}"')
+
+        # Keep the first record of any swatch seen more than once (e.g., in several locales)
+        unique: dict[tuple[str, str, str], SwatchRecord] = {}
+        for record in records:
+            unique.setdefault((record.vendor, record.product_line, record.name), record)
+        self._records = list(unique.values())
+
+        self._points = self._embed([r.hex_color for r in self._records]) if self._records else None
+        self._tree = KDTree(self._points, leaf_size=leaf_size) if self._records else None
+
+        self._vendors = np.array([r.vendor for r in self._records], dtype=object)
+        self._product_lines = np.array([r.product_line for r in self._records], dtype=object)
+
+    @property
+    def records(self) -> list[SwatchRecord]:
+        return self._records
+
+    @property
+    def metric(self) -> str:
+        return self._metric.name
+
+    def __len__(self):
+        return len(self._records)
+
+    def _embed(self, colors) -> np.ndarray:
+        return self._metric.embed(to_metric_space(colors, self._metric))
+
+    def _mask(
+        self,
+        vendor: str | Iterable[str] | None,
+        product_line: str | Iterable[str] | None,
+        product_type: str | Iterable[str] | None,
+    ) -> np.ndarray | None:
+        mask = None
+        if vendor:
+            mask = np.isin(self._vendors, list(_as_tuple(vendor)))
+        if product_line:
+            found = np.isin(self._product_lines, list(_as_tuple(product_line)))
+            mask = found if mask is None else mask & found
+        if product_type:
+            wanted = set(_as_tuple(product_type))
+            found = np.fromiter(
+                (not wanted.isdisjoint(r.product_type) for r in self._records),
+                dtype=bool,
+                count=len(self._records),
+            )
+            mask = found if mask is None else mask & found
+        return mask
+
+    def _matches(self, indices: np.ndarray, distances: np.ndarray) -> list[SwatchMatch]:
+        return [SwatchMatch(self._records[i], float(d)) for i, d in zip(indices, distances)]
+
+    def _brute_force(self, point: np.ndarray, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        distances = np.linalg.norm(self._points[candidates] - point, axis=1)
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def nearest(
+        self,
+        color,
+        k: int = 10,
+        vendor: str | Iterable[str] | None = None,
+        product_line: str | Iterable[str] | None = None,
+        product_type: str | Iterable[str] | None = None,
+    ) -> list[SwatchMatch]:
+        """
+        The `k` swatches closest to `color`, nearest first.
+
+        Args:
+            color: A color string or RGB value.
+            k: The number of matches to return.
+            vendor: Only match swatches from these vendor(s).
+            product_line: Only match swatches from these product line(s).
+            product_type: Only match swatches of these product type(s).
+        """
+        if self._tree is None or k < 1:
+            return []
+        point = self._embed([color])[0]
+        mask = self._mask(vendor, product_line, product_type)
+
+        if mask is None:
+            distances, indices = self._tree.query(point, k=min(k, len(self)))
+            return self._matches(indices, distances)
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) <= BRUTE_FORCE_LIMIT:
+            indices, distances = self._brute_force(point, candidates)
+            return self._matches(indices[:k], distances[:k])
+
+        # Widen the tree query until enough of the neighbors pass the filters
+        fetch = k
+        while True:
+            fetch = min(fetch * 4, len(self))
+            distances, indices = self._tree.query(point, k=fetch)
+            keep = mask[indices]
+            if keep.sum() >= k or fetch == len(self):
+                return self._matches(indices[keep][:k], distances[keep][:k])
+
+    def within(
+        self,
+        color,
+        radius: float,
+        vendor: str | Iterable[str] | None = None,
+        product_line: str | Iterable[str] | None = None,
+        product_type: str | Iterable[str] | None = None,
+    ) -> list[SwatchMatch]:
+        """
+        Every swatch within `radius` (in the index's metric) of `color`, nearest first.
+        """
+        if self._tree is None:
+            return []
+        point = self._embed([color])[0]
+        distances, indices = self._tree.query_radius(point, radius, return_distance=True)
+        mask = self._mask(vendor, product_line, product_type)
+        if mask is not None:
+            keep = mask[indices]
+            indices, distances = indices[keep], distances[keep]
+        return self._matches(indices, distances)
+
+    @classmethod
+    def from_products_files(cls, paths: Iterable[str], **kwargs) -> 'SwatchIndex':
+        """
+        Build an index from products files written by the vendors.
+        """
+        return cls(records_from_products_files(paths), **kwargs)
+
+
+def records_from_products_files(paths: Iterable[str]) -> list[SwatchRecord]:
+    """
+    Read the swatch records of every products file written by the vendors.
+    """
+    records = []
+    for path in paths:
+        match = PRODUCTS_FILE_RE.match(os.path.basename(path))
+        if match is None:
+            continue
+        try:
+            with open(path, encoding='utf-8') as f:
+                products = json.load(f)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning('Skipping unreadable products file "%s": %s', path, exc)
+            continue
+        records.extend(records_from_products(match['vendor'], match['product_line'], products))
+    return records
+
+
+def find_products_files(outdir: str) -> list[str]:
+    return sorted(
+        path for path in glob.glob(os.path.join(outdir, '*-products-*.json'))
+        if PRODUCTS_FILE_RE.match(os.path.basename(path))
+    )
+
+
+_index_lock = threading.Lock()
+_index: SwatchIndex | None = None
+_index_signature: tuple | None = None
+
+
+def get_swatch_index(outdir: str = 'output') -> SwatchIndex:
+    """
+    The shared swatch index for the products files in `outdir`. The index is
+    rebuilt whenever a products file is added, removed or rewritten.
+    """
+    global _index, _index_signature
+    paths = find_products_files(outdir)
+    signature = tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+    with _index_lock:
+        if _index is None or signature != _index_signature:
+            _index = SwatchIndex.from_products_files(paths)
+            _index_signature = signature
+            LOGGER.debug('Built swatch index with %s swatches from %s files', len(_index), len(paths))
+        return _index
@@ -0,0 +1,146 @@
+# standard
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+# packages
+import numpy as np
+
+# local
+from .color.batch import rgb_to_oklch_many
+from .color.parser import parse_many
+from .color.ramps import ramp_many, ramp_to_rgb_many, swatch_stops_many
+from .swatch_index import PRODUCTS_FILE_RE, find_products_files
+
+if TYPE_CHECKING:
+    from .providers import FS
+
+"""
+Precomputed swatch gradient ramps.
+
+After a scrape, every product's swatch (`gradient_start` -> `hex_color` ->
+`gradient_end`) is expanded into an N-step perceptually uniform ramp, for all
+products of a product line in one vectorized batch. Each product line gets two
+files in the output directory:
+
+- `<vendor>-<product line>-swatch_ramps.bin`: the ramps as a packed uint8 RGB
+  array of shape `(products, steps, 3)`, ready to be read as a `Uint8Array`.
+- `<vendor>-<product line>-swatch_ramps.json`: a manifest with the array shape
+  and the product names in row order.
+
+The manifest also records a hash of the swatch data, so product lines whose
+swatches have not changed since the last run are skipped.
+"""
+
+LOGGER = logging.getLogger(__name__)
+
+# Bump whenever the layout of the ramp files or the way ramps are computed changes
+RAMP_FORMAT_VERSION = 1
+
+RAMP_STEPS = 16
+
+
+def _swatches(products: Mapping[str, Any] | list) -> dict[str, dict]:
+    items = products.items() if isinstance(products, Mapping) else ((None, p) for p in products)
+    swatches = {}
+    for key, product in items:
+        swatch = product.get('swatch') if isinstance(product, Mapping) else None
+        if swatch and swatch.get('hex_color'):
+            swatches[product.get('name') or key] = swatch
+    return swatches
+
+
+def build_ramps(swatches: Mapping[str, dict], steps: int = RAMP_STEPS) -> tuple[list[str], np.ndarray]:
+    """
+    Compute the ramps of a set of serialized `ProductSwatch`es.
+
+    Args:
+        swatches: Serialized swatches keyed by product name.
+        steps: The number of colors per ramp.
+
+    Returns:
+        A tuple of the product names and an `(N, steps, 3)` uint8 array of ramps
+        in the same order.
+    """
+    names = list(swatches)
+    if not names:
+        return names, np.empty((0, steps, 3), dtype=np.uint8)
+
+    base = parse_many([swatches[name]['hex_color'] for name in names])
+    base_oklch = rgb_to_oklch_many(base)
+
+    def stop(field: str) -> np.ndarray:
+        # Swatches without a gradient stop fall back to their base color
+        values = base_oklch.copy()
+        for i, name in enumerate(names):
+            value = swatches[name].get(field)
+            if value is not None and len(value) >= 3:
+                values[i] = value[:3]
+        return values
+
+    stops = swatch_stops_many(stop('gradient_start'), base, stop('gradient_end'))
+    return names, ramp_to_rgb_many(ramp_many(stops, steps))
+
+
+def _source_hash(swatches: Mapping[str, dict], steps: int) -> str:
+    payload = json.dumps({
+        'version': RAMP_FORMAT_VERSION,
+        'steps': steps,
+        'swatches': [
+            [name, s.get('hex_color'), s.get('gradient_start'), s.get('gradient_end')]
+            for name, s in swatches.items()
+        ],
+    })
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def generate_swatch_ramps(fs: 'FS', steps: int = RAMP_STEPS, force: bool = False) -> dict[str, int]:
+    """
+    Write the ramp files of every product line in the output directory.
+
+    Args:
+        fs: The filesystem provider.
+        steps: The number of colors per ramp.
+        force: Rebuild product lines whose swatches have not changed.
+
+    Returns:
+        The number of ramps written per `<vendor>/<product line>` (unchanged
+        product lines are omitted).
+    """
+    product_lines: defaultdict[tuple[str, str], dict[str, dict]] = defaultdict(dict)
+    for path in find_products_files(fs.outdir):
+        match = PRODUCTS_FILE_RE.match(os.path.basename(path))
+        products = fs.read(path, throw_on_error=False, default=None)
+        if products:
+            # Swatches are the same in every locale; keep the first one seen
+            for name, swatch in _swatches(products).items():
+                product_lines[(match['vendor'], match['product_line'])].setdefault(name, swatch)
+
+    written = {}
+    for (vendor, product_line), swatches in product_lines.items():
+        manifest_fp = fs.get_file_path(vendor, product_line, 'ramps_manifest')
+        source_hash = _source_hash(swatches, steps)
+        if not force:
+            manifest = fs.read(manifest_fp, throw_on_error=False, default=None)
+            if manifest and manifest.get('source_hash') == source_hash:
+                continue
+
+        names, ramps = build_ramps(swatches, steps)
+        fs.write_bytes(fs.get_file_path(vendor, product_line, 'ramps'), ramps.tobytes())
+        fs.write(manifest_fp, {
+            'version': RAMP_FORMAT_VERSION,
+            'vendor': vendor,
+            'product_line': product_line,
+            'source_hash': source_hash,
+            'dtype': 'uint8',
+            'shape': list(ramps.shape),
+            'products': names,
+        })
+        written[f'{vendor}/{product_line}'] = len(names)
+
+    LOGGER.debug('Wrote swatch ramps for %s product lines', len(written))
+    return written
@@ -4,7 +4,7 @@ from app.core.utils.collection.get import get_
 from app.core.utils.collection.path import to_url
 
 from .ap_product_type_resolvers import assign_application_method, assign_color_agent_product_type, resolve_product_descriptors
-from .ap_swatch_utils import resolve_product_swatch
+from .ap_swatch_utils import resolve_product_swatch, resolve_product_swatches
 from .ap_utils import extract_product_names
 
 
@@ -49,8 +49,29 @@ class APBaseProductLine(ProductLine):
     def set_vendor_categories(self, data: dict):
         self._vendor_categories = data
     
-    def get_swatch(self, product_name: str, imgurl: str, from_fs = False):
+    async def resolve_swatches(self, products: list[dict], from_fs = False):
+        """
+        Resolve the swatches of every product concurrently (@see resolve_product_swatches)
+        before the products are parsed. Products whose swatch could not be resolved are
+        retried one at a time by `get_swatch`.
+        """
         if from_fs:
+            return
+
+        imgurls = {}
+        for product in products:
+            product_name, _ = extract_product_names(product)
+            imgurls[product_name] = product.get('images', [{ 'src': '' }])[0]['src']
+
+        swatches = await resolve_product_swatches(imgurls.values())
+        for product_name, swatch in zip(imgurls, swatches):
+            if isinstance(swatch, Exception):
+                print(f'Could not resolve the swatch for "{product_name}" - {swatch}')
+                continue
+            self._swatches[product_name] = swatch
+
+    def get_swatch(self, product_name: str, imgurl: str, from_fs = False):
+        if from_fs or product_name in self._swatches:
             return self._swatches.get(product_name, {})
 
         swatch = resolve_product_swatch(imgurl)
@@ -1,16 +1,29 @@
 # standard
+import asyncio
+import io
+import logging
+import os
 import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
 
 # packages
 import cv2
-import requests
+import httpx
 import numpy as np
 from PIL import Image, ImageOps
 
+from app.agent.blob_cache import BlobCache, get_blob_cache
 from app.agent.color.color import Color
+from app.agent.fetcher import AsyncFetcher
 from app.agent.models.product_swatch_model import ProductSwatch
 
 
+LOGGER = logging.getLogger(__name__)
+
 pascal_to_snake = re.compile(r'(?<!^)(?=[A-Z])')
 
 def find_existing_swatch_url(imgpath: str):
@@ -24,19 +37,55 @@ def find_existing_swatch_url(imgpath: str):
     path = '_'.join([wpnum, 'WPF', _colorname])
     return f'https://us.thearmypainter.com/cdn/shop/files{path}.png{vid}'
 
-def is_valid_image_url(url):
-    try:
-        response = requests.head(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
+def _is_image(cache: BlobCache, url: str) -> bool:
+    entry = cache.entry(url)
+    return entry is not None and 'image' in (entry.content_type or '')
+
+
+def fetch_swatch_image(imgpath: str) -> tuple[bytes, bool]:
+    """
+    Download the image to sample a product's colors from: the standalone swatch image
+    when the product has one, otherwise the product photo. Rather than checking for the
+    swatch image first (a HEAD and then a GET), it is requested speculatively and the
+    product photo is only requested when it turns out to be missing.
 
-        # Check if the content type is an image
-        return 'image' in response.headers.get('content-type', '')
+    Images are fetched through the blob cache, so unchanged images are read from disk.
 
-    except requests.exceptions.RequestException:
-        return False
+    Returns:
+        The image, and whether it is the swatch image
+    """
+    cache = get_blob_cache()
+    swatch_url = find_existing_swatch_url(imgpath)
+    if swatch_url:
+        try:
+            content = cache.get(swatch_url)
+            if _is_image(cache, swatch_url):
+                return content, True
+        except httpx.HTTPError:
+            pass
+    return cache.get(imgpath), False
+
+
+async def fetch_swatch_image_async(imgpath: str, fetcher: AsyncFetcher) -> tuple[bytes, bool]:
+    """
+    `fetch_swatch_image` with an open `AsyncFetcher`.
+    """
+    cache = get_blob_cache()
+    swatch_url = find_existing_swatch_url(imgpath)
+    if swatch_url:
+        try:
+            content = await cache.aget(swatch_url, fetcher)
+            if _is_image(cache, swatch_url):
+                return content, True
+        except httpx.HTTPError:
+            pass
+    return await cache.aget(imgpath, fetcher), False
+
+# Contours enclosing a smaller area (in pixels, at full resolution) are not the cube
+MIN_HEXAGON_AREA = 10000
 
 def find_largest_hexagon(contours):
-    largest_area = 10000
+    largest_area = MIN_HEXAGON_AREA
     largest_hexagon = np.empty((1, 2))
     approx = np.empty((1, 2))
 
@@ -83,6 +132,80 @@ def largest_from_image(numpy_image):
     return image, largest_hexagon, approx
 
 
+# How the cube is located: 'roi' searches a reduced-resolution crop of the region the
+# cube is expected in (falling back to 'full' when it is not found there), 'full'
+# searches the whole image at full resolution
+HEXAGON_DETECTION = os.environ.get('AP_HEXAGON_DETECTION', 'roi')
+
+# The region of a product photo (left, top, right, bottom, as fractions of its size)
+# the cube is expected in: the area around `calc_default_coords` with a margin
+HEXAGON_ROI = (0.25, 0.35, 0.75, 0.85)
+
+# The factor the region is reduced by before searching it
+HEXAGON_REDUCE = int(os.environ.get('AP_HEXAGON_REDUCE', 2))
+
+
+def _normalize_hexagon(vertices: np.ndarray) -> np.ndarray:
+    """
+    Order the vertices of a hexagon from the top-most one, counter clockwise (as
+    expected by `get_coordinates`).
+    """
+    vertices = np.roll(vertices, -int(np.argmin(vertices[:, 1])), axis=0)
+    if vertices[1][0] > vertices[-1][0]:
+        vertices = np.concatenate([vertices[:1], vertices[:0:-1]])
+    return vertices
+
+
+def largest_hexagon_in_region(
+    image: Image.Image,
+    box: tuple[int, int, int, int] | None = None,
+    factor: int = HEXAGON_REDUCE,
+) -> np.ndarray | None:
+    """
+    Find the largest hexagon within a region of an image, working on a reduced copy of
+    the region: only outer contours are traced (with their straight runs compressed),
+    and only contours large enough to be the cube are approximated by a polygon.
+
+    Args:
+        image: The image.
+        box: The region to search (left, top, right, bottom), the whole image by default.
+        factor: The factor the region is reduced by (@see PIL.Image.Image.reduce).
+
+    Returns:
+        The hexagon's vertices in full-resolution image coordinates (ordered from the
+        top-most vertex, counter clockwise), or `None` when there is no hexagon.
+    """
+    factor = max(1, factor)
+    left, top = box[:2] if box else (0, 0)
+    region = (image.crop(box) if box else image).convert('L')
+    if factor > 1:
+        region = region.reduce(factor)
+
+    blurred = cv2.GaussianBlur(np.asarray(region), (3, 3) if factor > 1 else (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = MIN_HEXAGON_AREA / factor ** 2
+    areas = [(cv2.contourArea(cnt), cnt) for cnt in contours]
+    candidates = sorted((item for item in areas if item[0] > min_area), key=lambda item: item[0], reverse=True)
+    for _, cnt in candidates:
+        approx = cv2.approxPolyDP(cnt, 0.01 * cv2.arcLength(cnt, True), True)
+        if len(approx) == 6:
+            vertices = approx.reshape(-1, 2).astype(np.float64) * factor + (left, top)
+            return _normalize_hexagon(vertices)
+    return None
+
+
+def roi_box(size: tuple[int, int], roi: tuple[float, float, float, float] = HEXAGON_ROI) -> tuple[int, int, int, int]:
+    width, height = size
+    return (
+        round(roi[0] * width),
+        round(roi[1] * height),
+        round(roi[2] * width),
+        round(roi[3] * height),
+    )
+
+
 def from_swatch(imgurl: str):
     image = Image.open(imgurl).convert('RGBA')
     background = Image.new("RGBA", image.size, (255, 0, 255)) # Fuschia
@@ -130,6 +253,16 @@ def calc_default_coords(size: int):
 
 IMG_SIZE = 1000
 
+# Threads decoding images and detecting the cube (`resolve_product_swatches`). Pillow
+# and OpenCV release the GIL while they work, so threads run in parallel.
+AP_IMAGE_WORKERS = int(os.environ.get('AP_IMAGE_WORKERS', os.cpu_count() or 1))
+
+
+def swatch_image_url(imgpath: str, imgsize=IMG_SIZE) -> str:
+    # !! Too large of an image will cause issues locating the hexagon
+    return imgpath + f'&width={imgsize}'
+
+
 def extract_colors_from_image(imgpath: str, imgsize=IMG_SIZE):
     """
     The product color name is overlayed on top of an isometric cube displayed
@@ -143,59 +276,177 @@ def extract_colors_from_image(imgpath: str, imgsize=IMG_SIZE):
     representing the isometric cube. The number of vertices must be equal to 6 and,
     to eliminate false positives, we want the largest hexagonal shape found
     """
-    imgpath += f'&width={imgsize}' # !! Too large of an image will cause issues locating the hexagon
-    raw_img = None
-    has_swatch_url = False
     if imgpath.startswith('http'):
-        swatch_url = find_existing_swatch_url(imgpath)
-        has_swatch_url = is_valid_image_url(swatch_url)
-        if has_swatch_url:
-            raw_img = requests.get(swatch_url, stream=True).raw
-        else:
-            raw_img = requests.get(imgpath, stream=True).raw
-    elif re.search(r'_WPF_', imgpath):
-        has_swatch_url = True
+        content, is_swatch = fetch_swatch_image(swatch_image_url(imgpath, imgsize))
+        return colors_from_image(content, is_swatch, imgsize)
+    return colors_from_image(imgpath, bool(re.search(r'_WPF_', imgpath)), imgsize)
+
+
+@dataclass(frozen=True)
+class ImageTimings:
+    # Milliseconds spent in each stage
+    decode_ms: float
+    detect_ms: float
+    sample_ms: float
+    # The detection that located the cube ('roi' or 'full'), or 'default' when the
+    # default coordinates were used
+    detection: str
+
+    @property
+    def total_ms(self) -> float:
+        return self.decode_ms + self.detect_ms + self.sample_ms
+
+
+def colors_from_image(image_data: bytes | str | BinaryIO, is_swatch: bool, imgsize=IMG_SIZE) -> list[Color]:
+    """
+    Sample the colors of the cube from a downloaded image (@see extract_colors_from_image).
+
+    Args:
+        image_data: The image (its bytes, a path or a file object).
+        is_swatch: Whether the image is a standalone swatch image rather than a product photo.
+    """
+    colors, _ = colors_from_image_timed(image_data, is_swatch, imgsize)
+    return colors
 
-    image = from_swatch(raw_img) if has_swatch_url else Image.open(raw_img).convert('RGB')
 
-    image_np = np.array(image)
+def colors_from_image_timed(
+    image_data: bytes | str | BinaryIO,
+    is_swatch: bool,
+    imgsize=IMG_SIZE,
+    detection: str = HEXAGON_DETECTION,
+) -> tuple[list[Color], ImageTimings]:
+    """
+    `colors_from_image`, also returning how long each stage took.
 
-    _cv_image, _largest_hexagon, approx = largest_from_image(image_np)
-        
-    # Vertices is an array of coordinates that start from the top-most point
-    # and goes around counter clockwise.
-    vertices = approx.reshape(-1, 2)
+    Args:
+        detection: 'roi' or 'full' (@see HEXAGON_DETECTION).
+    """
+    started = time.perf_counter()
+    raw_img = io.BytesIO(image_data) if isinstance(image_data, bytes) else image_data
+
+    image = from_swatch(raw_img) if is_swatch else Image.open(raw_img).convert('RGB')
+    decoded = time.perf_counter()
+
+    vertices = None
+    detected_by = 'default'
+    if detection == 'roi':
+        # A swatch image is (almost) all cube, so only product photos are cropped
+        vertices = largest_hexagon_in_region(image, None if is_swatch else roi_box(image.size))
+        detected_by = 'roi'
+    if vertices is None:
+        image_np = np.array(image)
+
+        _cv_image, _largest_hexagon, approx = largest_from_image(image_np)
+            
+        # Vertices is an array of coordinates that start from the top-most point
+        # and goes around counter clockwise.
+        vertices = approx.reshape(-1, 2)
+        detected_by = 'full'
 
     if len(vertices) != 6:
         vertices = calc_default_coords(imgsize)
+        detected_by = 'default'
+    detected = time.perf_counter()
     
     color_coords = get_coordinates(vertices)
 
     colors = [Color(image.getpixel(coords)) for coords in color_coords]
 
     colors.sort(key=lambda color: color.lightness, reverse=True)
+    sampled = time.perf_counter()
 
-    return colors
+    return colors, ImageTimings(
+        decode_ms=(decoded - started) * 1000,
+        detect_ms=(detected - decoded) * 1000,
+        sample_ms=(sampled - detected) * 1000,
+        detection=detected_by,
+    )
 
     # cv2.imshow('Image', _cv_image)
     # cv2.waitKey(0)
     # cv2.destroyAllWindows()
 
 
-def resolve_product_swatch(imgurl: str):
+def swatch_from_colors(colors: list[Color]):
     # Color instances sorted by lightness
-    start, base, end = extract_colors_from_image(imgurl)
-    iscc_nbs_color_data = base.get_color_category_data()
+    start, base, end = colors
+    iscc_nbs_color_data = base.iscc_nbs_data
 
     return {
-        "color_range": iscc_nbs_color_data['color_range'],
-        "analogous": iscc_nbs_color_data['analogous'],
-        "iscc_nbs_category": iscc_nbs_color_data['iscc_nbs_category'],
+        "color_range": iscc_nbs_color_data.color_range,
+        "analogous": iscc_nbs_color_data.analogous,
+        "iscc_nbs_category": iscc_nbs_color_data.iscc_nbs_category,
         "swatch": ProductSwatch(
-            hex_color=base.to_hex(),
+            hex_color=base.hex,
             rgb_color=base.rgb,
-            oklch_color=base.to_oklch(),
-            gradient_start=start.to_oklch(),
-            gradient_end=end.to_oklch(),
+            oklch_color=base.oklch,
+            gradient_start=start.oklch,
+            gradient_end=end.oklch,
         )
     }
+
+
+def resolve_product_swatch(imgurl: str):
+    return swatch_from_colors(extract_colors_from_image(imgurl))
+
+
+async def resolve_product_swatches(
+    imgurls: Iterable[str],
+    fetcher: Optional[AsyncFetcher] = None,
+    workers: int = AP_IMAGE_WORKERS,
+    imgsize=IMG_SIZE,
+) -> list[dict | Exception]:
+    """
+    Resolve the swatches of many products, overlapping the downloads with the image
+    processing: each image is fetched concurrently over one keep-alive connection pool,
+    then decoded and scanned for the cube in a pool of worker threads while the other
+    downloads continue.
+
+    Args:
+        imgurls: The product image URLs.
+        fetcher: An open `AsyncFetcher` to share (one is created for the batch otherwise).
+        workers: The number of threads processing images.
+
+    Returns:
+        The swatch data (@see resolve_product_swatch) or the exception raised for each
+        image, in order.
+    """
+    if fetcher is None:
+        async with AsyncFetcher() as batch_fetcher:
+            return await resolve_product_swatches(imgurls, batch_fetcher, workers, imgsize)
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        timings: list[ImageTimings] = []
+
+        def process(imgurl: str, content: bytes, is_swatch: bool):
+            colors, image_timings = colors_from_image_timed(content, is_swatch, imgsize)
+            timings.append(image_timings)
+            LOGGER.debug(
+                '%s: decoded in %.1f ms, cube found (%s) in %.1f ms, sampled in %.1f ms',
+                imgurl,
+                image_timings.decode_ms,
+                image_timings.detection,
+                image_timings.detect_ms,
+                image_timings.sample_ms,
+            )
+            return swatch_from_colors(colors)
+
+        async def resolve(imgurl: str):
+            content, is_swatch = await fetch_swatch_image_async(swatch_image_url(imgurl, imgsize), fetcher)
+            return await loop.run_in_executor(executor, process, imgurl, content, is_swatch)
+
+        results = await asyncio.gather(*(resolve(imgurl) for imgurl in imgurls), return_exceptions=True)
+
+    if timings:
+        detections = {}
+        for image_timings in timings:
+            detections[image_timings.detection] = detections.get(image_timings.detection, 0) + 1
+        LOGGER.info(
+            'Processed %s images in %.1f ms (mean %.1f ms to find the cube), found by %s',
+            len(timings),
+            sum(t.total_ms for t in timings),
+            sum(t.detect_ms for t in timings) / len(timings),
+            detections,
+        )
+    return results
@@ -8,7 +8,7 @@ import httpx
 from parsel import Selector
 
 # local
-from app.agent.models import Product, ProductLine, Vendor
+from app.agent.models import Product, ProductLine, Vendor, set_swatch_contrast
 from app.agent.providers import FS
 from app.core.utils.collection.path import to_url
 from app.core.utils.serializer import serialize
@@ -148,6 +148,9 @@ class ArmyPainter(Vendor):
             else:
                 products = product_line.products
 
+            # Store the label contrast of every swatch with the products
+            set_swatch_contrast(products)
+
             # (Re)write the products to the filesystem
             self.fs.write(products_fp, serialize(products))
 
@@ -21,6 +21,7 @@ class WarpaintsFanatic(APBaseProductLine):
         products: list[dict],
         from_fs = False
     ):
+        await self.resolve_swatches(products, from_fs)
         models = [self.parse_product(product, from_fs) for product in products]
         product_map = { model['name']: model for model in models }
         self._products = product_map
@@ -1,4 +1,5 @@
 # standard
+import asyncio
 from functools import reduce
 from typing import TYPE_CHECKING
 
@@ -17,7 +18,7 @@ from app.core.utils.collection.get import get_
 from app.core.utils.collection.path import to_url
 
 from ._algolia import GwAlgoliaProduct
-from .svg_parser import extract_colors_from_svg
+from .svg_parser import extract_colors_from_svg, extract_colors_from_svg_many, fetch_citadel_svgs, unprocessable_cache
 
 if TYPE_CHECKING:
     from app.agent.models.vendor import VendorABC as Vendor
@@ -76,7 +77,7 @@ class Citadel(ProductLine):
         from_fs = False
     ):
         sorted_products = self._sort_products(products)
-        self.process_swatches(sorted_products, from_fs)
+        await self.process_swatches(sorted_products, from_fs)
         self.parse_products(sorted_products)
 
     def _sort_products(self, products: list[dict]):
@@ -233,9 +234,8 @@ class Citadel(ProductLine):
                 return ProductDescriptors()
 
 
-    def process_swatches(self, products_map: dict[str, dict], from_fs=False):
-        if self.vendor.state.locale != 'en-US' or from_fs:
-            # We only want to fetch and scan the images once, not across all regions
+    async def process_swatches(self, products_map: dict[str, dict], from_fs=False):
+        if from_fs:
             filepath = self.vendor.fs.get_file_path(
                 self.vendor.slug,
                 self.slug,
@@ -251,12 +251,37 @@ class Citadel(ProductLine):
                     return product
             return products[0]
 
+        swatch_sources = []
         for product_name, products in products_map.items():
             product = get_base_variant(products)
             vendor_product_type = self.vendor.get_category(product, 'product_type', [''])[0]
             vendor_imgurl = product.get('images', [''])[0]
             imgurl = to_url(self.vendor.vendor_baseurl, vendor_imgurl)
-            color_info = self.parse_color_info(imgurl, vendor_product_type)
+            swatch_sources.append((product_name, imgurl, vendor_product_type))
+
+        # Fetch every SVG concurrently, then parse them in product order. SVGs already
+        # parsed (in another locale or a previous run) are served from the SVG cache, and
+        # unchanged SVGs are revalidated rather than downloaded (@see blob_cache)
+        svgs = await fetch_citadel_svgs([imgurl for _, imgurl, _ in swatch_sources])
+
+        fetched = []
+        for (product_name, imgurl, vendor_product_type), svg in zip(swatch_sources, svgs):
+            if svg is None:
+                unprocessable_cache.append(product_name)
+                continue
+            fetched.append((product_name, svg, vendor_product_type))
+
+        # Parsing is CPU-bound, so it runs in a process pool off the event loop thread
+        results = await asyncio.to_thread(
+            extract_colors_from_svg_many,
+            [svg for _, svg, _ in fetched],
+            [vendor_product_type for _, _, vendor_product_type in fetched],
+        )
+        for (product_name, _, _), color_info in zip(fetched, results):
+            if isinstance(color_info, Exception):
+                print(f'Exception while parsing the SVG for "{product_name}" - {color_info}')
+                unprocessable_cache.append(product_name)
+                continue
             self._swatches[product_name] = color_info
 
 
@@ -271,8 +296,10 @@ class Citadel(ProductLine):
             'product_type': product_type_data.keys()
         }
 
-    def parse_color_info(self, imgurl: dict, vendor_product_type: str):
+    def parse_color_info(self, svg: str, vendor_product_type: str):
         """
+        Resolve the swatch data of a product from its SVG markup (or the URL of the SVG).
+
         SVGProductMeta:
             iscc_nbs_category: str
             color_range: str
@@ -288,7 +315,7 @@ class Citadel(ProductLine):
 
             tags: list[str]
         """
-        product_meta = extract_colors_from_svg(imgurl, product_type=vendor_product_type)
+        product_meta = extract_colors_from_svg(svg, product_type=vendor_product_type)
 
         return product_meta
 
@@ -7,7 +7,7 @@ from httpx import HTTPError
 from injector import inject
 
 # local
-from app.agent.models import Vendor
+from app.agent.models import Vendor, set_swatch_contrast
 from app.agent.providers import FS
 
 from ._algolia import find_algolia_keys, scrape_search, set_request_body
@@ -91,4 +91,5 @@ class GamesWorkshop(Vendor):
         await product_line.resolve(product_line_data, from_fs=self._from_fs)
         if not from_fs:
             filepath = self.fs.get_file_path(self.slug, product_line.slug, 'products')
+            set_swatch_contrast(product_line.products)
             self.fs.write(filepath, product_line.products)
@@ -0,0 +1,189 @@
+# standard
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+# packages
+from lxml import etree
+
+"""
+A single-pass summary of a Citadel swatch SVG.
+
+The swatch parser only needs a handful of facts about an SVG: its gradients and
+their `stop`s, the class rules of its `style` blocks, the attributes of the first
+`rect`, `g` and `path` elements, and how many texture paths it draws. Rather than
+querying the document once per fact, `SVGDocument.parse` streams through the
+markup once with `lxml.etree.iterparse` and collects all of them.
+
+The markup is parsed with lxml's HTML parser, the same way `parsel.Selector`
+parses it, so tag and attribute names are lowercased (e.g., `radialgradient`)
+and the resulting facts match what the equivalent CSS/XPath queries would find.
+
+`style` blocks are parsed once into a `class -> {property: value}` table (see
+`parse_class_rules`), so looking up a class' fill is a dictionary hit rather than
+a regex search over the style text.
+
+Example:
+--------
+>>> doc = SVGDocument.parse('<svg id="x_1_base"><g><rect fill="#9a1115"/></g></svg>')
+>>> doc.first('rect')
+{'fill': '#9a1115'}
+"""
+
+GRADIENT_TAGS = ('radialgradient', 'lineargradient')
+
+# Only the first element of each of these tags is recorded
+FIRST_ELEMENT_TAGS = ('rect', 'g', 'path')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# A rule without nested blocks (the rules inside an at-rule are matched on their own)
+CSS_RULE_RE = re.compile(r'([^{}]*)\{([^{}]*)\}')
+CSS_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+# The compound selector an element must match (after the last combinator)
+CSS_COMBINATOR_RE = re.compile(r'\s*[\s>+~]\s*')
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?#(.+?)[\'"]?\s*\)')
+
+
+@dataclass
+class SVGGradient:
+    tag: str
+    attrib: dict[str, str]
+    # Attributes of every `stop` element within the gradient, in document order
+    stops: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.attrib.get('id')
+
+
+def parse_class_rules(css: str, rules: Optional[dict[str, dict[str, str]]] = None) -> dict[str, dict[str, str]]:
+    """
+    Parse a style sheet into the declarations of each class, e.g.,
+    `'.cls-1,.cls-2{fill:url(#a);}'` -> `{'cls-1': {'fill': 'url(#a)'}, 'cls-2': {...}}`.
+
+    A declaration applies to the classes of each selector's subject (its last compound
+    selector). Later declarations override earlier ones, as in the cascade (selector
+    specificity is not taken into account).
+
+    Args:
+        css: The style sheet text.
+        rules: An existing table to add the declarations to.
+    """
+    rules = {} if rules is None else rules
+    for selectors, block in CSS_RULE_RE.findall(CSS_COMMENT_RE.sub('', css)):
+        declarations = {}
+        for declaration in block.split(';'):
+            prop, sep, value = declaration.partition(':')
+            if sep and prop.strip():
+                declarations[prop.strip().lower()] = value.replace('!important', '').strip()
+        if not declarations:
+            continue
+        for selector in selectors.split(','):
+            subject = CSS_COMBINATOR_RE.split(selector.strip())[-1]
+            for cls in CSS_CLASS_RE.findall(subject):
+                rules.setdefault(cls, {}).update(declarations)
+    return rules
+
+
+def css_url_ref(value: Optional[str]) -> Optional[str]:
+    """
+    The ID referenced by a `url(#id)` value, if any.
+    """
+    found = CSS_URL_RE.search(value) if value else None
+    return found.group(1).strip() if found else None
+
+
+@dataclass
+class SVGDocument:
+    # The first `id` of an `svg` element
+    svg_id: Optional[str] = None
+    # Gradients by tag name, in document order
+    gradients: dict[str, list[SVGGradient]] = field(default_factory=lambda: {tag: [] for tag in GRADIENT_TAGS})
+    # Attributes of the first element of each of `FIRST_ELEMENT_TAGS`
+    elements: dict[str, dict[str, str]] = field(default_factory=dict)
+    # Declarations of every class defined in the `style` blocks
+    class_rules: dict[str, dict[str, str]] = field(default_factory=dict)
+    # Attributes of every `stop` within a radial gradient (`radialgradient stop`)
+    radial_stops: list[dict[str, str]] = field(default_factory=list)
+    # The number of `g > g > g > path` elements (texture paths of terrain paints)
+    texture_path_count: int = 0
+
+    def first(self, tag: str) -> dict[str, str]:
+        """
+        The attributes of the first `tag` element (empty if there is none).
+        """
+        return self.elements.get(tag, {})
+
+    def has(self, tag: str) -> bool:
+        return tag in self.elements
+
+    def class_style(self, classes: str) -> Optional[dict[str, str]]:
+        """
+        The declarations that apply to an element's `class` attribute, or `None` when
+        none of its classes are defined in a `style` block.
+        """
+        declarations = None
+        for cls in classes.split():
+            if cls in self.class_rules:
+                declarations = {**(declarations or {}), **self.class_rules[cls]}
+        return declarations
+
+    @classmethod
+    def parse(cls, content: str | bytes) -> 'SVGDocument':
+        """
+        Collect everything the swatch parser needs from SVG markup in one traversal.
+        """
+        if isinstance(content, str):
+            content = content.strip().replace('\x00', '').encode('utf-8')
+        doc = cls()
+        if not content:
+            return doc
+
+        # Tag names of the open elements, and the gradients currently open
+        stack: list[str] = []
+        open_gradients: list[SVGGradient] = []
+        open_radial = 0
+
+        events = etree.iterparse(io.BytesIO(content), events=('start', 'end'), html=True, recover=True, encoding='utf-8')
+        for event, element in events:
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+
+            if event == 'start':
+                if tag == 'svg' and doc.svg_id is None and 'id' in element.attrib:
+                    doc.svg_id = element.attrib['id']
+                elif tag in GRADIENT_TAGS:
+                    gradient = SVGGradient(tag=tag, attrib=dict(element.attrib))
+                    doc.gradients[tag].append(gradient)
+                    open_gradients.append(gradient)
+                    open_radial += tag == 'radialgradient'
+                elif tag == 'stop':
+                    stop = dict(element.attrib)
+                    for gradient in open_gradients:
+                        gradient.stops.append(stop)
+                    if open_radial:
+                        doc.radial_stops.append(stop)
+                elif tag == 'path' and stack[-3:] == ['g', 'g', 'g']:
+                    doc.texture_path_count += 1
+
+                if tag in FIRST_ELEMENT_TAGS and tag not in doc.elements:
+                    doc.elements[tag] = dict(element.attrib)
+                stack.append(tag)
+                continue
+
+            # end
+            stack.pop()
+            if tag in GRADIENT_TAGS:
+                open_gradients.pop()
+                open_radial -= tag == 'radialgradient'
+            elif tag == 'style':
+                parse_class_rules(
+                    etree.tostring(element, method='text', encoding='unicode', with_tail=False),
+                    doc.class_rules,
+                )
+            # Everything needed from the element has been recorded
+            element.clear(keep_tail=True)
+
+        return doc
@@ -1,39 +1,55 @@
 # standard
+import hashlib
+import json
+import multiprocessing
+import os
 import re
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from parsel import Selector, SelectorList
 from typing import Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+# packages
+import httpx
 
 # local
+from app.agent.blob_cache import get_blob_cache
 from app.agent.color import Color
+from app.agent.color.cache import ColorCache
+from app.agent.color.color import iscc_nbs_cache_version
+from app.agent.color.iscc_nbs_lut import configure_iscc_nbs_lut, get_iscc_nbs_lut, get_lut_dir, prepare_iscc_nbs_lut
+from app.agent.fetcher import AsyncFetcher
+from app.agent.kv_store import KeyValueStore
 from app.agent.models import IsccNbsData, ProductSwatch
 from app.core.enums import Overlay
 from app.core.utils.collection.path import isurl
 from app.core.utils.collection.string import capitalize
+from app.core.utils.serializer import serialize
 
 from ._algolia import get_algolia_headers
+from .svg_document import GRADIENT_TAGS, SVGDocument, css_url_ref
 
 """
 The functions in this file attempt the following:
 
 1. Takes SVG content as input and returns a list of RGB tuples
-2. Uses helper functions to:
+2. Reads the SVG once into an `SVGDocument` (gradients, stops, style blocks and the first
+   `rect`/`g`/`path`), which all of the helpers below work from
+3. Uses helper functions to:
    - Extract color values from both attributes and style definitions
    - Extract color values from any `stop` elements in any found gradient
-3. Takes found color values and generates Color instances to handle:
+4. Takes found color values and generates Color instances to handle:
    - Converting hex colors to RGB tuples
    - Converting CSS RGB strings to (R, G, B) tuples
    - Extract color values from both attributes and style definitions
-4. First checks the `rect` element for direct color values
-5. If the rect has a defined `fill` with a gradient reference, processes the gradient stops
-6. If the rect has no defined `fill`, it checks for a class, if found, it searches for a `style`
+5. First checks the `rect` element for direct color values
+6. If the rect has a defined `fill` with a gradient reference, processes the gradient stops
+7. If the rect has no defined `fill`, it checks for a class, if found, it searches for a `style`
    block where the class is defined. If the class' declaration block defines a fill with a
    gradient reference, it finds the gradient and processes any `stop` elements therein.
-6. If only two colors are found in a gradient, calculates a middle color
-7. Falls back to checking the `g` element if no colors are found
-8. Raises an exception if no valid colors are found
+8. If only two colors are found in a gradient, calculates a middle color
+9. Falls back to checking the `g` element if no colors are found
+10. Raises an exception if no valid colors are found
 
 The initial code was generated by Claude Sonnet 3.5 and based that code upon a prompt that included several
 sample SVGs from the Citadel paints product display page on Games Workshops' warhammer.com retail site. The
@@ -77,7 +93,8 @@ Returns a list of Color objects so that color values can be converted to other c
 
 def fetch_citadel_svg(imgurl: str):
     """
-    Open the URL for an individual SVG on the GW site and grab the markup.
+    Open the URL for an individual SVG on the GW site and grab the markup. The SVG
+    is fetched through the blob cache, so an unchanged SVG is read from disk.
 
     Args:
     -----
@@ -89,34 +106,72 @@ def fetch_citadel_svg(imgurl: str):
         coming from the Games Workshop site.
         """
         # We need the configured Algolia headers to make the request for an image
-        image_headers = get_algolia_headers('en-US')
-        req = Request(imgurl, headers=image_headers)
-        page = urlopen(req).read()
+        page = get_blob_cache().get(imgurl, headers=get_svg_fetch_headers('en-US'))
         html = page.decode('utf-8')
         return html
-    except HTTPError as herr:
+    except httpx.HTTPStatusError as herr:
         print(f'HTTP-related error when fetching SVG from Games Workshop - {herr}')
         raise herr
-    except URLError as urlerr:
+    except httpx.HTTPError as urlerr:
         print(f'Could not fetch SVG from Games Workshop due to a URL-related error. Verify the URL is correct - {urlerr}')
         raise urlerr
     except Exception as exc:
         print(f'Exception while requesting SVG from Games Workshop - {exc}')
         raise exc
 
+def get_svg_fetch_headers(locale: str = 'en-US') -> dict[str, str]:
+    headers = get_algolia_headers(locale)
+    # Let httpx negotiate the encodings it can decode (it cannot decode brotli or
+    # zstd unless the optional packages are installed)
+    headers.pop('Accept-Encoding', None)
+    return headers
+
+
+async def fetch_citadel_svgs(imgurls: list[str], fetcher: Optional[AsyncFetcher] = None) -> list[Optional[str]]:
+    """
+    Fetch the SVGs of many products concurrently over one keep-alive connection pool,
+    through the blob cache (unchanged SVGs are revalidated rather than downloaded).
+
+    Args:
+    -----
+        imgurls - The URLs for the SVGs
+        fetcher - An open `AsyncFetcher` to share (one is created for the batch otherwise)
+
+    Returns:
+    --------
+        The markup of each SVG, in order, or `None` for an SVG that could not be fetched
+    """
+    if fetcher is None:
+        async with AsyncFetcher(headers=get_svg_fetch_headers()) as batch_fetcher:
+            return await fetch_citadel_svgs(imgurls, batch_fetcher)
+
+    svgs: list[Optional[str]] = []
+    for imgurl, result in zip(imgurls, await get_blob_cache().aget_many(imgurls, fetcher)):
+        if isinstance(result, httpx.HTTPStatusError):
+            print(f'HTTP-related error when fetching SVG from Games Workshop ({imgurl}) - {result}')
+        elif isinstance(result, httpx.HTTPError):
+            print(f'Could not fetch SVG from Games Workshop ({imgurl}). Verify the URL is correct - {result}')
+        elif isinstance(result, Exception):
+            print(f'Exception while requesting SVG from Games Workshop ({imgurl}) - {result}')
+        else:
+            svgs.append(result.decode('utf-8'))
+            continue
+        svgs.append(None)
+    return svgs
+
 def to_swatch_color(colors: list[Color], overlay: Overlay | None):
     """
     Convert a list of Color instances to a list of RGB tuples
     """
     start, base, end = colors
-    return ProductSwatch({
-        'hex_color': base.to_hex(),
-        'rgb_color': base.rgb,
-        'oklch_color': base.to_oklch(),
-        'gradient_start': start.to_oklch(),
-        'gradient_end': end.to_oklch(),
-        'overlay': overlay,
-    })
+    return ProductSwatch(
+        hex_color=base.hex,
+        rgb_color=base.rgb,
+        oklch_color=base.oklch,
+        gradient_start=start.oklch,
+        gradient_end=end.oklch,
+        overlay=overlay,
+    )
 
 DEFAULT_COLOR_STOPS = ['#000000' for i in range(3)]
 
@@ -137,7 +192,7 @@ class SVGProductMeta(IsccNbsData):
         viscosity - How thick the paint is and how it behaves
     """
     # colors: list[Color] = field(defaulT=DEFAULT_COLOR_STOPS)
-    swatch: ProductSwatch
+    swatch: ProductSwatch | None = None
     tags: list[str] = field(default_factory=list)
     # overlay: Overlay | None = None
 
@@ -169,19 +224,19 @@ class SVGProductMeta(IsccNbsData):
     #     return to_json(self._output())
 
 
-def _get_attr_value(selector: Selector, attr: str, default: Optional[str] = None) -> str:
+def _get_attr_value(attrib: Mapping[str, str], attr: str, default: Optional[str] = None) -> str:
     """
-    Helper function to extract attribute possibly containing color value from a selected element
+    Helper function to extract attribute possibly containing color value from an element's attributes
     """
-    value = selector.attrib.get(attr, default)
-    if not value and 'style' in selector.attrib:
-        style = selector.attrib['style']
+    value = attrib.get(attr, default)
+    if not value and 'style' in attrib:
+        style = attrib['style']
         found = re.search(fr'{attr}:\s*([^;]+)', style)
         if found:
             value = found.group(1)
     return value.strip() if value else default
 
-def _set_colors_from_stops(stops: list[Selector]):
+def _set_colors_from_stops(stops: list[Mapping[str, str]]):
     """
     Helper function to iterate over a gradient element's `stop` children, extract their
     `color-stop` values, convert them into Color instances and set them in a list that
@@ -228,7 +283,7 @@ def _create_color_details(
     }
 
     
-def _get_gradient_color_details(selector: Selector, gradient_ref_id: Optional[str] = None) -> list[Selector]:
+def _get_gradient_color_details(doc: SVGDocument, gradient_ref_id: Optional[str] = None) -> Optional[dict]:
     # Found gradient element
     gradient_el: Optional[str] = None
     # ID of found gradient
@@ -240,25 +295,19 @@ def _get_gradient_color_details(selector: Selector, gradient_ref_id: Optional[st
 
     # Color values wrapped in `Color` instances from when stop-color values are found
     colors: list[Color] = []
-    gradient: Optional[Selector] = None
+    gradient = None
 
     # Check for both linear and radial gradients
-    for element in ['radialgradient', 'lineargradient']:
-        gradients = selector.css(element)
-        if gradients is None:
-            return
-        for gradient_sel in gradients:
-            xlink = gradient_sel.attrib.get('xlink:href', None)
+    for element in GRADIENT_TAGS:
+        for gradient_data in doc.gradients[element]:
+            xlink = gradient_data.attrib.get('xlink:href', None)
             if xlink:
-                ref_id = gradient_sel.attrib.get('id')
-            stops: Optional[SelectorList] = gradient_sel.css('stop')
-            if stops is None:
-                continue
-            stop_colors = _set_colors_from_stops(stops)
+                ref_id = gradient_data.id
+            stop_colors = _set_colors_from_stops(gradient_data.stops)
             if len(stop_colors):
                 colors = stop_colors
-                gradient = gradient_sel
-                gradient_id = gradient.attrib.get('id')
+                gradient = gradient_data
+                gradient_id = gradient.id
                 gradient_el = element
 
     if gradient:
@@ -266,29 +315,29 @@ def _get_gradient_color_details(selector: Selector, gradient_ref_id: Optional[st
     return None
 
 
-def _style_block_w_url_fill(style_content: str, cls: str, testid: Optional[str] = None):
-    found = re.search(r'\.' + cls + r'.+?\bfill\b:\s?url\(#(.+?)\)', style_content, re.DOTALL)
-    return _sanitize_gradient_id(found.group(1)) if found else None
+def _style_block_w_url_fill(declarations: Mapping[str, str], testid: Optional[str] = None):
+    gradient_id = css_url_ref(declarations.get('fill'))
+    return _sanitize_gradient_id(gradient_id) if gradient_id else None
 
-def _style_block_w_hex_fill(style_content: str, cls: str):
-    found = re.search(r'\.' + cls + r'.+?\bfill\b:\s?(#.+?);', style_content, re.DOTALL)
-    return found.group(1).strip() if found else None
+def _style_block_w_hex_fill(declarations: Mapping[str, str]):
+    fill = declarations.get('fill', '')
+    return fill if fill.startswith('#') else None
 
-def _style_block_w_rgb_fill(style_content: str, cls: str):
-    found = re.search(r'\.' + cls + r'.+?\bfill\b:\s?(rgb\(.+?\))', style_content)
-    return found.group(1).strip() if found else None
+def _style_block_w_rgb_fill(declarations: Mapping[str, str]):
+    fill = declarations.get('fill', '')
+    return fill if fill.startswith('rgb(') else None
 
-def _from_style_block(selector: Selector, cls: str):
-    style_content = selector.xpath(f'//style[contains(.,".{cls}")]/text()').get()
+def _from_style_block(doc: SVGDocument, cls: str):
+    declarations = doc.class_style(cls)
 
-    if style_content is None:
+    if declarations is None:
         return None
 
-    value = _style_block_w_url_fill(style_content, cls)
+    value = _style_block_w_url_fill(declarations)
     if value is None:
-        value = _style_block_w_hex_fill(style_content, cls)
+        value = _style_block_w_hex_fill(declarations)
     if value is None:
-        value = _style_block_w_rgb_fill(style_content, cls)
+        value = _style_block_w_rgb_fill(declarations)
     return value
 
 
@@ -298,27 +347,22 @@ def _sanitize_gradient_id(gradient_id: str):
     return re.escape(gradient_id.strip()) if '#' in gradient_id else gradient_id.strip()
 
 
-def _resolve_color_details_from_element(selector: Selector, el: str, testid: Optional[str] = None) -> str:
+def _resolve_color_details_from_element(doc: SVGDocument, el: str, testid: Optional[str] = None) -> Optional[dict]:
     """
-    Helper function to extract attribute possibly containing color value from a selected element
+    Helper function to extract attribute possibly containing color value from the first element
+    of a given type
     """
-    element = selector.css(el)
-    if element is None:
-        return None
-
     # attributes
-    fill = element.attrib.get('fill', '')
-    cls = element.attrib.get('class', '')
-
-    # selectors
-    style = selector.css('style')
+    element = doc.first(el)
+    fill = element.get('fill', '')
+    cls = element.get('class', '')
 
     if len(fill):
         if fill.startswith('url(#'):
             found = re.search(r'url\(#(.+?)\)', fill)
             gradient_id = _sanitize_gradient_id(found.group(1)) if found else None
             if gradient_id:
-                color_details = _get_gradient_color_details(selector, gradient_id)
+                color_details = _get_gradient_color_details(doc, gradient_id)
                 if color_details and (gradient_id == color_details['ref_id'] or gradient_id == color_details['gradient_id']):
                     return color_details
         else:
@@ -326,17 +370,18 @@ def _resolve_color_details_from_element(selector: Selector, el: str, testid: Opt
             if color_details:
                 return color_details
             
-    if len(cls) and style:
-        style_content = selector.xpath(f'//style[contains(.,".{cls}")]/text()').get()
-        gradient_id = _style_block_w_url_fill(style_content, cls, testid=testid)
+    declarations = doc.class_style(cls) if len(cls) else None
+
+    if declarations is not None:
+        gradient_id = _style_block_w_url_fill(declarations, testid=testid)
         if gradient_id:
-            color_details = _get_gradient_color_details(selector, gradient_id)
+            color_details = _get_gradient_color_details(doc, gradient_id)
             if color_details and (gradient_id == color_details['ref_id'] or gradient_id == color_details['gradient_id']):
                 return color_details
         else:
-            fill = _style_block_w_hex_fill(style_content, cls)
+            fill = _style_block_w_hex_fill(declarations)
             if fill is None:
-                fill = _style_block_w_rgb_fill(style_content, cls)
+                fill = _style_block_w_rgb_fill(declarations)
             if fill:
                 color_details = _create_color_details(color=fill.strip(), el_type=el)
                 return color_details
@@ -344,7 +389,7 @@ def _resolve_color_details_from_element(selector: Selector, el: str, testid: Opt
     return None
 
 
-def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] = None):
+def _get_product_data_from_svg(doc: SVGDocument, product_type: Optional[str] = None):
     """
     Resolve and extract category-related data from reading the SVG's structure. Most
     paint types produced by GW have a unique way of "decorating" the paint pot shape
@@ -352,7 +397,7 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
     documented in a README.md.
     """
     if not product_type:
-        svg_id = selector.xpath('//svg/@id').get()
+        svg_id = doc.svg_id
         if svg_id:
             found = re.search('[0-9]_([a-z]+)', svg_id)
             if found:
@@ -363,11 +408,10 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
 
     # Is the product a metallic paint? Metallic paints are distinguished in the SVG with
     # a radial gradient in the `defs` at the end of the file and THREE `stop` elements.
-    radial_stops = selector.css('radialgradient stop').getall()
-    is_metallic = len(radial_stops) == 3
+    is_metallic = len(doc.radial_stops) == 3
 
     # Is the product a type of paint medium or varnish
-    is_medium = product_type == 'Technical' and selector.css('rect').get() is None
+    is_medium = product_type == 'Technical' and not doc.has('rect')
 
     # product_meta = SVGProductMeta()
     tags: list[str] = []
@@ -386,12 +430,11 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
                 tags.append('Medium')
                 return { 'tags': tags, 'overlay': overlay }
 
-            texture_group = selector.css('g > g > g > path').getall()
-            path_count = len(texture_group)
+            path_count = doc.texture_path_count
 
             if path_count:
                 tags.append('Terrain Effect')
-                pathcount = len(texture_group)
+                pathcount = path_count
                 if pathcount == 9:
                     overlay = Overlay.grunge
                 if pathcount == 13:
@@ -402,7 +445,7 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
                 return { 'tags': tags, 'overlay': overlay }
 
             tags.append('Special Effect')
-            overlay_stop = selector.css('radialgradient stop')
+            overlay_stop = doc.radial_stops[0] if doc.radial_stops else {}
             overlay_stop_color = _get_attr_value(overlay_stop, 'stop-color')
             if overlay_stop_color == 'white':
                 """
@@ -410,7 +453,7 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
                 indicating a glossy finish.
                 """
                 tags.append('Gloss Finish')
-                overlay = 'glossy'
+                overlay = Overlay.glossy
             return { 'tags': tags, 'overlay': overlay }
         case _:
             return { 'tags': tags, 'overlay': overlay }
@@ -418,6 +461,136 @@ def _get_product_data_from_svg(selector: Selector, product_type: Optional[str] =
 unprocessable_cache = []
 
 
+"""
+Parsed SVGs, memoized by the content hash of their (normalized) markup, so an SVG
+seen in another locale or a previous run is not parsed or classified again. The
+in-memory cache holds the JSON of each `SVGProductMeta`; the optional persistent
+store is shared by every locale and run. @see attach_svg_meta_store
+"""
+SVG_META_CACHE = ColorCache(maxsize=int(os.environ.get('SVG_META_CACHE_MAXSIZE', 4096)))
+SVG_META_STORE: KeyValueStore | None = None
+
+# Worker processes (and SVGs per task) of `extract_colors_from_svg_many`
+SVG_PARSE_WORKERS = int(os.environ.get('SVG_PARSE_WORKERS', os.cpu_count() or 1))
+SVG_PARSE_CHUNK_SIZE = int(os.environ.get('SVG_PARSE_CHUNK_SIZE', 32))
+
+# How the worker processes are started. Never 'fork': the pool is started from a thread
+# while the event loop, HTTP clients and SQLite stores are live, and a forked worker can
+# deadlock on any lock another thread held at the time
+SVG_PARSE_START_METHOD = os.environ.get(
+    'SVG_PARSE_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn',
+)
+
+# `ProductSwatch` fields restored as tuples when a memoized swatch is loaded
+SWATCH_TUPLE_FIELDS = ('rgb_color', 'oklch_color', 'gradient_start', 'gradient_end')
+
+# Whitespace between tags, which does not change what is parsed from the markup
+INTERTAG_WHITESPACE_RE = re.compile(rb'>\s+<')
+
+
+def svg_meta_cache_version() -> str:
+    """
+    Content hash of the code and data a memoized `SVGProductMeta` depends on (this
+    parser, `SVGDocument` and the color classification data). Persistent stores
+    stamped with a different version are discarded.
+    """
+    digest = hashlib.sha256(iscc_nbs_cache_version().encode('utf-8'))
+    for module_path in (__file__, os.path.join(os.path.dirname(__file__), 'svg_document.py')):
+        with open(module_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def svg_meta_cache_key(content: str | bytes, product_type: Optional[str]) -> str:
+    """
+    The memoization key of an SVG: a hash of its normalized markup and the product
+    type (which decides the tags and overlay).
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    content = content.strip().replace(b'\x00', b'').replace(b'\r\n', b'\n')
+    content = INTERTAG_WHITESPACE_RE.sub(b'><', content)
+    digest = hashlib.sha256(content)
+    digest.update(b'\x00' + (product_type or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def attach_svg_meta_store(store: KeyValueStore) -> int:
+    """
+    Use a persistent store as a second-level cache for parsed SVGs and warm the
+    in-memory cache with its most recent entries.
+
+    Returns:
+        The number of entries loaded into the in-memory cache.
+    """
+    global SVG_META_STORE
+    SVG_META_STORE = store
+    warmed = 0
+    for cache_key, data in store.items(limit=SVG_META_CACHE.maxsize):
+        SVG_META_CACHE.set(cache_key, json.dumps(data))
+        warmed += 1
+    return warmed
+
+
+def detach_svg_meta_store():
+    global SVG_META_STORE
+    if SVG_META_STORE is not None:
+        SVG_META_STORE.close()
+    SVG_META_STORE = None
+
+
+def _load_svg_meta(data: dict) -> SVGProductMeta:
+    swatch = data.get('swatch')
+    if swatch is not None:
+        swatch = ProductSwatch(**{
+            **swatch,
+            **{name: tuple(swatch[name]) for name in SWATCH_TUPLE_FIELDS if swatch.get(name) is not None},
+            'overlay': Overlay(swatch['overlay']) if swatch.get('overlay') is not None else None,
+        })
+    return SVGProductMeta(
+        iscc_nbs_category=data['iscc_nbs_category'],
+        color_range=tuple(data['color_range']),
+        analogous=tuple(data.get('analogous', ())),
+        swatch=swatch,
+        tags=list(data.get('tags', [])),
+    )
+
+
+def get_memoized_svg_meta(cache_key: str) -> Optional[SVGProductMeta]:
+    """
+    A previously parsed SVG (a new instance, so callers are free to modify it).
+    """
+    cached = SVG_META_CACHE.get(cache_key)
+    if cached is not None:
+        return _load_svg_meta(json.loads(cached))
+    if SVG_META_STORE is not None:
+        data = SVG_META_STORE.get(cache_key)
+        if data is not None:
+            SVG_META_CACHE.set(cache_key, json.dumps(data))
+            return _load_svg_meta(data)
+    return None
+
+
+def memoize_svg_meta(cache_key: str, product_meta: SVGProductMeta):
+    data = serialize(product_meta)
+    SVG_META_CACHE.set(cache_key, json.dumps(data))
+    if SVG_META_STORE is not None:
+        SVG_META_STORE.set(cache_key, data)
+
+
+def invalidate_svg_meta(cache_key: Optional[str] = None):
+    """
+    Drop a memoized SVG (or every memoized SVG when no key is given).
+    """
+    SVG_META_CACHE.invalidate(cache_key)
+    if SVG_META_STORE is not None:
+        if cache_key is None:
+            SVG_META_STORE.clear()
+        else:
+            SVG_META_STORE.delete(cache_key)
+
+
 def extract_colors_from_svg(
     svg_content: str,
     product_type: Optional[str],
@@ -485,30 +658,60 @@ def extract_colors_from_svg(
     5. As a fallback so we don't just throw an error, crashing our entire parsing queue, assign
        color values of HEX white ('#ffffff').
     """    
-    # Will be assigned THREE color values based on what's parsed from the SVG
-    colors = []
-    
     content = svg_content
     if isurl(svg_content):
         content = fetch_citadel_svg(svg_content)
     if content is None:
         raise ValueError('SVG Content was empty.')
 
-    selector = Selector(text=content)
+    # Identical markup (e.g., from another locale or a previous run) is not parsed again
+    cache_key = svg_meta_cache_key(content, product_type)
+    product_meta = get_memoized_svg_meta(cache_key)
+    if product_meta is not None:
+        return product_meta
+
+    product_meta, resolved = _parse_svg_product_meta(content, product_type, testid)
+    if resolved:
+        memoize_svg_meta(cache_key, product_meta)
+    else:
+        # Not memoized, so the SVG is reported (and parsed again) on the next run
+        unprocessable_cache.append(testid)
+
+    return product_meta
+
+
+def _parse_svg_product_meta(
+    content: str,
+    product_type: Optional[str],
+    testid: Optional[str] = None
+) -> tuple[SVGProductMeta, bool]:
+    """
+    Parse SVG markup into its `SVGProductMeta` (@see extract_colors_from_svg).
+
+    RETURNS:
+    --------
+        The product meta, and whether its colors were found in the SVG (`False` when it
+        fell back to white)
+    """
+    # Will be assigned THREE color values based on what's parsed from the SVG
+    colors = []
+
+    # Everything below works from this one pass over the markup
+    doc = SVGDocument.parse(content)
     elements = ['rect', 'g', 'path']
     color_details = None
     
     for element in elements:
-        color_details = _resolve_color_details_from_element(selector, element, testid)
+        color_details = _resolve_color_details_from_element(doc, element, testid)
         if color_details:
             break
 
     if color_details is None:
-        color_details = _get_gradient_color_details(selector)
+        color_details = _get_gradient_color_details(doc)
 
-    if color_details is None:
+    resolved = color_details is not None
+    if not resolved:
         print(f'No valid colors found in SVG for product "{testid}"')
-        unprocessable_cache.append(testid)
         color_details = _create_color_details('#ffffff')
 
     colors = color_details['colors']
@@ -516,7 +719,7 @@ def extract_colors_from_svg(
     if testid:
         print(testid, [color.rgb for color in colors])
 
-    tags, overlay = _get_product_data_from_svg(selector, product_type)
+    product_data = _get_product_data_from_svg(doc, product_type)
     # {
     #         'swatch': swatch,
     #         'tags': tags,
@@ -524,15 +727,131 @@ def extract_colors_from_svg(
     #         'analogous': iscc_data.get('analogous', None),
     #         'iscc_nbs_category': iscc_data.get('iscc_nbs_category', None),
     #     }
-    iscc_data = colors[1].get_iscc_nbs_data()
-    product_meta = SVGProductMeta(swatch=to_swatch_color(colors, overlay=overlay, tags=tags, **iscc_data))
+    iscc_data = colors[1].iscc_nbs_data
+    product_meta = SVGProductMeta(
+        iscc_nbs_category=iscc_data.iscc_nbs_category,
+        color_range=iscc_data.color_range,
+        analogous=iscc_data.analogous,
+        swatch=to_swatch_color(colors, overlay=product_data['overlay']),
+        tags=product_data['tags'],
+    )
     # if product_meta:
     #     product_meta.colors = colors
 
-    return product_meta
+    return product_meta, resolved
+
+
+def _parse_svg_chunk(
+    items: list[tuple[str, Optional[str], Optional[str]]],
+    lut_dir: Optional[str] = None,
+) -> list[tuple[SVGProductMeta | Exception, bool]]:
+    """
+    Parse a chunk of `(content, product_type, testid)` items, capturing each item's failure.
 
-# extract_colors_from_svg(balthasar_gold, testid='balthasar_gold')
-# extract_colors_from_svg(hobgrot_hide, testid='hobgrot_hide')
-# extract_colors_from_svg(coelia_greenshade, testid='coelia_greenshade')
-# extract_colors_from_svg(blood_for_the_blood_god, testid='blood_for_the_blood_god')
-# extract_colors_from_svg(briar_queen_chill, testid='briar_queen_chill')
+    A pool worker starts with no persistent stores attached (results are memoized by the
+    parent), and only memory-maps the ISCC-NBS lookup table in `lut_dir` (the parent's),
+    never building it.
+    """
+    if lut_dir is not None:
+        configure_iscc_nbs_lut(lut_dir)
+        prepare_iscc_nbs_lut(build=False)
+    results = []
+    for content, product_type, testid in items:
+        try:
+            results.append(_parse_svg_product_meta(content, product_type, testid))
+        except Exception as exc:
+            results.append((exc, False))
+    return results
+
+
+def extract_colors_from_svg_many(
+    svgs: Iterable[str],
+    product_types: Iterable[Optional[str]] | Optional[str] = None,
+    workers: int = SVG_PARSE_WORKERS,
+    chunk_size: int = SVG_PARSE_CHUNK_SIZE,
+    testids: Optional[Iterable[Optional[str]]] = None,
+) -> list[SVGProductMeta | Exception]:
+    """
+    Extract the colors of many SVGs, spreading the parsing across a pool of processes.
+
+    SVGs already parsed (@see get_memoized_svg_meta) are not parsed again. The rest are
+    sent to the pool in chunks of `chunk_size`; batches too small to be worth starting a
+    pool for (or `workers=1`) are parsed in this process.
+
+    ARGS:
+    -----
+        svgs - The markup (or URL) of each SVG
+        product_types - The vendor product type of each SVG (or one for all of them)
+        workers - The number of worker processes
+        chunk_size - The number of SVGs sent to a worker at a time
+        testids - Identifiers of the SVGs (e.g., product names) for tracing
+
+    RETURNS:
+    --------
+        The `SVGProductMeta` (or the exception raised) for each SVG, in order. SVGs whose
+        colors could not be found are also recorded in `unprocessable_cache`, as with
+        `extract_colors_from_svg`.
+    """
+    svgs = list(svgs)
+    if product_types is None or isinstance(product_types, str):
+        product_types = [product_types] * len(svgs)
+    product_types = list(product_types)
+    testids = [None] * len(svgs) if testids is None else list(testids)
+    if not len(svgs) == len(product_types) == len(testids):
+        raise ValueError('Every SVG must have a product type and test ID')
+
+    results: list[SVGProductMeta | Exception | None] = [None] * len(svgs)
+    cache_keys: list[Optional[str]] = [None] * len(svgs)
+    pending: list[int] = []
+    for i, (svg, product_type) in enumerate(zip(svgs, product_types)):
+        try:
+            content = fetch_citadel_svg(svg) if isurl(svg) else svg
+            if content is None:
+                raise ValueError('SVG Content was empty.')
+        except Exception as exc:
+            results[i] = exc
+            continue
+        svgs[i] = content
+        cache_keys[i] = svg_meta_cache_key(content, product_type)
+        results[i] = get_memoized_svg_meta(cache_keys[i])
+        if results[i] is None:
+            pending.append(i)
+
+    items = [(svgs[i], product_types[i], testids[i]) for i in pending]
+    chunk_size = max(1, chunk_size)
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+    parsed: list[tuple[SVGProductMeta | Exception, bool]] = []
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            parsed.extend(_parse_svg_chunk(chunk))
+    else:
+        # Load the lookup table here too, if it has been built. It is never built for (or
+        # by) the workers: they memory-map the table in the same directory when it exists,
+        # and classify colors with the k-d tree otherwise (e.g., while it is being built)
+        get_iscc_nbs_lut()
+        lut_dir = get_lut_dir()
+        context = multiprocessing.get_context(SVG_PARSE_START_METHOD)
+        if SVG_PARSE_START_METHOD == 'forkserver':
+            # Import the parser once in the (single-threaded) server rather than in every worker
+            context.set_forkserver_preload([__name__])
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as executor:
+            futures = [executor.submit(_parse_svg_chunk, chunk, lut_dir) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    parsed.extend(future.result())
+                except Exception as exc:
+                    # e.g., the pool broke while parsing the chunk
+                    parsed.extend((exc, False) for _ in chunk)
+
+    for i, (product_meta, resolved) in zip(pending, parsed):
+        results[i] = product_meta
+        if resolved:
+            memoize_svg_meta(cache_keys[i], product_meta)
+        elif not isinstance(product_meta, Exception):
+            unprocessable_cache.append(testids[i])
+
+    return results
+
+# The SVG families described above are recorded in tests/fixtures/citadel_svgs and checked
+# against a snapshot by tests/test_svg_parser.py (benchmark: python -m tests.benchmarks.svg_parser)
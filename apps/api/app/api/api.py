@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .v1 import products
+from .v1 import products, swatches
 
 router = APIRouter()
 router.include_router(
@@ -9,6 +9,11 @@ router.include_router(
     tags=["products"],
     responses={404: {"description": "Not found"}},
 )
+router.include_router(
+    swatches.router,
+    prefix="/swatches",
+    tags=["swatches"],
+)
 
 # api_router.include_router(
 #     vendors.router,
@@ -0,0 +1,190 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing_extensions import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, UploadFile
+from PIL import UnidentifiedImageError
+
+from app.agent.color.palette import ImageTooLargeError, extract_palette
+from app.agent.configuration import fs_config
+from app.agent.harmony_index import HARMONY_SCHEMES, HUE_TOLERANCE, get_harmony_index
+from app.agent.mixing_index import MIX_MAX_INVENTORY, get_mixing_index
+from app.agent.swatch_index import SwatchMatch, SwatchRecord, get_swatch_index
+from app.schemas.swatch_search import (
+    HarmonyGroupResponse,
+    MixRecipeResponse,
+    PaletteColorResponse,
+    SwatchMatchResponse,
+    SwatchPaintResponse,
+)
+
+router = APIRouter()
+
+# Palette extraction is CPU-bound, so it runs on a small dedicated pool. The
+# semaphore bounds how many uploads may wait for a worker at once.
+PALETTE_WORKERS = int(os.environ.get('PALETTE_WORKERS', 2))
+PALETTE_QUEUE_SIZE = int(os.environ.get('PALETTE_QUEUE_SIZE', 8))
+PALETTE_QUEUE_TIMEOUT = float(os.environ.get('PALETTE_QUEUE_TIMEOUT', 10))
+PALETTE_MAX_UPLOAD_BYTES = int(os.environ.get('PALETTE_MAX_UPLOAD_BYTES', 20 * 1024 * 1024))
+
+palette_executor = ThreadPoolExecutor(max_workers=PALETTE_WORKERS, thread_name_prefix='palette')
+palette_slots = asyncio.Semaphore(PALETTE_WORKERS + PALETTE_QUEUE_SIZE)
+
+
+def to_paint_response(record: SwatchRecord) -> SwatchPaintResponse:
+    return SwatchPaintResponse(
+        vendor=record.vendor,
+        product_line=record.product_line,
+        name=record.name,
+        hex_color=record.hex_color,
+        product_type=list(record.product_type),
+    )
+
+
+def to_response(match: SwatchMatch) -> SwatchMatchResponse:
+    record = match.record
+    return SwatchMatchResponse(
+        vendor=record.vendor,
+        product_line=record.product_line,
+        name=record.name,
+        hex_color=record.hex_color,
+        product_type=list(record.product_type),
+        distance=match.distance,
+    )
+
+
+# Declared without `async` so FastAPI runs it in the threadpool (the index may need rebuilding)
+@router.get("/nearest", response_model=list[SwatchMatchResponse])
+def nearest_swatches(
+    color: Annotated[str, Query(description="Hex, rgb() or named color to match", example="#9a1115")],
+    k: Annotated[int, Query(ge=1, le=100, description="Maximum number of matches")] = 10,
+    radius: Annotated[float | None, Query(gt=0, description="Only return matches within this distance")] = None,
+    vendor: Annotated[list[str] | None, Query(description="Vendor slug(s) to match")] = None,
+    product_line: Annotated[list[str] | None, Query(description="Product line slug(s) to match")] = None,
+    product_type: Annotated[list[str] | None, Query(description="Product type(s) to match")] = None,
+):
+    index = get_swatch_index(fs_config['outdir'])
+    filters = {'vendor': vendor, 'product_line': product_line, 'product_type': product_type}
+    try:
+        if radius is None:
+            matches = index.nearest(color, k=k, **filters)
+        else:
+            matches = index.within(color, radius, **filters)[:k]
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return [to_response(match) for match in matches]
+
+
+# Declared without `async` so FastAPI runs it in the threadpool (the index may need rebuilding)
+@router.get("/mix", response_model=list[MixRecipeResponse])
+def mixing_recipes(
+    color: Annotated[str, Query(description="Hex, rgb() or named target color", example="#7a3b2e")],
+    k: Annotated[int, Query(ge=1, le=100, description="Maximum number of recipes")] = 10,
+    inventory: Annotated[
+        list[str] | None,
+        Query(
+            max_length=MIX_MAX_INVENTORY,
+            description=f"Only mix these paints ('<vendor>/<product line>/<name>'), at most {MIX_MAX_INVENTORY}",
+        ),
+    ] = None,
+):
+    index = get_mixing_index(fs_config['outdir'])
+    try:
+        recipes = index.recipes(color, k=k, inventory=inventory)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return [
+        MixRecipeResponse(
+            paint_a=to_paint_response(recipe.paint_a),
+            paint_b=to_paint_response(recipe.paint_b),
+            ratio=recipe.ratio,
+            mixed_hex=recipe.mixed_hex,
+            distance=recipe.distance,
+        )
+        for recipe in recipes
+    ]
+
+
+# Declared without `async` so FastAPI runs it in the threadpool (the index may need rebuilding)
+@router.get("/harmony", response_model=list[HarmonyGroupResponse])
+def harmony_swatches(
+    color: Annotated[
+        str,
+        Query(description="Hex, rgb() or named base color, or a paint ('<vendor>/<product line>/<name>')", example="#9a1115"),
+    ],
+    scheme: Annotated[str, Query(pattern=f"^({'|'.join(HARMONY_SCHEMES)})$", description="The harmony scheme")] = 'complementary',
+    k: Annotated[int, Query(ge=1, le=100, description="Maximum number of paints per hue")] = 5,
+    hue_tolerance: Annotated[float, Query(gt=0, le=180, description="Hue window half-width in degrees")] = HUE_TOLERANCE,
+    lightness_tolerance: Annotated[float | None, Query(gt=0, description="Max OKLCH lightness difference from the base color")] = None,
+    chroma_tolerance: Annotated[float | None, Query(gt=0, description="Max OKLCH chroma difference from the base color")] = None,
+    vendor: Annotated[list[str] | None, Query(description="Vendor slug(s) to match")] = None,
+    product_line: Annotated[list[str] | None, Query(description="Product line slug(s) to match")] = None,
+):
+    index = get_harmony_index(fs_config['outdir'])
+    try:
+        groups = index.harmony(
+            color,
+            scheme,
+            k=k,
+            hue_tolerance=hue_tolerance,
+            lightness_tolerance=lightness_tolerance,
+            chroma_tolerance=chroma_tolerance,
+            vendor=vendor,
+            product_line=product_line,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return [
+        HarmonyGroupResponse(
+            offset=group.offset,
+            hue=group.hue,
+            target_hex=group.target_hex,
+            matches=[to_response(match) for match in group.matches],
+        )
+        for group in groups
+    ]
+
+
+def _palette_with_matches(data: bytes, k: int, matches: int, filters: dict) -> list[PaletteColorResponse]:
+    palette = extract_palette(data, k=k)
+    index = get_swatch_index(fs_config['outdir'])
+    return [
+        PaletteColorResponse(
+            hex_color=color.hex_color,
+            rgb_color=list(color.rgb_color),
+            proportion=color.proportion,
+            matches=[to_response(m) for m in index.nearest(color.hex_color, k=matches, **filters)],
+        )
+        for color in palette
+    ]
+
+
+@router.post("/palette", response_model=list[PaletteColorResponse])
+async def image_palette(
+    file: UploadFile,
+    k: Annotated[int, Query(ge=1, le=16, description="Number of dominant colors to extract")] = 5,
+    matches: Annotated[int, Query(ge=0, le=20, description="Number of paints to match per color")] = 3,
+    vendor: Annotated[list[str] | None, Query(description="Vendor slug(s) to match")] = None,
+    product_line: Annotated[list[str] | None, Query(description="Product line slug(s) to match")] = None,
+    product_type: Annotated[list[str] | None, Query(description="Product type(s) to match")] = None,
+):
+    data = await file.read(PALETTE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > PALETTE_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+
+    try:
+        await asyncio.wait_for(palette_slots.acquire(), timeout=PALETTE_QUEUE_TIMEOUT)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Too many images are being processed, try again later")
+
+    filters = {'vendor': vendor, 'product_line': product_line, 'product_type': product_type}
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(palette_executor, _palette_with_matches, data, k, matches, filters)
+    except ImageTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=f"Image is too large: {exc}")
+    except (UnidentifiedImageError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=f"Unable to read image: {exc}")
+    finally:
+        palette_slots.release()
@@ -34,6 +34,11 @@ class ProductSwatch(Base, UUIDMixin, SoftDeleteMixin, TimestampMixin):
         nullable=True,
         comment="Depending on the product type, an overlay filter may be applied to the SVG displaying its color to help convey reflectiveness or texture."
     )
+    luminance: Mapped[float | None] = mapped_column(nullable=True, comment="WCAG relative luminance of the product color.")
+    contrast_white: Mapped[float | None] = mapped_column(nullable=True, comment="WCAG contrast ratio of white text over the product color.")
+    contrast_black: Mapped[float | None] = mapped_column(nullable=True, comment="WCAG contrast ratio of black text over the product color.")
+    apca_white: Mapped[float | None] = mapped_column(nullable=True, comment="APCA lightness contrast (Lc) of white text over the product color.")
+    apca_black: Mapped[float | None] = mapped_column(nullable=True, comment="APCA lightness contrast (Lc) of black text over the product color.")
 
     # Relationships
     product = relationship("Product", back_populates="swatch")
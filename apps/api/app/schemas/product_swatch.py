@@ -14,6 +14,11 @@ class ProductSwatchBase(BaseModel):
     gradient_start: Annotated[list[float], Field(..., description="Gradient start color in OKLCH", example=[0.229, 0.0175, 237.72])]
     gradient_end: Annotated[list[float], Field(..., description="Gradient end color in OKLCH", example=[0.229, 0.0175, 237.72])]
     overlay: Annotated[Overlay | None, Field(None, description="Optional SVG filter overlay for adding texture based on product type", example="chrome")]
+    luminance: Annotated[float | None, Field(None, description="WCAG relative luminance of the product color", example=0.0733)]
+    contrast_white: Annotated[float | None, Field(None, description="WCAG contrast ratio of white text over the product color", example=8.519)]
+    contrast_black: Annotated[float | None, Field(None, description="WCAG contrast ratio of black text over the product color", example=2.465)]
+    apca_white: Annotated[float | None, Field(None, description="APCA lightness contrast (Lc) of white text over the product color", example=-92.08)]
+    apca_black: Annotated[float | None, Field(None, description="APCA lightness contrast (Lc) of black text over the product color", example=16.63)]
 
 
 class ProductSwatchCreate(ProductSwatchBase):
@@ -0,0 +1,49 @@
+from typing_extensions import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class SwatchPaintResponse(BaseModel):
+    vendor: Annotated[str, Field(..., description="Slug of the vendor", example="games_workshop")]
+    product_line: Annotated[str, Field(..., description="Slug of the product line", example="citadel")]
+    name: Annotated[str, Field(..., description="The product name", example="Khorne Red")]
+    hex_color: Annotated[str, Field(..., description="Hex color code for the product", example="#6a0001")]
+    product_type: Annotated[list[str], Field(default=[], description="The types of product the color is associated with", example=["Base"])]
+
+    class Config:
+        from_attributes = True
+
+
+class SwatchMatchResponse(SwatchPaintResponse):
+    distance: Annotated[float, Field(..., description="Weighted OKLab distance from the requested color", example=0.0123)]
+
+
+class PaletteColorResponse(BaseModel):
+    hex_color: Annotated[str, Field(..., description="Hex color code of the extracted color", example="#8c1c13")]
+    rgb_color: Annotated[list[int], Field(..., description="RGB color values", example=[140, 28, 19])]
+    proportion: Annotated[float, Field(..., description="Share of the image's pixels assigned to this color", example=0.22)]
+    matches: Annotated[list[SwatchMatchResponse], Field(default=[], description="The closest paints to this color")]
+
+    class Config:
+        from_attributes = True
+
+
+class MixRecipeResponse(BaseModel):
+    paint_a: SwatchPaintResponse
+    paint_b: SwatchPaintResponse
+    ratio: Annotated[float, Field(..., description="Proportion of paint_a in the mixture", example=0.25)]
+    mixed_hex: Annotated[str, Field(..., description="Hex color code of the predicted mixture", example="#7a3b2e")]
+    distance: Annotated[float, Field(..., description="Weighted OKLab distance from the requested color", example=0.0123)]
+
+    class Config:
+        from_attributes = True
+
+
+class HarmonyGroupResponse(BaseModel):
+    offset: Annotated[float, Field(..., description="Hue offset (in degrees) from the base color", example=120.0)]
+    hue: Annotated[float, Field(..., description="The target OKLCH hue (in degrees)", example=149.4)]
+    target_hex: Annotated[str, Field(..., description="Hex color code of the base color rotated onto the target hue", example="#2f7d2c")]
+    matches: Annotated[list[SwatchMatchResponse], Field(default=[], description="Paints near the target hue, closest first")]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,220 @@
+# standard
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+# local
+from app.agent.vendors.games_workshop.svg_parser import SVG_META_CACHE, SVGProductMeta, extract_colors_from_svg
+from app.core.utils.serializer import serialize
+
+"""
+Benchmark and snapshot check of the Citadel swatch SVG parser.
+
+The corpus in `tests/fixtures/citadel_svgs` holds an SVG of each of the structural
+families described in `svg_parser` (a hex `fill` on the `rect` with an empty
+gradient, radial and linear gradient fills, a fill from a `style` block, a `g`
+fill, `xlink:href` gradients, gloss overlays, terrain texture paths and mediums).
+`snapshot.json` records the product type each SVG is parsed with and the
+`SVGProductMeta` expected from it.
+
+Every parser benchmarked is first checked against the snapshot, so an optimization
+cannot silently change a swatch. A parser is any callable taking the markup and
+product type and returning an `SVGProductMeta`; pass others as `module:function`.
+
+Example:
+--------
+$ python -m tests.benchmarks.svg_parser --repeat 200
+parser                        svgs/s    p50 ms    p99 ms   peak KiB
+extract_colors_from_svg      3012.4     0.301     0.712      184.2
+
+$ python -m tests.benchmarks.svg_parser --update-snapshot  # after an intended change
+"""
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'citadel_svgs')
+SNAPSHOT_FILE = 'snapshot.json'
+
+type SVGParser = Callable[[str, Optional[str]], SVGProductMeta]
+
+
+@dataclass(frozen=True)
+class CorpusSVG:
+    name: str
+    product_type: Optional[str]
+    content: str
+    # The serialized `SVGProductMeta` recorded in the snapshot (if any)
+    expected: Optional[dict]
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    parser: str
+    count: int
+    svgs_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_memory_kib: float
+
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> list[CorpusSVG]:
+    """
+    The corpus SVGs (in file name order) with their snapshot entries.
+    """
+    snapshot_path = os.path.join(corpus_dir, SNAPSHOT_FILE)
+    snapshot = {}
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+
+    corpus = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        if not filename.endswith('.svg'):
+            continue
+        name = filename[:-len('.svg')]
+        with open(os.path.join(corpus_dir, filename), encoding='utf-8') as f:
+            content = f.read()
+        entry = snapshot.get(name, {})
+        corpus.append(CorpusSVG(name, entry.get('product_type'), content, entry.get('expected')))
+    return corpus
+
+
+def parse_uncached(content: str, product_type: Optional[str]) -> SVGProductMeta:
+    """
+    `extract_colors_from_svg` with its in-memory memoization cleared, so every call parses.
+    """
+    SVG_META_CACHE.invalidate()
+    return extract_colors_from_svg(content, product_type)
+
+
+def check_corpus(parse: SVGParser = parse_uncached, corpus: Optional[list[CorpusSVG]] = None) -> list[str]:
+    """
+    Parse every corpus SVG and compare the result with the snapshot.
+
+    Returns:
+        A description of each SVG whose result differs (or which has no snapshot entry).
+    """
+    corpus = load_corpus() if corpus is None else corpus
+    mismatches = []
+    for svg in corpus:
+        if svg.expected is None:
+            mismatches.append(f'{svg.name}: not in the snapshot')
+            continue
+        try:
+            actual = serialize(parse(svg.content, svg.product_type))
+        except Exception as exc:
+            mismatches.append(f'{svg.name}: {exc!r}')
+            continue
+        if actual != svg.expected:
+            mismatches.append(f'{svg.name}: expected {svg.expected}, got {actual}')
+    return mismatches
+
+
+def update_snapshot(corpus_dir: str = CORPUS_DIR, parse: SVGParser = parse_uncached) -> dict:
+    """
+    Record the current parser's result for every corpus SVG. New SVGs are recorded with
+    no product type (i.e., it is read from the SVG's ID); edit the snapshot to set one.
+    """
+    snapshot = {
+        svg.name: {'product_type': svg.product_type, 'expected': serialize(parse(svg.content, svg.product_type))}
+        for svg in load_corpus(corpus_dir)
+    }
+    with open(os.path.join(corpus_dir, SNAPSHOT_FILE), 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return snapshot
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """
+    The nearest-rank `q`th percentile of sorted values.
+    """
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def benchmark(name: str, parse: SVGParser, corpus: list[CorpusSVG], repeat: int = 100) -> BenchmarkResult:
+    """
+    Time `repeat` passes over the corpus, then measure peak memory in one more traced
+    pass (tracing slows the parser down, so it is kept out of the timings).
+    """
+    parse(corpus[0].content, corpus[0].product_type)  # warm up
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for svg in corpus:
+            t = time.perf_counter()
+            parse(svg.content, svg.product_type)
+            latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        for svg in corpus:
+            parse(svg.content, svg.product_type)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return BenchmarkResult(
+        parser=name,
+        count=len(latencies),
+        svgs_per_second=len(latencies) / elapsed if elapsed else float('inf'),
+        p50_ms=_percentile(latencies, 50) * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+        peak_memory_kib=peak / 1024,
+    )
+
+
+def load_parser(path: str) -> SVGParser:
+    """
+    Import a parser given as 'module:function'.
+    """
+    module_name, _, function_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = argparse.ArgumentParser(description='Benchmark the Citadel swatch SVG parser against the corpus snapshot.')
+    args.add_argument('--repeat', type=int, default=100, help='passes over the corpus per parser')
+    args.add_argument('--corpus', default=CORPUS_DIR, help='directory of SVGs and their snapshot')
+    args.add_argument('--parser', action='append', default=[], help="another parser to compare ('module:function')")
+    args.add_argument('--update-snapshot', action='store_true', help='record the current results as the snapshot')
+    options = args.parse_args(argv)
+
+    if options.update_snapshot:
+        snapshot = update_snapshot(options.corpus)
+        print(f'Recorded {len(snapshot)} SVGs in {os.path.join(options.corpus, SNAPSHOT_FILE)}')
+        return 0
+
+    parsers: dict[str, SVGParser] = {'extract_colors_from_svg': parse_uncached}
+    parsers.update((path, load_parser(path)) for path in options.parser)
+
+    corpus = load_corpus(options.corpus)
+    failed = False
+    print(f'{"parser":<28}{"svgs/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"peak KiB":>11}')
+    for name, parse in parsers.items():
+        mismatches = check_corpus(parse, corpus)
+        if mismatches:
+            failed = True
+            print(f'{name}: {len(mismatches)} SVGs differ from the snapshot', file=sys.stderr)
+            for mismatch in mismatches:
+                print(f'  {mismatch}', file=sys.stderr)
+            continue
+        result = benchmark(name, parse, corpus, repeat=options.repeat)
+        print(
+            f'{result.parser:<28}{result.svgs_per_second:>10.1f}{result.p50_ms:>10.3f}'
+            f'{result.p99_ms:>10.3f}{result.peak_memory_kib:>11.1f}'
+        )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
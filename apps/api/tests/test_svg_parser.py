@@ -0,0 +1,35 @@
+# local
+from app.agent.vendors.games_workshop.svg_parser import SVG_META_CACHE, extract_colors_from_svg, extract_colors_from_svg_many
+from app.core.utils.serializer import serialize
+
+from tests.benchmarks.svg_parser import check_corpus, load_corpus
+
+"""
+Snapshot tests of the Citadel swatch SVG parser over the recorded corpus
+(@see tests.benchmarks.svg_parser). After an intended change to the extracted
+swatches, re-record the snapshot with
+`python -m tests.benchmarks.svg_parser --update-snapshot`.
+"""
+
+
+def test_corpus_matches_snapshot():
+    assert check_corpus() == []
+
+
+def test_memoized_results_match_snapshot():
+    SVG_META_CACHE.invalidate()
+    check_corpus(extract_colors_from_svg)
+    # Every SVG is now served from the memoization cache
+    assert check_corpus(extract_colors_from_svg) == []
+
+
+def test_batch_results_match_snapshot():
+    corpus = load_corpus()
+    SVG_META_CACHE.invalidate()
+    results = extract_colors_from_svg_many(
+        [svg.content for svg in corpus],
+        [svg.product_type for svg in corpus],
+        workers=2,
+        chunk_size=4,
+    )
+    assert [serialize(result) for result in results] == [svg.expected for svg in corpus]